@@ -2,35 +2,57 @@
 
 Permite registrar novas telas de forma simples e oferece métodos para
 navegar entre rotas com suporte a histórico (voltar/avançar).
+
+Telas que optam pelo cache (`BaseScreen.cacheable`) têm a árvore de
+controles guardada por (rota, parâmetros) em um cache LRU: voltar, avançar
+ou trocar de submenu reaproveita a árvore já montada, sem instanciar a tela
+nem buscar os dados de novo. Quem altera dados chama `invalidate`.
+
+Rotas podem ser registradas com o caminho da classe ("módulo:Classe"): o
+módulo só é importado na primeira navegação para a rota, então a abertura
+da aplicação paga apenas pela tela inicial.
 """
 
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional, Tuple, Type
+import importlib
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple, Type, Union
 from urllib.parse import parse_qs, urlencode, urlparse
 
 import flet as ft
 
-from screens import BaseScreen
-from screens.home_screen import HomeScreen
-from screens.exemplo_screen import ExemploScreen
+from helpers.update_scheduler import UpdateScheduler
+from scripts.prefetch import get_prefetch_scheduler
+from screens import BaseScreen, DeferredLoad
 from screens.navbar import NavBar
+from screens.document_jobs_panel import create_document_jobs_panel
 from screens.backoffice_screen import BackofficeScreen
-from screens.comercializacao_screen import ComercializacaoScreen
-from screens.financeiro_screen import FinanceiroScreen
-from screens.banco_de_dados_screen import BancoDeDadosScreen
-from screens.emails_screen import EmailsScreen
-from screens.relatorios_screen import RelatoriosScreen
-from screens.simulador_screen import SimuladorScreen
-from screens.logout_screen import LogoutScreen
+
+
+DEBUG_PREFIX = "[NavigationManager]"
+
+# Quantidade máxima de árvores de controles mantidas no cache de views
+MAX_CACHED_VIEWS = 8
+
+ViewKey = Tuple[str, Tuple[Tuple[str, Any], ...]]
+
+# Classe da tela ou o caminho "módulo:Classe" (importado na primeira navegação)
+ScreenRef = Union[Type[BaseScreen], str]
+
+
+def _debug_print(message: str, *, data: Any | None = None) -> None:
+    print(f"{DEBUG_PREFIX} {message}")
+    if data is not None:
+        print(f"{DEBUG_PREFIX} -> {data}")
 
 
 class NavigationManager:
     """Gerencia a navegação da aplicação usando Views do Flet."""
 
-    def __init__(self, page: ft.Page) -> None:
+    def __init__(self, page: ft.Page, *, max_cached_views: int = MAX_CACHED_VIEWS) -> None:
         self.page = page
-        self._routes: Dict[str, Type[BaseScreen]] = {}
+        self._routes: Dict[str, ScreenRef] = {}
         self._default_route: str = "/backoffice"
         self._history: List[Tuple[str, Dict[str, Any]]] = []
         self._future: List[Tuple[str, Dict[str, Any]]] = []
@@ -38,23 +60,43 @@ class NavigationManager:
         self._current_params: Dict[str, Any] = {}
         self._content_container: Optional[ft.Container] = None
         self._root_column: Optional[ft.Column] = None
+        self._navbar: Optional[NavBar] = None
+        self._max_cached_views = max(0, max_cached_views)
+        # (rota, parâmetros) -> árvore de controles; a mais recente fica no fim
+        self._view_cache: "OrderedDict[ViewKey, ft.Control]" = OrderedDict()
+        # Chave da view exibida (None quando ela não está no cache) e as
+        # cargas em segundo plano disparadas por ela
+        self._shown_key: Optional[ViewKey] = None
+        self._pending_loads: List[DeferredLoad] = []
+        # Atualizações da interface agrupadas por quadro (ver BaseScreen.request_update)
+        self.updates = UpdateScheduler(page)
 
     def register_route(
         self,
         route: str,
-        screen_cls: Type[BaseScreen],
+        screen_cls: ScreenRef,
         *,
         default: bool = False,
     ) -> None:
-        """Registra uma rota associando-a a uma classe de tela."""
+        """Registra uma rota associando-a a uma classe de tela.
+
+        `screen_cls` também pode ser o caminho "módulo:Classe"; nesse caso o
+        módulo só é importado quando a rota for aberta pela primeira vez.
+        """
         self._routes[route] = screen_cls
         if default:
             self._default_route = route
 
-    def attach_layout(self, root: ft.Column, content_container: ft.Container) -> None:
-        """Associa o layout raiz e o container de conteúdo ao gerenciador."""
+    def attach_layout(
+        self,
+        root: ft.Column,
+        content_container: ft.Container,
+        navbar: Optional[NavBar] = None,
+    ) -> None:
+        """Associa o layout raiz, o container de conteúdo e a NavBar ao gerenciador."""
         self._root_column = root
         self._content_container = content_container
+        self._navbar = navbar
 
     # ------------------------------------------------------------------
     # Integração com a NavBar
@@ -82,6 +124,25 @@ class NavigationManager:
         self._current_params = params
         self._show_route(route, params)
 
+    def record_params(self, params: Optional[Dict[str, Any]] = None) -> None:
+        """Registra novos parâmetros da rota atual sem remontar a view.
+
+        Para telas que se atualizam no lugar (ex.: filtros do portfólio): o
+        histórico ganha a entrada, como em `go`, e a view em cache passa a
+        responder pelos novos parâmetros.
+        """
+        params = params or {}
+        route = self._current_route
+        self._history.append((route, params))
+        self._future.clear()
+        self._current_params = params
+
+        if self._shown_key is not None:
+            view = self._view_cache.pop(self._shown_key, None)
+            self._shown_key = self._view_key(route, params)
+            if view is not None:
+                self._view_cache[self._shown_key] = view
+
     def back(self) -> None:
         """Volta para a rota anterior no histórico, se existir."""
         if len(self._history) <= 1:
@@ -106,22 +167,109 @@ class NavigationManager:
         self._current_params = params
         self._show_route(route, params)
 
+    def invalidate(
+        self,
+        route: Optional[str] = None,
+        params: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Descarta views do cache para que sejam montadas de novo.
+
+        Sem argumentos, limpa o cache inteiro; só com `route`, descarta todas
+        as views da rota; com `route` e `params`, apenas aquela view. Os
+        dados pré-carregados em tempo ocioso também são descartados, já que
+        invalidar significa que algo mudou no banco.
+        """
+        get_prefetch_scheduler().invalidate()
+        if route is None:
+            removed = len(self._view_cache)
+            self._view_cache.clear()
+        elif params is None:
+            keys = [key for key in self._view_cache if key[0] == route]
+            for key in keys:
+                del self._view_cache[key]
+            removed = len(keys)
+        else:
+            removed = 1 if self._view_cache.pop(self._view_key(route, params), None) else 0
+
+        if removed:
+            _debug_print(f"{removed} view(s) descartada(s) do cache (rota={route})")
+
+    def track_load(self, load: DeferredLoad) -> None:
+        """Registra uma carga em segundo plano da view atual (ver `BaseScreen.defer_content`)."""
+        self._pending_loads = [item for item in self._pending_loads if not item.done]
+        self._pending_loads.append(load)
+
     # ------------------------------------------------------------------
     # Implementação interna
     # ------------------------------------------------------------------
+    def _cancel_pending_loads(self) -> None:
+        """Cancela as cargas da view que está saindo de cena."""
+        pending = [load for load in self._pending_loads if not load.done]
+        self._pending_loads = []
+        if not pending:
+            return
+
+        for load in pending:
+            load.cancel()
+        # A árvore guardada ficaria com o esqueleto: é montada de novo na volta
+        if self._shown_key is not None:
+            self._view_cache.pop(self._shown_key, None)
+        _debug_print(f"{len(pending)} carga(s) cancelada(s) ao sair da view", data=self._shown_key)
+
+    @staticmethod
+    def _view_key(route: str, params: Dict[str, Any]) -> ViewKey:
+        # Listas vêm de query strings com chaves repetidas; viram tuplas hasheáveis
+        frozen = (
+            (key, tuple(value) if isinstance(value, list) else value)
+            for key, value in params.items()
+        )
+        return route, tuple(sorted(frozen, key=lambda item: item[0]))
+
+    def _resolve_screen(self, route: str) -> Optional[Type[BaseScreen]]:
+        screen_ref = self._routes.get(route)
+        if not isinstance(screen_ref, str):
+            return screen_ref
+
+        module_name, _, class_name = screen_ref.partition(":")
+        screen_cls = getattr(importlib.import_module(module_name), class_name)
+        # Substitui o caminho pela classe: as próximas navegações não resolvem de novo
+        for key, value in self._routes.items():
+            if value == screen_ref:
+                self._routes[key] = screen_cls
+        _debug_print(f"Tela carregada sob demanda: {screen_ref}")
+        return screen_cls
+
     def _build_view(self, route: str, params: Dict[str, Any]) -> Optional[ft.Control]:
-        screen_cls = self._routes.get(route)
+        screen_cls = self._resolve_screen(route)
         if screen_cls is None:
             return None
 
+        cacheable = self._max_cached_views > 0 and screen_cls.is_cacheable(params)
+        key = self._view_key(route, params) if cacheable else None
+        self._shown_key = key
+        if key is not None:
+            cached = self._view_cache.get(key)
+            if cached is not None:
+                self._view_cache.move_to_end(key)
+                return cached
+
         screen = screen_cls(self.page, self)
-        return screen.build(params=params)
+        view = screen.build(params=params)
+
+        if key is not None:
+            self._view_cache[key] = view
+            while len(self._view_cache) > self._max_cached_views:
+                evicted, _ = self._view_cache.popitem(last=False)
+                _debug_print("View removida do cache (LRU)", data=evicted)
+        return view
 
     def _show_route(self, route: str, params: Dict[str, Any]) -> None:
         """Atualiza apenas o conteúdo abaixo da NavBar, mantendo-a fixa."""
         if self._content_container is None or self._root_column is None:
             return
 
+        self._cancel_pending_loads()
+        get_prefetch_scheduler().cancel()
         content = self._build_view(route, params)
         if content is None:
             # Fallback para rota padrão
@@ -140,12 +288,22 @@ class NavigationManager:
         else:
             selected_nav = route.lstrip("/")
 
-        self._root_column.controls[0] = NavBar(
-            on_nav=self.handle_nav,
-            selected_nav=selected_nav,
-        )
+        if self._navbar is not None:
+            # Só os itens que mudaram de estado vão no diff do page.update()
+            self._navbar.set_selected(selected_nav)
+        else:
+            self._root_column.controls[0] = NavBar(
+                on_nav=self.handle_nav,
+                selected_nav=selected_nav,
+            )
+
+        # Envia a troca de tela junto com o que as telas tinham marcado
+        self.updates.update_now()
 
-        self.page.update()
+        # Com a view na tela, pré-carrega em tempo ocioso as prováveis próximas
+        screen_cls = self._resolve_screen(route)
+        if screen_cls is not None:
+            get_prefetch_scheduler().schedule(screen_cls.prefetch_keys(params))
 
     @staticmethod
     def _parse_route(raw_route: str) -> Tuple[str, Dict[str, Any]]:
@@ -171,32 +329,36 @@ def create_navigation(page: ft.Page) -> NavigationManager:
     Para adicionar uma nova tela, basta:
 
     1. Criar o arquivo em `screens/` herdando de `BaseScreen`.
-    2. Registrar a rota aqui utilizando `register_route`.
+    2. Registrar a rota aqui utilizando `register_route`, de preferência
+       com o caminho "módulo:Classe" para não pesar na abertura.
     """
     navigation = NavigationManager(page)
 
-    # Rotas padrão
-    navigation.register_route("/home", HomeScreen)
+    # Rotas padrão (só a tela inicial é importada na abertura)
+    navigation.register_route("/home", "screens.home_screen:HomeScreen")
     navigation.register_route("/", BackofficeScreen, default=True)
-    navigation.register_route("/exemplo", ExemploScreen)
+    navigation.register_route("/exemplo", "screens.exemplo_screen:ExemploScreen")
 
     # Rotas da navbar principal
     navigation.register_route("/backoffice", BackofficeScreen)
-    navigation.register_route("/comercializacao", ComercializacaoScreen)
-    navigation.register_route("/financeiro", FinanceiroScreen)
-    navigation.register_route("/banco_de_dados", BancoDeDadosScreen)
-    navigation.register_route("/emails", EmailsScreen)
-    navigation.register_route("/relatorios", RelatoriosScreen)
-    navigation.register_route("/simulador", SimuladorScreen)
-    navigation.register_route("/logout", LogoutScreen)
-
-    # Layout raiz: NavBar fixa no topo + container de conteúdo abaixo
+    navigation.register_route("/comercializacao", "screens.comercializacao_screen:ComercializacaoScreen")
+    navigation.register_route("/financeiro", "screens.financeiro_screen:FinanceiroScreen")
+    navigation.register_route("/banco_de_dados", "screens.banco_de_dados_screen:BancoDeDadosScreen")
+    navigation.register_route("/emails", "screens.emails_screen:EmailsScreen")
+    navigation.register_route("/relatorios", "screens.relatorios_screen:RelatoriosScreen")
+    navigation.register_route("/simulador", "screens.simulador_screen:SimuladorScreen")
+    navigation.register_route("/logout", "screens.logout_screen:LogoutScreen")
+
+    # Layout raiz: NavBar fixa no topo + container de conteúdo abaixo +
+    # painel da fila de documentos (persiste entre as telas)
     content_container = ft.Container(expand=True)
+    navbar = NavBar(on_nav=navigation.handle_nav, selected_nav="backoffice")
 
     root_column = ft.Column(
         controls=[
-            NavBar(on_nav=navigation.handle_nav, selected_nav="backoffice"),
+            navbar,
             content_container,
+            create_document_jobs_panel(page, navigation.updates),
         ],
         spacing=0,
         expand=True,
@@ -205,6 +367,6 @@ def create_navigation(page: ft.Page) -> NavigationManager:
     page.controls.clear()
     page.controls.append(root_column)
 
-    navigation.attach_layout(root_column, content_container)
+    navigation.attach_layout(root_column, content_container, navbar)
 
     return navigation
@@ -0,0 +1,102 @@
+"""Redução de pontos de séries temporais antes de desenhá-las em gráficos.
+
+Cada ponto de um `ft.LineChart` é um controle Flet serializado para o
+cliente, então séries longas (vários anos de preços diários) precisam ser
+reduzidas a um número fixo de pontos preservando os extremos visuais.
+"""
+
+from typing import List, Sequence
+
+import numpy as np
+
+
+# Número máximo de pontos por série em gráficos de linha
+MAX_CHART_POINTS = 150
+
+
+def lttb_indices(y: Sequence[float], threshold: int = MAX_CHART_POINTS) -> List[int]:
+    """Índices escolhidos pelo Largest-Triangle-Three-Buckets.
+
+    Assume x igualmente espaçado (um ponto por dia). O primeiro e o último
+    pontos e o mínimo e o máximo globais são sempre mantidos (o LTTB sozinho
+    pode descartá-los), então o resultado pode ter até `threshold + 2`
+    índices. Se a série já couber em `threshold`, todos os índices são
+    retornados.
+    """
+    values = np.asarray(y, dtype=float)
+    n = len(values)
+    if threshold >= n or threshold < 3:
+        return list(range(n))
+
+    x = np.arange(n, dtype=float)
+    # Limites dos buckets internos (exclui o primeiro e o último ponto)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+
+    selected = [0]
+    prev = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        if end <= start:
+            continue
+
+        # Média do próximo bucket (ou o último ponto, no bucket final)
+        if i + 2 < len(edges):
+            next_start, next_end = edges[i + 1], max(edges[i + 2], edges[i + 1] + 1)
+            avg_x = x[next_start:next_end].mean()
+            avg_y = values[next_start:next_end].mean()
+        else:
+            avg_x, avg_y = x[n - 1], values[n - 1]
+
+        bucket_x = x[start:end]
+        bucket_y = values[start:end]
+        areas = np.abs(
+            (x[prev] - avg_x) * (bucket_y - values[prev])
+            - (x[prev] - bucket_x) * (avg_y - values[prev])
+        )
+        prev = int(start + np.argmax(areas))
+        selected.append(prev)
+
+    selected.append(n - 1)
+    # Os extremos definem a escala do gráfico: nunca podem sumir
+    if not np.isnan(values).all():
+        selected.extend((int(np.nanargmin(values)), int(np.nanargmax(values))))
+    return sorted(set(selected))
+
+
+def minmax_indices(y: Sequence[float], threshold: int = MAX_CHART_POINTS) -> List[int]:
+    """Índices do mínimo e do máximo de cada bucket, em ordem cronológica.
+
+    Mais barato que o LTTB e garante que todo pico e vale apareça; usa até
+    `threshold` pontos (dois por bucket).
+    """
+    values = np.asarray(y, dtype=float)
+    n = len(values)
+    if threshold >= n or threshold < 2:
+        return list(range(n))
+
+    # Reserva o primeiro e o último ponto, sempre mantidos
+    buckets = max((threshold - 2) // 2, 1)
+    edges = np.linspace(0, n, buckets + 1).astype(int)
+    selected = set()
+    for start, end in zip(edges[:-1], edges[1:]):
+        if end <= start:
+            continue
+        bucket = values[start:end]
+        selected.add(int(start + np.nanargmin(bucket)))
+        selected.add(int(start + np.nanargmax(bucket)))
+    selected.update((0, n - 1))
+    return sorted(selected)
+
+
+def downsample_indices(
+    y: Sequence[float],
+    threshold: int = MAX_CHART_POINTS,
+    *,
+    method: str = "lttb",
+) -> List[int]:
+    """Índices a desenhar de uma série, pelo método `lttb` ou `minmax`."""
+    if method == "minmax":
+        return minmax_indices(y, threshold)
+    if method == "lttb":
+        return lttb_indices(y, threshold)
+    raise ValueError(f"Método de redução desconhecido: {method}")
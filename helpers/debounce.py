@@ -0,0 +1,43 @@
+"""Execução adiada de callbacks disparados em rajada (ex.: digitação).
+
+Cada chamada reinicia a contagem; o callback roda uma única vez, em uma
+thread de timer, `delay` segundos depois da última chamada, com os
+argumentos dela.
+"""
+
+import threading
+from typing import Any, Callable, Optional
+
+
+# Intervalo padrão entre a última tecla e a execução
+DEFAULT_DELAY = 0.25
+
+
+class Debouncer:
+    """Agrupa chamadas próximas em uma só execução do callback."""
+
+    def __init__(self, callback: Callable[..., Any], delay: float = DEFAULT_DELAY):
+        self.callback = callback
+        self.delay = delay
+        self._timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+
+    def __call__(self, *args: Any, **kwargs: Any) -> None:
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.delay, self.callback, args, kwargs)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def cancel(self) -> None:
+        """Descarta a execução pendente, se houver."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+    def flush(self, *args: Any, **kwargs: Any) -> None:
+        """Cancela a espera e executa o callback agora (ex.: Enter no campo)."""
+        self.cancel()
+        self.callback(*args, **kwargs)
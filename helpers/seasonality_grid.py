@@ -0,0 +1,230 @@
+"""Estado das grades de sazonalidade (uma linha por ano, 12 meses).
+
+Usado pelos formulários de sazonalidade de contrato e de condições
+comerciais da proposta. Cada ano guarda os campos escalares (preço, volume,
+...) e os meses em um vetor NumPy; o texto digitado é guardado como veio.
+
+A digitação só atualiza o estado. O que é derivado (hoje, a curva flat a
+partir do volume médio) é recalculado uma vez por pausa na digitação, e as
+células que o motor alterou são marcadas como sujas e escritas nos campos
+de uma vez só: `on_flush(controles)` recebe os campos alterados para um
+único envio à tela. Operações na grade inteira (copiar a primeira linha,
+limpar uma linha) também terminam em um único envio.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from helpers.debounce import DEFAULT_DELAY, Debouncer
+
+
+# Horas de cada mês (fevereiro com 28 dias)
+HOURS_PER_MONTH = np.array(
+    [744, 672, 744, 720, 744, 720, 744, 744, 720, 744, 720, 744],
+    dtype=float,
+)
+
+Cell = Tuple[int, str]
+
+
+def parse_number(text: Any) -> Optional[float]:
+    """Número digitado (aceita vírgula decimal); None se vazio ou inválido."""
+    if text is None:
+        return None
+    if isinstance(text, (int, float)):
+        return float(text)
+    try:
+        return float(str(text).strip().replace(",", ".")) if str(text).strip() else None
+    except ValueError:
+        return None
+
+
+def _format_month(value: float) -> str:
+    return "" if np.isnan(value) else f"{value:.2f}"
+
+
+class GridRow:
+    """Valores de um ano: escalares por nome e os 12 meses em um vetor."""
+
+    def __init__(self, fields: Sequence[str]):
+        self.values: Dict[str, Optional[float]] = {field: None for field in fields}
+        self.months = np.full(len(HOURS_PER_MONTH), np.nan)
+        # Texto de cada célula como aparece no campo
+        self.texts: Dict[str, str] = {}
+        self.flat = False
+
+
+class SeasonalityGrid:
+    """Motor de estado de uma grade de sazonalidade.
+
+    `fields` são os campos escalares de cada linha, `month_keys` os nomes
+    dos 12 meses e `volume_field` o campo cujo valor gera a curva flat.
+    Os campos de texto da tela são associados às células com `bind`.
+    """
+
+    def __init__(
+        self,
+        *,
+        fields: Sequence[str],
+        month_keys: Sequence[str],
+        volume_field: str,
+        on_flush: Callable[[List[Any]], None],
+        delay: float = DEFAULT_DELAY,
+    ):
+        self.fields = tuple(fields)
+        self.month_keys = tuple(month_keys)
+        self.volume_field = volume_field
+        self.on_flush = on_flush
+        self._month_index = {key: index for index, key in enumerate(self.month_keys)}
+        self._rows: Dict[int, GridRow] = {}
+        self._controls: Dict[Cell, Any] = {}
+        # Células alteradas pelo motor (não pelo usuário) ainda não escritas na tela
+        self._dirty: Set[Cell] = set()
+        # Anos com curva flat a recalcular na próxima pausa
+        self._pending_flat: Set[int] = set()
+        self._lock = threading.RLock()
+        self._debouncer = Debouncer(self.flush, delay)
+
+    # -- linhas ------------------------------------------------------------
+    def row(self, year: int) -> GridRow:
+        with self._lock:
+            row = self._rows.get(year)
+            if row is None:
+                row = self._rows[year] = GridRow(self.fields)
+            return row
+
+    def load(self, year: int, record: Mapping[str, Any]) -> None:
+        """Preenche o ano com valores vindos do banco (chaves = campos e meses)."""
+        with self._lock:
+            row = self.row(year)
+            for key in self.fields + self.month_keys:
+                value = record.get(key)
+                if value is not None:
+                    self._store(row, key, parse_number(value))
+                    row.texts[key] = str(value)
+
+    def text(self, year: int, key: str) -> str:
+        with self._lock:
+            return self.row(year).texts.get(key, "")
+
+    def is_flat(self, year: int) -> bool:
+        with self._lock:
+            return self.row(year).flat
+
+    def record(self, year: int) -> Dict[str, Optional[float]]:
+        """Valores numéricos do ano (campos e meses), prontos para gravar."""
+        self.flush()
+        with self._lock:
+            row = self.row(year)
+            data = dict(row.values)
+            for key, index in self._month_index.items():
+                value = row.months[index]
+                data[key] = None if np.isnan(value) else float(value)
+            return data
+
+    # -- campos da tela ----------------------------------------------------
+    def bind(self, year: int, key: str, control: Any) -> None:
+        """Associa o campo de texto que exibe a célula."""
+        with self._lock:
+            self._controls[(year, key)] = control
+
+    def unbind_all(self) -> None:
+        """Esquece os campos (ex.: a tabela foi montada de novo)."""
+        with self._lock:
+            self._controls.clear()
+            self._dirty.clear()
+
+    # -- edição ------------------------------------------------------------
+    def set_text(self, year: int, key: str, text: str) -> None:
+        """Registra o que o usuário digitou; derivados são recalculados na pausa."""
+        with self._lock:
+            row = self.row(year)
+            row.texts[key] = text or ""
+            self._store(row, key, parse_number(text))
+            if key == self.volume_field and row.flat:
+                self._pending_flat.add(year)
+                schedule = True
+            else:
+                schedule = False
+        if schedule:
+            self._debouncer()
+
+    def set_flat(self, year: int, flat: bool) -> None:
+        """Liga/desliga a curva flat do ano; ao ligar, os meses mudam na hora."""
+        with self._lock:
+            row = self.row(year)
+            row.flat = flat
+            if flat:
+                self._pending_flat.add(year)
+        if flat:
+            self.flush()
+
+    def copy_row(self, source_year: int, target_years: Iterable[int]) -> None:
+        """Copia campos e meses de um ano para os demais, em um único envio."""
+        with self._lock:
+            # A origem pode ter uma curva flat ainda não recalculada
+            if source_year in self._pending_flat:
+                self._apply_flat(source_year)
+                self._pending_flat.discard(source_year)
+            source = self.row(source_year)
+            for year in target_years:
+                if year == source_year:
+                    continue
+                row = self.row(year)
+                row.values = dict(source.values)
+                row.months = source.months.copy()
+                row.texts = dict(source.texts)
+                self._dirty.update((year, key) for key in self.fields + self.month_keys)
+        self.flush()
+
+    def clear_row(self, year: int) -> None:
+        """Esvazia campos e meses do ano."""
+        with self._lock:
+            self._rows[year] = GridRow(self.fields)
+            self._pending_flat.discard(year)
+            self._dirty.update((year, key) for key in self.fields + self.month_keys)
+        self.flush()
+
+    def flush(self) -> None:
+        """Aplica os recálculos pendentes e escreve as células sujas nos campos."""
+        self._debouncer.cancel()
+        with self._lock:
+            for year in self._pending_flat:
+                self._apply_flat(year)
+            self._pending_flat.clear()
+
+            changed = []
+            for year, key in sorted(self._dirty):
+                control = self._controls.get((year, key))
+                if control is None:
+                    continue
+                text = self._rows[year].texts.get(key, "")
+                if control.value != text:
+                    control.value = text
+                    changed.append(control)
+            self._dirty.clear()
+        if changed:
+            self.on_flush(changed)
+
+    # -- interno -------------------------------------------------------------
+    def _store(self, row: GridRow, key: str, value: Optional[float]) -> None:
+        index = self._month_index.get(key)
+        if index is None:
+            row.values[key] = value
+        else:
+            row.months[index] = np.nan if value is None else value
+
+    def _apply_flat(self, year: int) -> None:
+        row = self.row(year)
+        volume = row.values.get(self.volume_field)
+        if not row.flat or volume is None:
+            return
+        # Volume médio (MWm) x horas do mês = energia do mês (MWh)
+        row.months = volume * HOURS_PER_MONTH
+        for key, index in self._month_index.items():
+            row.texts[key] = _format_month(row.months[index])
+            self._dirty.add((year, key))
@@ -0,0 +1,99 @@
+"""Agrupamento das atualizações de interface em um envio por quadro.
+
+Cada `page.update()` / `control.update()` gera uma mensagem para o cliente
+Flet. Os handlers costumam alterar vários controles (e abrir um snackbar)
+em sequência; em vez de atualizar a cada passo, eles marcam o que mudou com
+`invalidate(...)` e o agendador envia tudo junto, uma única vez, `interval`
+segundos depois da primeira marcação.
+
+`invalidate()` sem argumentos pede a página inteira e absorve os controles
+marcados até então; com controles, só eles são enviados
+(`page.update(*controles)`, também em uma mensagem). Se o envio em lote
+falhar (ex.: um controle saiu da tela), os controles são reenviados um a
+um e só os que falharem são descartados.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Any, List, Optional
+
+import flet as ft
+
+
+DEBUG_PREFIX = "[UpdateScheduler]"
+
+# Duração de um "quadro": atualizações marcadas dentro dele saem juntas
+FRAME_INTERVAL = 1 / 60
+
+
+def _debug_print(message: str, *, data: Any | None = None) -> None:
+    print(f"{DEBUG_PREFIX} {message}")
+    if data is not None:
+        print(f"{DEBUG_PREFIX} -> {data}")
+
+
+class UpdateScheduler:
+    """Coleta controles alterados e os envia uma vez por quadro."""
+
+    def __init__(self, page: ft.Page, *, interval: float = FRAME_INTERVAL):
+        self.page = page
+        self.interval = interval
+        self._dirty: List[ft.Control] = []
+        self._full = False
+        self._timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+
+    def invalidate(self, *controls: ft.Control) -> None:
+        """Marca controles (ou, sem argumentos, a página) para o próximo envio."""
+        with self._lock:
+            if not controls:
+                self._full = True
+                self._dirty = []
+            elif not self._full:
+                for control in controls:
+                    if not any(control is dirty for dirty in self._dirty):
+                        self._dirty.append(control)
+            if self._timer is None:
+                self._timer = threading.Timer(self.interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self) -> None:
+        """Envia agora o que estiver marcado (ex.: antes de uma operação demorada)."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            full, dirty = self._full, self._dirty
+            self._full, self._dirty = False, []
+
+        if not full and not dirty:
+            return
+        try:
+            if full:
+                self.page.update()
+            else:
+                self.page.update(*dirty)
+            return
+        except Exception as exc:
+            # Ex.: controle que saiu da tela antes do envio
+            _debug_print(f"Falha ao atualizar a tela: {exc}")
+        if len(dirty) < 2:
+            return
+
+        # Reenvia um a um: só os controles com problema ficam de fora
+        dropped = 0
+        for control in dirty:
+            try:
+                self.page.update(control)
+            except Exception:
+                dropped += 1
+        _debug_print(f"Reenvio individual: {len(dirty) - dropped} ok, {dropped} descartado(s)")
+
+    def update_now(self) -> None:
+        """Atualiza a página inteira imediatamente, absorvendo o que estava pendente."""
+        with self._lock:
+            self._full = True
+            self._dirty = []
+        self.flush()
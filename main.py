@@ -1,4 +1,5 @@
 import flet as ft
+import multiprocessing
 import os
 
 from config.navigation import create_navigation
@@ -39,5 +40,9 @@ def main(page: ft.Page) -> None:
 
 
 if __name__ == "__main__":
+    # Necessário no executável congelado (Windows) para o pool de processos
+    # da geração de propostas em lote
+    multiprocessing.freeze_support()
+
     # Executa a aplicação Flet em modo desktop
     ft.app(target=main, view=ft.AppView.FLET_APP)
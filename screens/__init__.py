@@ -1,12 +1,90 @@
 from __future__ import annotations
 
+import threading
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Optional, TYPE_CHECKING
+from typing import Any, Callable, Dict, List, Optional, TYPE_CHECKING
 
 import flet as ft
 
 if TYPE_CHECKING:  # Evita dependência circular em tempo de execução
     from config.navigation import NavigationManager
+    from helpers.update_scheduler import UpdateScheduler
+
+
+DEBUG_PREFIX = "[BaseScreen]"
+
+
+def _debug_print(message: str, *, data: Any | None = None) -> None:
+    print(f"{DEBUG_PREFIX} {message}")
+    if data is not None:
+        print(f"{DEBUG_PREFIX} -> {data}")
+
+
+class DeferredLoad:
+    """Carga de dados em segundo plano para uma área da tela.
+
+    `loader` roda em uma thread (consultas ao banco, sem tocar em controles)
+    e `render` monta os controles definitivos a partir do resultado, que
+    substituem o esqueleto no container. Uma carga cancelada, porque o
+    usuário saiu da tela, descarta o resultado sem mexer na interface.
+    """
+
+    def __init__(
+        self,
+        container: ft.Container,
+        loader: Callable[[], Any],
+        render: Callable[[Any], ft.Control],
+    ) -> None:
+        self.container = container
+        self.loader = loader
+        self.render = render
+        self._cancelled = threading.Event()
+        self._done = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    @property
+    def done(self) -> bool:
+        """True quando o conteúdo definitivo (ou o erro) já está no container."""
+        return self._done.is_set()
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+
+    def start(self, updates: "UpdateScheduler") -> None:
+        threading.Thread(
+            target=self._run,
+            args=(updates,),
+            name="deferred-load",
+            daemon=True,
+        ).start()
+
+    def _run(self, updates: "UpdateScheduler") -> None:
+        try:
+            data = self.loader()
+            if self.cancelled:
+                return
+            content = self.render(data)
+        except Exception as exc:
+            _debug_print(f"Falha ao carregar dados: {exc}")
+            content = ft.Container(
+                padding=20,
+                content=ft.Text(
+                    f"Erro ao carregar dados: {exc}",
+                    size=14,
+                    color=ft.Colors.RED_600,
+                ),
+            )
+
+        if self.cancelled:
+            _debug_print("Carga descartada: a tela não está mais visível")
+            return
+        self.container.content = content
+        self._done.set()
+        # Áreas que terminam juntas vão para a tela no mesmo envio
+        updates.invalidate(self.container)
 
 
 class BaseScreen(ABC):
@@ -19,10 +97,31 @@ class BaseScreen(ABC):
     # Rota associada à tela. Deve ser sobrescrita nas subclasses.
     route: str = "/"
 
+    # Quando True, o NavigationManager guarda a árvore montada por
+    # (rota, parâmetros) e a reaproveita ao voltar para a mesma view.
+    cacheable: bool = False
+
     def __init__(self, page: ft.Page, navigation: "NavigationManager") -> None:
         self.page = page
         self.navigation = navigation
 
+    @classmethod
+    def is_cacheable(cls, params: Optional[Dict[str, Any]] = None) -> bool:
+        """Indica se a view montada com estes parâmetros pode ir para o cache.
+
+        As telas podem sobrescrever para excluir views específicas (ex.:
+        formulários, que devem abrir sempre limpos).
+        """
+        return cls.cacheable
+
+    @classmethod
+    def prefetch_keys(cls, params: Optional[Dict[str, Any]] = None) -> List[str]:
+        """Dados (chaves de `scripts.prefetch`) a pré-carregar quando esta view assenta.
+
+        Em geral, os dados das telas que o usuário tende a abrir em seguida.
+        """
+        return []
+
     @abstractmethod
     def create_header(self) -> ft.Control:
         """Cria o componente de cabeçalho da tela."""
@@ -56,3 +155,84 @@ class BaseScreen(ABC):
             spacing=0,
             expand=True,
         )
+
+    # ------------------------------------------------------------------
+    # Conteúdo carregado em segundo plano
+    # ------------------------------------------------------------------
+    def create_skeleton(self, lines: int = 4) -> ft.Control:
+        """Esqueleto exibido enquanto os dados de uma área carregam."""
+        widths = (None, 420, 520, 300)
+        return ft.Container(
+            padding=20,
+            content=ft.Column(
+                controls=[
+                    ft.Container(
+                        height=18,
+                        width=widths[i % len(widths)],
+                        bgcolor=ft.Colors.GREY_200,
+                        border_radius=6,
+                    )
+                    for i in range(lines)
+                ],
+                spacing=12,
+            ),
+        )
+
+    def defer_content(
+        self,
+        loader: Callable[[], Any],
+        render: Callable[[Any], ft.Control],
+        *,
+        placeholder: Optional[ft.Control] = None,
+        **container_kwargs: Any,
+    ) -> ft.Control:
+        """Devolve na hora um container com esqueleto e carrega os dados em uma thread.
+
+        Quando `loader()` retorna, o esqueleto é trocado por `render(dados)`.
+        A carga é registrada no NavigationManager, que a cancela se o usuário
+        navegar para outra tela antes do fim.
+        """
+        container = ft.Container(
+            content=placeholder or self.create_skeleton(),
+            **container_kwargs,
+        )
+        self.load_into(container, loader, render)
+        return container
+
+    def load_into(
+        self,
+        container: ft.Container,
+        loader: Callable[[], Any],
+        render: Callable[[Any], ft.Control],
+    ) -> DeferredLoad:
+        """Recarrega em segundo plano o conteúdo de um container já exibido.
+
+        O conteúdo atual fica na tela até `render(dados)` substituí-lo. A
+        carga devolvida pode ser cancelada (ex.: o filtro mudou de novo).
+        """
+        load = DeferredLoad(container, loader, render)
+        self.navigation.track_load(load)
+        load.start(self.navigation.updates)
+        return load
+
+    # ------------------------------------------------------------------
+    # Atualização da interface
+    # ------------------------------------------------------------------
+    def request_update(self, *controls: ft.Control) -> None:
+        """Agenda o envio dos controles alterados (sem argumentos, da página).
+
+        Use no lugar de `page.update()` / `control.update()`: as marcações
+        feitas dentro de um mesmo quadro saem em uma única mensagem.
+        """
+        self.navigation.updates.invalidate(*controls)
+
+    def flush_updates(self) -> None:
+        """Envia já o que foi marcado (ex.: antes de uma operação demorada)."""
+        self.navigation.updates.flush()
+
+    def show_snackbar(self, message: str, *, bgcolor: str = ft.Colors.GREEN_600) -> None:
+        """Abre um snackbar com a mensagem, no mesmo envio das demais alterações."""
+        snackbar = ft.SnackBar(content=ft.Text(message), bgcolor=bgcolor)
+        self.page.overlay.append(snackbar)
+        snackbar.open = True
+        self.request_update()
@@ -8,6 +8,7 @@ from helpers.storage import get_output_directory, prompt_folder_selection
 
 class BackofficeScreen(BaseScreen):
     route: str = "/backoffice"
+    cacheable: bool = True
 
     def create_header(self) -> ft.Control:
         return self._create_header_container()
@@ -57,7 +58,7 @@ class BackofficeScreen(BaseScreen):
         def on_change_folder(_):
             def on_selected(new_path: str):
                 dir_text.value = new_path
-                dir_text.update()
+                self.request_update(dir_text)
             
             prompt_folder_selection(self.page, on_selected=on_selected)
         
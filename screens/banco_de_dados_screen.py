@@ -7,6 +7,7 @@ from screens import BaseScreen
 
 class BancoDeDadosScreen(BaseScreen):
     route: str = "/banco_de_dados"
+    cacheable: bool = True
 
     def create_header(self) -> ft.Control:
         return self._create_header_container()
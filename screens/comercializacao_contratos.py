@@ -1,10 +1,14 @@
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Optional
 from datetime import datetime
 
 import flet as ft
 
+from helpers.debounce import Debouncer
 from scripts.comercializacao_service import list_contracts_for_table
+from scripts.contracts_index import ContractsIndex
+from scripts.prefetch import prefetched
 from scripts.database import delete_records
+from screens.virtual_table import TableColumn, VirtualTable
 
 
 def _format_date(value: Any) -> str:
@@ -28,239 +32,140 @@ def _format_date(value: Any) -> str:
 def _create_contracts_table(
     contracts: list[Dict[str, Any]],
     screen: Any,
-    buyer_value: str,
-    seller_value: str,
+    current_filters: Callable[[], Dict[str, str]],
 ) -> ft.Control:
-    headers = [
-        "Cód. Contrato",
-        "Comprador",
-        "Vendedor",
-        "Energia",
-        "Início",
-        "Fim",
-        "Editar",
-        "Sazo",
-        "Excluir",
-    ]
-
-    widths = [200, 220, 220, 150, 110, 110, 80, 80, 80]
-
-    def header_cell(text: str, width: int) -> ft.Control:
-        return ft.Container(
-            content=ft.Text(
-                text,
-                size=13,
-                weight=ft.FontWeight.BOLD,
-                color=ft.Colors.WHITE,
-                text_align=ft.TextAlign.CENTER,
-            ),
-            width=width,
-            height=44,
-            bgcolor=ft.Colors.BLUE_700,
-            padding=10,
-            alignment=ft.alignment.center,
-            border=ft.border.all(1, ft.Colors.BLUE_900),
-        )
-
-    def data_cell(text: str, width: int, row_index: int) -> ft.Control:
-        bg_color = ft.Colors.WHITE if row_index % 2 == 0 else ft.Colors.GREY_50
-        return ft.Container(
-            content=ft.Text(
-                text,
-                size=12,
-                color=ft.Colors.GREY_900,
-                text_align=ft.TextAlign.CENTER,
-            ),
-            width=width,
-            height=40,
-            bgcolor=bg_color,
-            padding=10,
-            alignment=ft.alignment.center,
-            border=ft.border.all(1, ft.Colors.GREY_300),
-        )
-
-    def action_button(
-        icon: str,
-        tooltip: str,
-        width: int,
-        row_index: int,
-        on_click,
-    ) -> ft.Control:
-        bg_color = ft.Colors.WHITE if row_index % 2 == 0 else ft.Colors.GREY_50
-        return ft.Container(
-            content=ft.IconButton(
-                icon=icon,
-                icon_color=ft.Colors.BLACK,
-                tooltip=tooltip,
-                on_click=on_click,
-            ),
-            width=width,
-            height=40,
-            bgcolor=bg_color,
-            alignment=ft.alignment.center,
-            border=ft.border.all(1, ft.Colors.GREY_300),
-        )
-
-    header_row = ft.Row(
-        controls=[header_cell(headers[i], widths[i]) for i in range(len(headers))],
-        spacing=0,
-    )
-
-    data_rows: list[ft.Control] = []
-    for idx, c in enumerate(contracts):
-        code = str(c.get("contract_code") or "-")
-        contractor = str(c.get("contractor") or "-")
-        seller = str(c.get("service_provider") or "-")
-        energy = str(c.get("energy_source_type") or "-")
-        start = _format_date(c.get("contract_start_date"))
-        end = _format_date(c.get("contract_end_date"))
-
-        def make_sazo_action(contract_data):
-            def handler(_):
-                print(f"DEBUG: Sazo clicked for {contract_data.get('id')}")
-                screen.navigation.go(
-                    "/comercializacao",
-                    params={
-                        "submenu": "contratos",
-                        "contracts_view": "sazo",
-                        "contract_id": str(contract_data.get("id") or ""),
-                        "start_date": str(contract_data.get("contract_start_date") or ""),
-                        "end_date": str(contract_data.get("contract_end_date") or ""),
-                        "buyer": buyer_value,
-                        "seller": seller_value,
-                    },
-                )
-            return handler
-
-        def make_edit_action(contract_data):
-            def handler(_):
-                print(f"DEBUG: Edit clicked for {contract_data.get('id')}")
+    """Tabela virtualizada de contratos (ordenável pelo cabeçalho).
+
+    `current_filters()` devolve o comprador/vendedor digitados no momento do
+    clique, para que as ações voltem à listagem com o mesmo filtro.
+    """
+
+    def make_sazo_action(contract_data):
+        def handler(_):
+            screen.navigation.go(
+                "/comercializacao",
+                params={
+                    "submenu": "contratos",
+                    "contracts_view": "sazo",
+                    "contract_id": str(contract_data.get("id") or ""),
+                    "start_date": str(contract_data.get("contract_start_date") or ""),
+                    "end_date": str(contract_data.get("contract_end_date") or ""),
+                    **current_filters(),
+                },
+            )
+        return handler
+
+    def make_edit_action(contract_data):
+        def handler(_):
+            screen.navigation.go(
+                "/comercializacao",
+                params={
+                    "submenu": "contratos",
+                    "contracts_view": "new",
+                    "contract_id": str(contract_data.get("id") or ""),
+                    **current_filters(),
+                },
+            )
+        return handler
+
+    def delete_contract(contract_id_val):
+        def on_confirm_delete(e):
+            try:
+                # 1. Excluir sazonalidades vinculadas
+                delete_records("contracts_seasonalities", {"contract_id": contract_id_val})
+                # 2. Excluir o contrato
+                delete_records("contracts", {"id": contract_id_val})
+                
+                # Fechar dialog
+                screen.page.close(dlg)
+                
+                # Feedback
+                screen.show_snackbar("✅ Contrato e dados vinculados excluídos com sucesso!")
+                
+                # Recarregar a página (contratos alimentam o portfólio também)
+                screen.navigation.invalidate("/comercializacao")
                 screen.navigation.go(
                     "/comercializacao",
                     params={
                         "submenu": "contratos",
-                        "contracts_view": "new",
-                        "contract_id": str(contract_data.get("id") or ""),
-                        "buyer": buyer_value,
-                        "seller": seller_value,
+                        **current_filters(),
                     },
                 )
-            return handler
-
-        def delete_contract(contract_id_val):
-            print(f"DEBUG: delete_contract called for {contract_id_val}")
-            
-            def on_confirm_delete(e):
-                print("DEBUG: on_confirm_delete called")
-                try:
-                    # 1. Excluir sazonalidades vinculadas
-                    delete_records("contracts_seasonalities", {"contract_id": contract_id_val})
-                    # 2. Excluir o contrato
-                    delete_records("contracts", {"id": contract_id_val})
-                    
-                    # Fechar dialog
-                    screen.page.close(dlg)
-                    
-                    # Feedback
-                    snackbar = ft.SnackBar(
-                        content=ft.Text("✅ Contrato e dados vinculados excluídos com sucesso!"),
-                        bgcolor=ft.Colors.GREEN_600,
-                    )
-                    screen.page.overlay.append(snackbar)
-                    snackbar.open = True
-                    screen.page.update()
-                    
-                    # Recarregar a página
-                    screen.navigation.go(
-                        "/comercializacao",
-                        params={
-                            "submenu": "contratos",
-                            "buyer": buyer_value,
-                            "seller": seller_value,
-                        },
-                    )
-                    
-                except Exception as ex:
-                    screen.page.close(dlg)
-                    print(f"Erro ao excluir contrato: {ex}")
-                    snackbar = ft.SnackBar(
-                        content=ft.Text(f"⚠ Erro ao excluir: {ex}"),
-                        bgcolor=ft.Colors.RED_600,
-                    )
-                    screen.page.overlay.append(snackbar)
-                    snackbar.open = True
-                    screen.page.update()
-
-            # Criar e abrir dialog de confirmação
-            dlg = ft.AlertDialog(
-                modal=True,
-                title=ft.Text("Confirmar Exclusão"),
-                content=ft.Text(
-                    "Tem certeza que deseja excluir este contrato?\n\n"
-                    "⚠ ATENÇÃO: Essa ação excluirá TODOS os dados do contrato, "
-                    "incluindo sazonalidades e registros financeiros.\n"
-                    "Essa ação é IRREVERSÍVEL.",
-                ),
-                actions=[
-                    ft.TextButton("Cancelar", on_click=lambda e: screen.page.close(dlg)),
-                    ft.TextButton(
-                        "Excluir Definitivamente",
-                        on_click=on_confirm_delete,
-                        style=ft.ButtonStyle(color=ft.Colors.RED_600),
-                    ),
-                ],
-                actions_alignment=ft.MainAxisAlignment.END,
-            )
-            screen.page.open(dlg)
-
-        row = ft.Row(
-            controls=[
-                data_cell(code, widths[0], idx),
-                data_cell(contractor, widths[1], idx),
-                data_cell(seller, widths[2], idx),
-                data_cell(energy, widths[3], idx),
-                data_cell(start, widths[4], idx),
-                data_cell(end, widths[5], idx),
-                action_button(
-                    ft.Icons.EDIT,
-                    "Editar contrato",
-                    widths[6],
-                    idx,
-                    make_edit_action(c),
-                ),
-                action_button(
-                    ft.Icons.CALENDAR_MONTH,
-                    "Editar sazonalidade",
-                    widths[7],
-                    idx,
-                    make_sazo_action(c),
-                ),
-                action_button(
-                    ft.Icons.DELETE,
-                    "Excluir contrato",
-                    widths[8],
-                    idx,
-                    lambda _: delete_contract(str(c.get("id") or "")),
+                
+            except Exception as ex:
+                screen.page.close(dlg)
+                print(f"Erro ao excluir contrato: {ex}")
+                screen.show_snackbar(f"⚠ Erro ao excluir: {ex}", bgcolor=ft.Colors.RED_600)
+
+        # Criar e abrir dialog de confirmação
+        dlg = ft.AlertDialog(
+            modal=True,
+            title=ft.Text("Confirmar Exclusão"),
+            content=ft.Text(
+                "Tem certeza que deseja excluir este contrato?\n\n"
+                "⚠ ATENÇÃO: Essa ação excluirá TODOS os dados do contrato, "
+                "incluindo sazonalidades e registros financeiros.\n"
+                "Essa ação é IRREVERSÍVEL.",
+            ),
+            actions=[
+                ft.TextButton("Cancelar", on_click=lambda e: screen.page.close(dlg)),
+                ft.TextButton(
+                    "Excluir Definitivamente",
+                    on_click=on_confirm_delete,
+                    style=ft.ButtonStyle(color=ft.Colors.RED_600),
                 ),
             ],
-            spacing=0,
+            actions_alignment=ft.MainAxisAlignment.END,
+        )
+        screen.page.open(dlg)
+
+    def action_button(icon: str, tooltip: str, on_click) -> ft.Control:
+        return ft.IconButton(
+            icon=icon,
+            icon_color=ft.Colors.BLACK,
+            tooltip=tooltip,
+            on_click=on_click,
         )
-        data_rows.append(row)
-
-    total_width = sum(widths)
 
-    table_column = ft.Column(
-        controls=[header_row] + data_rows,
-        spacing=0,
-        scroll=ft.ScrollMode.AUTO,
-    )
+    def field(name: str):
+        return lambda c: c.get(name)
+
+    columns = [
+        TableColumn("Cód. Contrato", 200, text=lambda c: str(c.get("contract_code") or "-"), sort_key=field("contract_code")),
+        TableColumn("Comprador", 220, text=lambda c: str(c.get("contractor") or "-"), sort_key=field("contractor")),
+        TableColumn("Vendedor", 220, text=lambda c: str(c.get("service_provider") or "-"), sort_key=field("service_provider")),
+        TableColumn("Energia", 150, text=lambda c: str(c.get("energy_source_type") or "-"), sort_key=field("energy_source_type")),
+        TableColumn("Início", 110, text=lambda c: _format_date(c.get("contract_start_date")), sort_key=field("contract_start_date")),
+        TableColumn("Fim", 110, text=lambda c: _format_date(c.get("contract_end_date")), sort_key=field("contract_end_date")),
+        TableColumn(
+            "Editar",
+            80,
+            cell=lambda c, _: action_button(ft.Icons.EDIT, "Editar contrato", make_edit_action(c)),
+            padding=0,
+        ),
+        TableColumn(
+            "Sazo",
+            80,
+            cell=lambda c, _: action_button(ft.Icons.CALENDAR_MONTH, "Editar sazonalidade", make_sazo_action(c)),
+            padding=0,
+        ),
+        TableColumn(
+            "Excluir",
+            80,
+            cell=lambda c, _: action_button(
+                ft.Icons.DELETE,
+                "Excluir contrato",
+                lambda _: delete_contract(str(c.get("id") or "")),
+            ),
+            padding=0,
+        ),
+    ]
 
-    return ft.Container(
-        content=table_column,
-        width=total_width,
-        border=ft.border.all(1, ft.Colors.GREY_300),
-        border_radius=8,
-        bgcolor=ft.Colors.WHITE,
+    return VirtualTable(
+        columns,
+        contracts,
+        request_update=screen.request_update,
+        empty_message="Nenhum contrato encontrado.",
     )
 
 
@@ -269,51 +174,67 @@ def create_contratos_content(
     buyer_filter: Optional[str],
     seller_filter: Optional[str],
 ) -> ft.Control:
-    """Conteúdo da aba Contratos com tabela em container e scroll."""
-    buyer_value = (buyer_filter or "").strip()
-    seller_value = (seller_filter or "").strip()
+    """Conteúdo da aba Contratos com tabela em container e scroll.
 
-    contracts = list_contracts_for_table()
-
-    def matches_filters(c: Dict[str, Any]) -> bool:
-        contractor = str(c.get("contractor") or "")
-        seller = str(c.get("service_provider") or "")
-        if buyer_value and buyer_value.lower() not in contractor.lower():
-            return False
-        if seller_value and seller_value.lower() not in seller.lower():
-            return False
-        return True
-
-    filtered_contracts = [c for c in contracts if matches_filters(c)]
+    Filtros e botões aparecem na hora; os contratos são baixados uma vez em
+    segundo plano e, a partir daí, a busca filtra o índice em memória
+    enquanto o usuário digita, redesenhando só o corpo da tabela.
+    """
+    state: Dict[str, Any] = {"index": None, "table": None}
 
     buyer_field = ft.TextField(
         label="Comprador",
         prefix_icon=ft.Icons.SEARCH,
         width=260,
-        value=buyer_value,
+        value=(buyer_filter or "").strip(),
     )
 
     seller_field = ft.TextField(
         label="Vendedor",
         prefix_icon=ft.Icons.SEARCH,
         width=260,
-        value=seller_value,
+        value=(seller_filter or "").strip(),
     )
 
-    def apply_filters(_: ft.ControlEvent) -> None:
-        screen.navigation.go(
-            "/comercializacao",
-            params={
-                "submenu": "contratos",
-                "buyer": buyer_field.value,
-                "seller": seller_field.value,
-            },
+    def current_filters() -> Dict[str, str]:
+        return {
+            "buyer": (buyer_field.value or "").strip(),
+            "seller": (seller_field.value or "").strip(),
+        }
+
+    def load_index() -> ContractsIndex:
+        return ContractsIndex(prefetched("contracts", list_contracts_for_table))
+
+    def create_table(index: ContractsIndex) -> ft.Control:
+        state["index"] = index
+        state["table"] = _create_contracts_table(
+            index.filter(**current_filters()),
+            screen,
+            current_filters,
+        )
+        return ft.Row(
+            controls=[state["table"]],
+            scroll=ft.ScrollMode.ALWAYS,
         )
 
-    # Enter nos campos dispara a mesma ação do botão Pesquisar
+    def refresh_table() -> None:
+        index, table = state["index"], state["table"]
+        if index is None or table is None:
+            # Ainda carregando: create_table já usa o texto atual dos campos
+            return
+        table.set_rows(index.filter(**current_filters()))
+        screen.request_update(table)
+
+    # Filtra enquanto digita, uma vez por pausa; Enter e o botão filtram na hora
+    debounced_refresh = Debouncer(refresh_table)
+
+    def apply_filters(_: ft.ControlEvent) -> None:
+        debounced_refresh.flush()
+
+    buyer_field.on_change = lambda _: debounced_refresh()
+    seller_field.on_change = lambda _: debounced_refresh()
     buyer_field.on_submit = apply_filters
     seller_field.on_submit = apply_filters
-
     filters_row = ft.Row(
         controls=[buyer_field, seller_field],
         spacing=16,
@@ -368,8 +289,6 @@ def create_contratos_content(
         alignment=ft.MainAxisAlignment.START,
     )
 
-    table = _create_contracts_table(filtered_contracts, screen, buyer_value, seller_value)
-
     return ft.Container(
         expand=True,
         padding=20,
@@ -379,10 +298,7 @@ def create_contratos_content(
                 ft.Container(height=12),
                 actions_row,
                 ft.Container(height=16),
-                ft.Row(
-                    controls=[table],
-                    scroll=ft.ScrollMode.ALWAYS,
-                ),
+                screen.defer_content(load_index, create_table),
             ],
             spacing=6,
             alignment=ft.MainAxisAlignment.START,
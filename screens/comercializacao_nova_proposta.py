@@ -2,10 +2,9 @@ from typing import Any, Dict, Optional, List
 from datetime import datetime
 import flet as ft
 import requests
+from helpers.seasonality_grid import SeasonalityGrid
 from scripts.database import create_record, read_records, update_record, delete_records
 
-# Constantes de horas por mês (simplificado)
-HOURS_PER_MONTH = [744, 672, 744, 720, 744, 720, 744, 744, 720, 744, 720, 744]
 MESES_KEYS = ["january", "february", "march", "april", "may", "june", "july", "august", "september", "october", "november", "december"]
 MESES_LABELS = ["Jan", "Fev", "Mar", "Abr", "Mai", "Jun", "Jul", "Ago", "Set", "Out", "Nov", "Dez"]
 
@@ -132,7 +131,6 @@ def create_nova_proposta_content(screen: Any, proposal_id: Optional[str] = None)
         "qty_meses": "2", # Default
         "data_base": datetime.now().strftime("%m/%Y"), # Default
         "validade_proposta": datetime.now().strftime("%d/%m/%Y 18:00"), # Default
-        "commercial_conditions": {} 
     }
     
     # Referências para a tabela comercial
@@ -165,7 +163,7 @@ def create_nova_proposta_content(screen: Any, proposal_id: Optional[str] = None)
             e.control.error_text = None
             e.control.border_color = None
         
-        e.control.update()
+        screen.request_update(e.control)
 
     # --- Helpers de Data (Range) ---
     def _get_years_range(start_str: str, end_str: str) -> List[int]:
@@ -197,89 +195,41 @@ def create_nova_proposta_content(screen: Any, proposal_id: Optional[str] = None)
             border_color=ft.Colors.GREY_400,
         )
 
-    def atualizar_dados_comerciais(ano, campo, valor):
-        if ano not in form_data["commercial_conditions"]:
-            form_data["commercial_conditions"][ano] = {}
-        
-        try:
-            if campo in ["price", "flex", "sazo", "volume"] or campo in MESES_KEYS:
-                val_str = str(valor).replace(',', '.')
-                val_float = float(val_str) if val_str else None
-                form_data["commercial_conditions"][ano][campo] = val_float
-                
-                if campo == "volume":
-                    row_ref = next((r for r in commercial_rows_refs if r['ano'] == ano), None)
-                    if row_ref and row_ref['flat'].value:
-                         aplicar_flat(ano, row_ref, val_float)
-            else:
-                form_data["commercial_conditions"][ano][campo] = valor
-        except ValueError:
-             form_data["commercial_conditions"][ano][campo] = None
+    # Grade numérica das condições comerciais: a digitação só guarda o
+    # valor; a curva flat e as cópias chegam aos campos em um único envio
+    grade_comercial = SeasonalityGrid(
+        fields=("price", "flex", "sazo", "volume"),
+        month_keys=MESES_KEYS,
+        volume_field="volume",
+        on_flush=lambda campos: screen.request_update(*campos),
+    )
 
-    def aplicar_flat(ano, row_ref, vol_medio):
-        if vol_medio is None:
-            return
-        for idx, mes_key in enumerate(MESES_KEYS):
-            horas = HOURS_PER_MONTH[idx]
-            valor_mes = vol_medio * horas
-            form_data["commercial_conditions"][ano][mes_key] = valor_mes
-            if idx < len(row_ref['meses']):
-                row_ref['meses'][idx].value = f"{valor_mes:.2f}"
-        screen.page.update()
+    def atualizar_dados_comerciais(ano, campo, valor):
+        grade_comercial.set_text(ano, campo, valor)
 
     def on_flat_change(e, ano):
-        is_flat = e.control.value
-        if is_flat:
-            vol_medio = form_data["commercial_conditions"].get(ano, {}).get("volume")
-            row_ref = next((r for r in commercial_rows_refs if r['ano'] == ano), None)
-            if row_ref:
-                aplicar_flat(ano, row_ref, vol_medio)
+        grade_comercial.set_flat(ano, e.control.value)
 
     def copiar_primeira_linha(e):
         if len(commercial_rows_refs) < 2:
             return
-        
-        first_row = commercial_rows_refs[0]
-        ano_origem = first_row['ano']
-        dados_origem = form_data["commercial_conditions"].get(ano_origem, {})
 
-        for i in range(1, len(commercial_rows_refs)):
-            row = commercial_rows_refs[i]
-            ano_destino = row['ano']
-            
-            # Copiar UI
-            row['preco'].value = first_row['preco'].value
-            row['flex'].value = first_row['flex'].value
-            row['sazo'].value = first_row['sazo'].value
-            row['volume'].value = first_row['volume'].value
-            
-            for j in range(12):
-                row['meses'][j].value = first_row['meses'][j].value
-            
-            # Copiar Dados
-            if ano_destino not in form_data["commercial_conditions"]:
-                form_data["commercial_conditions"][ano_destino] = {}
-            
-            for k, v in dados_origem.items():
-                form_data["commercial_conditions"][ano_destino][k] = v
-        
-        screen.page.update()
-        
-        snackbar = ft.SnackBar(ft.Text("Dados replicados com sucesso!"), bgcolor=ft.Colors.GREEN_600)
-        screen.page.overlay.append(snackbar)
-        snackbar.open = True
-        screen.page.update()
+        ano_origem = commercial_rows_refs[0]['ano']
+        grade_comercial.copy_row(ano_origem, [row['ano'] for row in commercial_rows_refs[1:]])
+        # Linhas copiadas e snackbar saem no mesmo envio
+        screen.show_snackbar("Dados replicados com sucesso!")
 
     commercial_tab_content = ft.Container(padding=10) 
     
     def gerar_tabela_comercial():
         commercial_rows_refs.clear()
+        grade_comercial.unbind_all()
         years = _get_years_range(inicio_suprimento_field.value, fim_suprimento_field.value)
         
         if not years:
             # Se não tiver anos válidos, limpa a tabela ou mostra mensagem
             commercial_tab_content.content = ft.Text("Preencha o período de suprimento corretamente na aba 'Dados Gerais'.", color=ft.Colors.RED_500)
-            commercial_tab_content.update()
+            screen.request_update(commercial_tab_content)
             return
 
         # Cabeçalho
@@ -303,21 +253,21 @@ def create_nova_proposta_content(screen: Any, proposal_id: Optional[str] = None)
         for idx, ano in enumerate(years):
             refs = {'ano': ano}
             
-            # Recuperar dados existentes do form_data
-            dados_ano = form_data["commercial_conditions"].get(ano, {})
-            
-            # Campos
-            preco = criar_campo_tabela(80, value=dados_ano.get('price'), on_change=lambda e, a=ano: atualizar_dados_comerciais(a, 'price', e.control.value))
-            flex = criar_campo_tabela(80, value=dados_ano.get('flex'), on_change=lambda e, a=ano: atualizar_dados_comerciais(a, 'flex', e.control.value))
-            sazo = criar_campo_tabela(80, value=dados_ano.get('sazo'), on_change=lambda e, a=ano: atualizar_dados_comerciais(a, 'sazo', e.control.value))
-            vol = criar_campo_tabela(80, value=dados_ano.get('volume'), on_change=lambda e, a=ano: atualizar_dados_comerciais(a, 'volume', e.control.value))
-            flat = ft.Switch(value=False, height=30, active_color=ft.Colors.ORANGE_600, on_change=lambda e, a=ano: on_flat_change(e, a))
+            # Campos (com o que já foi digitado ou carregado para o ano)
+            preco = criar_campo_tabela(80, value=grade_comercial.text(ano, 'price'), on_change=lambda e, a=ano: atualizar_dados_comerciais(a, 'price', e.control.value))
+            flex = criar_campo_tabela(80, value=grade_comercial.text(ano, 'flex'), on_change=lambda e, a=ano: atualizar_dados_comerciais(a, 'flex', e.control.value))
+            sazo = criar_campo_tabela(80, value=grade_comercial.text(ano, 'sazo'), on_change=lambda e, a=ano: atualizar_dados_comerciais(a, 'sazo', e.control.value))
+            vol = criar_campo_tabela(80, value=grade_comercial.text(ano, 'volume'), on_change=lambda e, a=ano: atualizar_dados_comerciais(a, 'volume', e.control.value))
+            flat = ft.Switch(value=grade_comercial.is_flat(ano), height=30, active_color=ft.Colors.ORANGE_600, on_change=lambda e, a=ano: on_flat_change(e, a))
             
             refs.update({'preco': preco, 'flex': flex, 'sazo': sazo, 'volume': vol, 'flat': flat, 'meses': []})
+            for campo, control in (('price', preco), ('flex', flex), ('sazo', sazo), ('volume', vol)):
+                grade_comercial.bind(ano, campo, control)
             
             meses_controls = []
             for mk in MESES_KEYS:
-                mc = criar_campo_tabela(70, value=dados_ano.get(mk), on_change=lambda e, a=ano, k=mk: atualizar_dados_comerciais(a, k, e.control.value))
+                mc = criar_campo_tabela(70, value=grade_comercial.text(ano, mk), on_change=lambda e, a=ano, k=mk: atualizar_dados_comerciais(a, k, e.control.value))
+                grade_comercial.bind(ano, mk, mc)
                 meses_controls.append(mc)
                 refs['meses'].append(mc)
 
@@ -337,7 +287,7 @@ def create_nova_proposta_content(screen: Any, proposal_id: Optional[str] = None)
             commercial_rows_refs.append(refs)
 
         commercial_tab_content.content = ft.Column(controls=rows_controls, spacing=5, scroll=ft.ScrollMode.ALWAYS)
-        commercial_tab_content.update()
+        screen.request_update(commercial_tab_content)
 
     def on_date_change(e):
         valor = ''.join(filter(str.isdigit, e.control.value))
@@ -365,7 +315,7 @@ def create_nova_proposta_content(screen: Any, proposal_id: Optional[str] = None)
             e.control.error_text = None
             e.control.border_color = None
             
-        e.control.update()
+        screen.request_update(e.control)
 
     # --- Aba 1: Dados Gerais ---
     cnpj_field = ft.TextField(
@@ -522,14 +472,14 @@ def create_nova_proposta_content(screen: Any, proposal_id: Optional[str] = None)
                 for s in sazo_data:
                     ano = s.get("year")
                     if ano:
-                        form_data["commercial_conditions"][ano] = {
+                        grade_comercial.load(ano, {
                             "price": s.get("price"),
                             "flex": s.get("flex"),
                             "sazo": s.get("seasonality"),
                             "volume": s.get("average_volume"),
                             # Meses
                             **{k: s.get(k) for k in MESES_KEYS}
-                        }
+                        })
                 
                 # Gerar tabela com os dados carregados
                 gerar_tabela_comercial()
@@ -549,10 +499,7 @@ def create_nova_proposta_content(screen: Any, proposal_id: Optional[str] = None)
         ]
         for field, name in required_fields:
             if not field.value:
-                snackbar = ft.SnackBar(ft.Text(f"Campo obrigatório: {name}"), bgcolor=ft.Colors.RED_600)
-                screen.page.overlay.append(snackbar)
-                snackbar.open = True
-                screen.page.update()
+                screen.show_snackbar(f"Campo obrigatório: {name}", bgcolor=ft.Colors.RED_600)
                 return
 
         try:
@@ -612,7 +559,7 @@ def create_nova_proposta_content(screen: Any, proposal_id: Optional[str] = None)
             years = _get_years_range(inicio_suprimento_field.value, fim_suprimento_field.value)
             
             for ano in years:
-                dados_ano = form_data["commercial_conditions"].get(ano, {})
+                dados_ano = grade_comercial.record(ano)
                 
                 sazo_payload = {
                     "proposal_id": current_proposal_id,
@@ -636,19 +583,14 @@ def create_nova_proposta_content(screen: Any, proposal_id: Optional[str] = None)
             except:
                 pass
 
-            snackbar = ft.SnackBar(ft.Text("Proposta salva com sucesso!"), bgcolor=ft.Colors.GREEN_600)
-            screen.page.overlay.append(snackbar)
-            snackbar.open = True
-            screen.page.update()
+            screen.show_snackbar("Proposta salva com sucesso!")
             
+            screen.navigation.invalidate("/comercializacao", {"submenu": "propostas"})
             screen.navigation.go("/comercializacao", params={"submenu": "propostas"})
 
         except Exception as ex:
             print(f"[ERROR] Erro ao salvar proposta: {ex}")
-            snackbar = ft.SnackBar(ft.Text(f"Erro ao salvar: {str(ex)}"), bgcolor=ft.Colors.RED_600)
-            screen.page.overlay.append(snackbar)
-            snackbar.open = True
-            screen.page.update()
+            screen.show_snackbar(f"Erro ao salvar: {str(ex)}", bgcolor=ft.Colors.RED_600)
             
             # Tenta logar erro se tiver ID
             if 'current_proposal_id' in locals() and current_proposal_id:
@@ -684,7 +626,7 @@ def create_nova_proposta_content(screen: Any, proposal_id: Optional[str] = None)
         status_button.text = get_status_button_text(new_status)
         status_button.bgcolor = get_status_button_color(new_status)
         status_button.icon = get_status_button_icon(new_status)
-        status_button.update()
+        screen.request_update(status_button)
 
     status_button.on_click = toggle_status
 
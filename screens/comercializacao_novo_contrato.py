@@ -5,7 +5,9 @@ from datetime import datetime
 
 import flet as ft
 
+from scripts.comercializacao_service import list_traders
 from scripts.database import read_records, create_record, update_record
+from scripts.prefetch import prefetched
 
 
 def _parse_date_br(value: str) -> Optional[str]:
@@ -57,7 +59,7 @@ def create_novo_contrato_content(
     print(f"[{title_text}] Carregando formulário...")
 
     # Carrega lista de traders do banco para popular o dropdown
-    traders_db = read_records("traders", filters=None)
+    traders_db = prefetched("traders", list_traders)
     # Ordena por nome para facilitar a busca visual
     traders_db.sort(key=lambda t: (t.get("name") or "").lower())
 
@@ -107,7 +109,7 @@ def create_novo_contrato_content(
 
     def _sync_prestador(e: ft.ControlEvent) -> None:
         prestador_field.value = comercializadora_dd.value or ""
-        prestador_field.update()
+        screen.request_update(prestador_field)
 
     comercializadora_dd.on_change = _sync_prestador
 
@@ -447,25 +449,14 @@ def create_novo_contrato_content(
             
             print(f"[{title_text}] Sucesso.")
             
-            snackbar = ft.SnackBar(
-                content=ft.Text(msg),
-                bgcolor=ft.Colors.GREEN_600,
-            )
-            screen.page.overlay.append(snackbar)
-            snackbar.open = True
-            screen.page.update()
+            screen.show_snackbar(msg)
             
+            screen.navigation.invalidate("/comercializacao")
             _go_back()
         except Exception as e:
             print(f"[{title_text}] Erro ao salvar: {e}")
             
-            snackbar = ft.SnackBar(
-                content=ft.Text(f"Erro ao salvar: {e}"),
-                bgcolor=ft.Colors.RED_600,
-            )
-            screen.page.overlay.append(snackbar)
-            snackbar.open = True
-            screen.page.update()
+            screen.show_snackbar(f"Erro ao salvar: {e}", bgcolor=ft.Colors.RED_600)
 
     def on_cancel(_: ft.ControlEvent) -> None:
         print(f"[{title_text}] Operação cancelada pelo usuário")
@@ -6,7 +6,11 @@ import pandas as pd
 import base64
 import io
 
-from scripts.database import read_records, create_record, delete_records
+from scripts.comercializacao_service import list_traders
+from scripts.database import read_records
+from scripts.derived_prices import STORE_DERIVED_PRICES, apply_derived_to_grid
+from scripts.energy_prices_service import flatten_price_grid, save_price_snapshot
+from scripts.prefetch import prefetched
 
 def create_novo_preco_content(screen: Any) -> ft.Control:
     """
@@ -40,7 +44,7 @@ def create_novo_preco_content(screen: Any) -> ft.Control:
     # --- Componentes de Configuração (Trader e Data) ---
     
     # Carregar traders
-    traders_db = read_records("traders", filters=None)
+    traders_db = prefetched("traders", list_traders)
     traders_db.sort(key=lambda t: (t.get("name") or "").lower())
     
     trader_options = [ft.dropdown.Option(key=str(t["id"]), text=t["name"]) for t in traders_db if t.get("id") and t.get("name")]
@@ -76,7 +80,7 @@ def create_novo_preco_content(screen: Any) -> ft.Control:
         if date_picker.value:
             selected_date = date_picker.value.date()
             date_button.text = selected_date.strftime("%d/%m/%Y")
-            date_button.update()
+            screen.request_update(date_button)
             
     date_picker.on_change = on_date_change
 
@@ -84,7 +88,7 @@ def create_novo_preco_content(screen: Any) -> ft.Control:
         configure_locale(screen.page)
         if date_picker not in screen.page.overlay:
             screen.page.overlay.append(date_picker)
-            screen.page.update()
+            screen.request_update()
         screen.page.open(date_picker)
     
     date_button = ft.ElevatedButton(
@@ -298,26 +302,17 @@ def create_novo_preco_content(screen: Any) -> ft.Control:
                         print(f"Erro ao ler linha: {ex}")
                         continue
 
-            # --- Lógica de Cálculo para I1 e CQ5 ---
-            # I1 = I5 + 170
-            # CQ5 = I5 - 2
-            
-            for ano in anos:
-                if ano not in dados_lidos:
-                    dados_lidos[ano] = {}
-                
-                for sub in submercados:
-                    # Verifica se temos I5
-                    i5_val = dados_lidos[ano].get((sub, "I5"))
-                    
-                    if i5_val is not None:
-                        # Calcular I1 se não existir
-                        if (sub, "I1") not in dados_lidos[ano]:
-                            dados_lidos[ano][(sub, "I1")] = i5_val + 170.0
-                        
-                        # Calcular CQ5 se não existir
-                        if (sub, "CQ5") not in dados_lidos[ano]:
-                            dados_lidos[ano][(sub, "CQ5")] = i5_val - 2.0
+            # --- Produtos derivados (I1, CQ5, ...) ---
+            # Calculados pelas regras de scripts/derived_prices.py; com
+            # STORE_DERIVED_PRICES desligado, ficam para o momento da consulta.
+            if STORE_DERIVED_PRICES:
+                grade = apply_derived_to_grid(
+                    flatten_price_grid(dados_lidos),
+                    trader_id=trader_dd.value,
+                )
+                dados_lidos = {}
+                for (ano, sub, tipo), valor in grade.items():
+                    dados_lidos.setdefault(ano, {})[(sub, tipo)] = valor
 
             # Atualizar UI e form_data
             count_updates = 0
@@ -335,24 +330,12 @@ def create_novo_preco_content(screen: Any) -> ft.Control:
                         field_refs[(ano, sub, tipo)].value = f"{valor:.2f}".replace('.', ',')
                         count_updates += 1
             
-            screen.page.update()
-            
-            snackbar = ft.SnackBar(
-                content=ft.Text(f"Importação concluída! {count_updates} campos atualizados."),
-                bgcolor=ft.Colors.GREEN_600,
-            )
-            screen.page.overlay.append(snackbar)
-            snackbar.open = True
-            screen.page.update()
+            # Campos e snackbar vão para a tela em um único envio
+            screen.request_update()
+            screen.show_snackbar(f"Importação concluída! {count_updates} campos atualizados.")
 
         except Exception as ex:
-            snackbar = ft.SnackBar(
-                content=ft.Text(f"Erro ao processar arquivo: {ex}"),
-                bgcolor=ft.Colors.RED_600,
-            )
-            screen.page.overlay.append(snackbar)
-            snackbar.open = True
-            screen.page.update()
+            screen.show_snackbar(f"Erro ao processar arquivo: {ex}", bgcolor=ft.Colors.RED_600)
 
     file_picker = ft.FilePicker(on_result=on_file_result)
     screen.page.overlay.append(file_picker)
@@ -363,72 +346,43 @@ def create_novo_preco_content(screen: Any) -> ft.Control:
         
         # Validação
         if not trader_dd.value:
-            snackbar = ft.SnackBar(
-                content=ft.Text("Selecione uma comercializadora!"),
-                bgcolor=ft.Colors.RED_600,
-            )
-            screen.page.overlay.append(snackbar)
-            snackbar.open = True
-            screen.page.update()
+            screen.show_snackbar("Selecione uma comercializadora!", bgcolor=ft.Colors.RED_600)
             return
 
         trader_id = trader_dd.value
         snapshot_date_str = selected_date.isoformat()
         
-        # Função interna para realizar o salvamento (com ou sem deleção prévia)
+        # Função interna para realizar o salvamento (novo snapshot ou sobrescrita)
         def perform_save(old_snapshot_id=None):
             try:
-                if old_snapshot_id:
-                    print(f"Deletando snapshot antigo: {old_snapshot_id}")
-                    # Primeiro deletar preços associados (por segurança)
-                    delete_records("energy_prices", {"snapshot_id": old_snapshot_id})
-                    # Depois deletar o snapshot
-                    delete_records("energy_price_snapshots", {"id": old_snapshot_id})
-                
-                # 1. Criar Snapshot
-                snapshot_data = {
-                    "trader_id": trader_id,
-                    "snapshot_date": snapshot_date_str
-                }
-                
-                print(f"Criando snapshot: {snapshot_data}")
-                snapshot_res = create_record("energy_price_snapshots", snapshot_data)
-                
-                if not snapshot_res:
-                    raise Exception("Falha ao criar snapshot.")
-                    
-                snapshot_id = snapshot_res[0]["id"]
-                print(f"Snapshot criado: {snapshot_id}")
-                
-                # 2. Inserir Preços
-                prices_to_insert = []
-                for ano, dados_ano in form_data.items():
-                    for (sub, tipo), valor in dados_ano.items():
-                        if valor is not None:
-                            prices_to_insert.append({
-                                "snapshot_id": snapshot_id,
-                                "year": ano,
-                                "energy_type": tipo,
-                                "submarket": sub,
-                                "price": valor
-                            })
-                
-                if prices_to_insert:
-                    print(f"Inserindo {len(prices_to_insert)} preços...")
-                    BATCH_SIZE = 1000
-                    for i in range(0, len(prices_to_insert), BATCH_SIZE):
-                        batch = prices_to_insert[i:i + BATCH_SIZE]
-                        create_record("energy_prices", batch)
+                # Sobrescrita grava apenas as células alteradas (diff), sem
+                # excluir o snapshot existente
+                grid = flatten_price_grid(form_data)
+                if STORE_DERIVED_PRICES:
+                    # Células derivadas nunca editadas são preenchidas pelas
+                    # regras; as que o usuário apagou continuam vazias
+                    apagadas = [
+                        (ano, sub, tipo)
+                        for ano, dados_ano in form_data.items()
+                        for (sub, tipo), valor in dados_ano.items()
+                        if valor is None
+                    ]
+                    grid = apply_derived_to_grid(grid, trader_id=trader_id, keep_blank=apagadas)
+                print(f"Salvando {len(grid)} preços (snapshot existente: {old_snapshot_id})")
+                result = save_price_snapshot(
+                    trader_id,
+                    snapshot_date_str,
+                    grid,
+                    snapshot_id=old_snapshot_id,
+                )
                 
-                snackbar = ft.SnackBar(
-                    content=ft.Text(f"Sucesso! {len(prices_to_insert)} preços salvos."),
-                    bgcolor=ft.Colors.GREEN_600,
+                screen.show_snackbar(
+                    f"Sucesso! {result['written']} preços gravados, "
+                    f"{result['deleted']} removidos, {result['unchanged']} sem alteração."
                 )
-                screen.page.overlay.append(snackbar)
-                snackbar.open = True
-                screen.page.update()
                 
                 # Voltar para a tela anterior
+                screen.navigation.invalidate("/comercializacao")
                 screen.navigation.go(
                     "/comercializacao",
                     params={"submenu": "precos"},
@@ -436,13 +390,7 @@ def create_novo_preco_content(screen: Any) -> ft.Control:
                 
             except Exception as ex:
                 print(f"Erro ao salvar: {ex}")
-                snackbar = ft.SnackBar(
-                    content=ft.Text(f"Erro ao salvar: {ex}"),
-                    bgcolor=ft.Colors.RED_600,
-                )
-                screen.page.overlay.append(snackbar)
-                snackbar.open = True
-                screen.page.update()
+                screen.show_snackbar(f"Erro ao salvar: {ex}", bgcolor=ft.Colors.RED_600)
 
         # Verificar duplicidade
         try:
@@ -477,13 +425,7 @@ def create_novo_preco_content(screen: Any) -> ft.Control:
                 
         except Exception as ex:
             print(f"Erro ao verificar duplicidade: {ex}")
-            snackbar = ft.SnackBar(
-                content=ft.Text(f"Erro ao verificar duplicidade: {ex}"),
-                bgcolor=ft.Colors.RED_600,
-            )
-            screen.page.overlay.append(snackbar)
-            snackbar.open = True
-            screen.page.update()
+            screen.show_snackbar(f"Erro ao verificar duplicidade: {ex}", bgcolor=ft.Colors.RED_600)
 
     def on_cancel(e):
         print("Cancelando cadastro de preços...")
@@ -1,4 +1,6 @@
-from typing import Any, Dict, Optional
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import flet as ft
 
@@ -7,6 +9,21 @@ from scripts.comercializacao_service import (
     get_client_dashboard_data,
     list_contract_clients,
 )
+from scripts.prefetch import prefetched
+
+
+# Altura de um card de ano (título, legenda e gráfico de 320 px)
+YEAR_CARD_HEIGHT = 410
+# Espaço entre os cards
+YEAR_CARD_GAP = 24
+# Anos visíveis antes de a lista de gráficos passar a rolar
+VISIBLE_YEARS = 2
+# Cards montados na abertura e a cada chegada ao fim da rolagem
+YEARS_PER_CHUNK = 3
+# Cards guardados para reaproveitar ao trocar filtros
+MAX_MEMOIZED_CARDS = 40
+
+YearSignature = Tuple[Any, ...]
 
 
 def _create_metric_summary(label: str, value: int) -> ft.Control:
@@ -36,14 +53,12 @@ def _create_empty_metrics_row() -> ft.Control:
 
 
 def _create_filters_row(
-    screen: Any,
     clients: list[str],
-    selected_client: Optional[str],
-    energy_type: Optional[str],
-    submarket: Optional[str],
-    contract_type: Optional[str],
-) -> tuple[ft.Control, Dict[str, Optional[str]]]:
+    filters: Dict[str, Optional[str]],
+    on_change: Callable[[Dict[str, Optional[str]]], None],
+) -> ft.Control:
     dropdown_width = 220
+    selected_client = filters.get("client")
 
     allowed_clients = {"NOVO COM", "MERX", "FORTLEV SOLAR COM"}
     client_options_list = [c for c in clients if c in allowed_clients]
@@ -66,7 +81,7 @@ def _create_filters_row(
             ft.dropdown.Option("CONV"),
             ft.dropdown.Option("CQ5"),
         ],
-        value=energy_type,
+        value=filters.get("energy_type"),
         width=dropdown_width,
     )
 
@@ -79,7 +94,7 @@ def _create_filters_row(
             ft.dropdown.Option("N"),
             ft.dropdown.Option("S"),
         ],
-        value=submarket,
+        value=filters.get("submarket"),
         width=dropdown_width,
     )
 
@@ -91,20 +106,18 @@ def _create_filters_row(
             ft.dropdown.Option("VAREJISTA"),
             ft.dropdown.Option("AUTOPRODUÇÃO"),
         ],
-        value=contract_type,
+        value=filters.get("contract_type"),
         width=dropdown_width,
     )
 
     def apply_filters(_: ft.ControlEvent) -> None:
-        screen.navigation.go(
-            "/comercializacao",
-            params={
-                "submenu": "visao",
+        on_change(
+            {
                 "client": client_dd.value,
                 "energy_type": energy_dd.value,
                 "submarket": submarket_dd.value,
                 "contract_type": contract_type_dd.value,
-            },
+            }
         )
 
     client_dd.on_change = apply_filters
@@ -112,20 +125,12 @@ def _create_filters_row(
     submarket_dd.on_change = apply_filters
     contract_type_dd.on_change = apply_filters
 
-    row = ft.Row(
+    return ft.Row(
         controls=[client_dd, energy_dd, submarket_dd, contract_type_dd],
         spacing=16,
         alignment=ft.MainAxisAlignment.START,
     )
 
-    current_filters = {
-        "energy_type": energy_type,
-        "submarket": submarket,
-        "contract_type": contract_type,
-    }
-
-    return row, current_filters
-
 
 def _create_year_chart_card(year: int, year_data: Dict[str, Any]) -> ft.Control:
     months = list(year_data.get("months", MONTH_LABELS))
@@ -357,24 +362,137 @@ def _create_year_chart_card(year: int, year_data: Dict[str, Any]) -> ft.Control:
     )
 
 
-def _create_year_charts(client_name: str, years: Dict[int, Dict[str, Any]]) -> ft.Control:
-    if not years:
-        return ft.Container(
-            padding=20,
-            content=ft.Text(
-                f"Nenhum contrato encontrado para o cliente {client_name}.",
-                size=14,
-                color=ft.Colors.GREY_700,
-            ),
+def _year_signature(year: int, year_data: Dict[str, Any]) -> YearSignature:
+    """Agregados que definem o card do ano: mesma assinatura, mesmo gráfico."""
+    return (
+        year,
+        tuple(year_data.get("months", MONTH_LABELS)),
+        tuple(year_data.get("buy", [])),
+        tuple(year_data.get("sell", [])),
+        year_data.get("buy_avg_price"),
+        year_data.get("sell_avg_price"),
+    )
+
+
+class YearCharts(ft.Container):
+    """Lista dos gráficos por ano, montados sob demanda e reaproveitados.
+
+    Os cards ficam em um `ft.ListView` de altura fixa por item e são criados
+    em blocos conforme o usuário rola. Cada card é guardado pela assinatura
+    dos agregados do ano; ao trocar filtros, só os anos cujos números mudaram
+    ganham um gráfico novo, e os demais são os mesmos controles (sem nada a
+    enviar no diff do Flet). Os blocos novos são enviados por
+    `request_update` (ver `BaseScreen.request_update`), no envio do quadro.
+    """
+
+    def __init__(self, request_update: Callable[..., None]):
+        self._request_update = request_update
+        self._years: List[Tuple[int, Dict[str, Any]]] = []
+        self._materialized = 0
+        self._cards: "OrderedDict[YearSignature, ft.Control]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self._list_view = ft.ListView(
+            spacing=0,
+            item_extent=YEAR_CARD_HEIGHT + YEAR_CARD_GAP,
+            on_scroll=self._on_scroll,
         )
+        self._empty_text = ft.Text("", size=14, color=ft.Colors.GREY_700)
+        self._empty = ft.Container(padding=20, content=self._empty_text, visible=False)
+        super().__init__(
+            content=ft.Column(controls=[self._list_view, self._empty], spacing=0),
+        )
+
+    def set_years(self, client_name: str, years: Dict[int, Dict[str, Any]]) -> None:
+        """Exibe os anos do cliente, reaproveitando os cards inalterados."""
+        with self._lock:
+            self._years = sorted(years.items())
+            self._empty_text.value = f"Nenhum contrato encontrado para o cliente {client_name}."
+            self._empty.visible = not self._years
+            self._list_view.visible = bool(self._years)
+            self._list_view.height = (
+                max(1, min(len(self._years), VISIBLE_YEARS)) * (YEAR_CARD_HEIGHT + YEAR_CARD_GAP)
+            )
+            # Mantém montados os anos que já estavam (a rolagem continua onde estava)
+            count = min(len(self._years), max(self._materialized, YEARS_PER_CHUNK))
+            self._list_view.controls = [
+                self._card(year, year_data) for year, year_data in self._years[:count]
+            ]
+            self._materialized = count
+
+    def _card(self, year: int, year_data: Dict[str, Any]) -> ft.Control:
+        signature = _year_signature(year, year_data)
+        card = self._cards.get(signature)
+        if card is not None:
+            self._cards.move_to_end(signature)
+            return card
+
+        card = ft.Container(
+            content=_create_year_chart_card(year, year_data),
+            padding=ft.padding.only(bottom=YEAR_CARD_GAP),
+        )
+        self._cards[signature] = card
+        while len(self._cards) > MAX_MEMOIZED_CARDS:
+            self._cards.popitem(last=False)
+        return card
+
+    def _on_scroll(self, e: ft.OnScrollEvent) -> None:
+        with self._lock:
+            start = self._materialized
+            if start >= len(self._years):
+                return
+            if e.pixels < e.max_scroll_extent - YEAR_CARD_HEIGHT:
+                return
+            end = min(len(self._years), start + YEARS_PER_CHUNK)
+            self._list_view.controls.extend(
+                self._card(year, year_data) for year, year_data in self._years[start:end]
+            )
+            self._materialized = end
+        self._request_update(self._list_view)
+
+
+def _create_metrics_row(data: Dict[str, Any]) -> ft.Control:
+    return ft.Row(
+        controls=[
+            _create_metric_summary(
+                "Total de Contratos", int(data.get("total_contracts", 0))
+            ),
+            _create_metric_summary(
+                "Contratos Ativos", int(data.get("active_contracts", 0))
+            ),
+            _create_metric_summary(
+                "Contratos Inativos", int(data.get("inactive_contracts", 0))
+            ),
+        ],
+        spacing=40,
+        alignment=ft.MainAxisAlignment.START,
+    )
 
-    year_cards: list[ft.Control] = []
-    for year in sorted(years.keys()):
-        year_cards.append(_create_year_chart_card(year, years[year]))
 
+def _create_results(
+    charts: YearCharts,
+    client_value: Optional[str],
+    data: Optional[Dict[str, Any]],
+) -> ft.Control:
+    """Métricas e gráficos do cliente (ou o aviso para escolher um)."""
+    if data is not None:
+        charts.set_years(client_value, data.get("years", {}))
+        controls = [_create_metrics_row(data), charts]
+    else:
+        controls = [
+            _create_empty_metrics_row(),
+            ft.Container(
+                padding=20,
+                content=ft.Text(
+                    "Selecione um cliente para visualizar os contratos.",
+                    size=14,
+                    color=ft.Colors.GREY_700,
+                ),
+            ),
+        ]
     return ft.Column(
-        controls=year_cards,
-        spacing=24,
+        controls=controls,
+        spacing=20,
         alignment=ft.MainAxisAlignment.START,
     )
 
@@ -386,53 +504,57 @@ def create_portfolio_content(
     submarket: Optional[str],
     contract_type: Optional[str],
 ) -> ft.Control:
-    clients = list_contract_clients()
+    """Dashboard de contratos por cliente; filtros e gráficos carregam em segundo plano.
 
-    client_value = selected_client if selected_client in clients else None
-
-    filters_row, current_filters = _create_filters_row(
-        screen,
-        clients,
-        client_value,
-        energy_type,
-        submarket,
-        contract_type,
-    )
+    Trocar um filtro não remonta a tela: os números são buscados de novo em
+    segundo plano e só a área de métricas e gráficos é atualizada.
+    """
+    filters: Dict[str, Optional[str]] = {
+        "client": selected_client,
+        "energy_type": energy_type,
+        "submarket": submarket,
+        "contract_type": contract_type,
+    }
+    charts = YearCharts(screen.request_update)
+    results = ft.Container()
+    state: Dict[str, Any] = {"load": None}
+
+    def load_data(current: Dict[str, Optional[str]]) -> Optional[Dict[str, Any]]:
+        if not current["client"]:
+            return None
+        return get_client_dashboard_data(
+            current["client"],
+            energy_type=current["energy_type"],
+            submarket=current["submarket"],
+            contract_type=current["contract_type"],
+        )
 
-    if client_value:
-        data = get_client_dashboard_data(
-            client_value,
-            energy_type=current_filters["energy_type"],
-            submarket=current_filters["submarket"],
-            contract_type=current_filters["contract_type"],
+    def apply_filters(new_filters: Dict[str, Optional[str]]) -> None:
+        if state["load"] is not None:
+            state["load"].cancel()
+        filters.update(new_filters)
+        current = dict(filters)
+        screen.navigation.record_params({"submenu": "visao", **current})
+        state["load"] = screen.load_into(
+            results,
+            lambda: load_data(current),
+            lambda data: _create_results(charts, current["client"], data),
         )
-        metrics_row = ft.Row(
-            controls=[
-                _create_metric_summary(
-                    "Total de Contratos", int(data.get("total_contracts", 0))
-                ),
-                _create_metric_summary(
-                    "Contratos Ativos", int(data.get("active_contracts", 0))
-                ),
-                _create_metric_summary(
-                    "Contratos Inativos", int(data.get("inactive_contracts", 0))
-                ),
-            ],
-            spacing=40,
+
+    def load_dashboard() -> tuple[list[str], Optional[Dict[str, Any]]]:
+        clients = prefetched("contract_clients", list_contract_clients)
+        if filters["client"] not in clients:
+            filters["client"] = None
+        return clients, load_data(dict(filters))
+
+    def render_dashboard(loaded: tuple[list[str], Optional[Dict[str, Any]]]) -> ft.Control:
+        clients, data = loaded
+        results.content = _create_results(charts, filters["client"], data)
+        return ft.Column(
+            controls=[_create_filters_row(clients, filters, apply_filters), results],
+            spacing=20,
             alignment=ft.MainAxisAlignment.START,
         )
-        charts = _create_year_charts(client_value, data.get("years", {}))
-    else:
-        data = None
-        metrics_row = _create_empty_metrics_row()
-        charts = ft.Container(
-            padding=20,
-            content=ft.Text(
-                "Selecione um cliente para visualizar os contratos.",
-                size=14,
-                color=ft.Colors.GREY_700,
-            ),
-        )
 
     return ft.Container(
         padding=20,
@@ -444,9 +566,7 @@ def create_portfolio_content(
                     size=20,
                     weight=ft.FontWeight.BOLD,
                 ),
-                filters_row,
-                metrics_row,
-                charts,
+                screen.defer_content(load_dashboard, render_dashboard),
             ],
             spacing=20,
             alignment=ft.MainAxisAlignment.START,
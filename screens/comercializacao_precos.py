@@ -2,8 +2,25 @@ from typing import Any, List, Tuple, Optional
 import flet as ft
 from datetime import datetime, timedelta, date
 import pandas as pd
-from scripts.database import read_records
-from scripts.icms_novo_discount_calculator import calculate_icms_price, calculate_icms_price_star
+from helpers.chart_downsampling import MAX_CHART_POINTS, downsample_indices
+from scripts.comercializacao_service import list_traders
+from scripts.energy_prices_service import (
+    ENERGY_TYPES,
+    SUBMARKETS,
+    get_best_price_matrix,
+    load_price_frame,
+    read_snapshots_between,
+)
+from scripts.prefetch import prefetched
+from scripts.icms_novo_discount_calculator import ICMS_DISCOUNTS, apply_icms_discounts, icms_column_name
+
+# Anos visíveis na tabela de melhores preços antes de ela passar a rolar
+# (os anos exibidos vêm da própria matriz)
+BEST_PRICE_VISIBLE_YEARS = 8
+BEST_PRICE_ROW_HEIGHT = 35
+
+# Períodos do gráfico I5 NE (dias -> rótulo); séries longas são reduzidas
+CHART_PERIODS = {30: "Últimos 30 Dias", 365: "Último Ano", 730: "Últimos 2 Anos"}
 
 def create_precos_content(screen: Any) -> ft.Control:
     """
@@ -11,47 +28,44 @@ def create_precos_content(screen: Any) -> ft.Control:
     """
     
     # --- Funções de Dados ---
-    def get_i5_ne_prices() -> List[Tuple[datetime, float]]:
+    def get_i5_ne_prices(days: int = 30) -> List[Tuple[datetime, float]]:
         """
-        Busca preços de I5 NE da SERENA nos últimos 30 dias.
+        Busca preços de I5 NE da SERENA nos últimos `days` dias.
         Realiza forward fill para dias faltantes.
         """
         try:
             # 1. Obter ID da SERENA
-            traders = read_records("traders", filters={"name": "SERENA"})
+            traders = [t for t in prefetched("traders", list_traders) if t.get("name") == "SERENA"]
             if not traders:
                 print("Comercializadora SERENA não encontrada.")
                 return []
             serena_id = traders[0]["id"]
             
-            # 2. Definir intervalo de datas (últimos 30 dias)
+            # 2. Definir intervalo de datas (últimos `days` dias)
             end_date = datetime.today().date()
-            start_date = end_date - timedelta(days=29)
+            start_date = end_date - timedelta(days=days - 1)
             
-            # 3. Buscar snapshots no intervalo
-            snapshots = read_records("energy_price_snapshots", filters={"trader_id": serena_id})
+            # 3. Buscar snapshots no intervalo (filtrados no servidor)
+            snapshots = read_snapshots_between(start_date, end_date, trader_id=serena_id)
             
             valid_snapshots = {} # {snapshot_id: date}
             for s in snapshots:
-                s_date = datetime.strptime(s["snapshot_date"], "%Y-%m-%d").date()
-                if start_date <= s_date <= end_date:
-                    valid_snapshots[s["id"]] = s_date
+                valid_snapshots[s["id"]] = datetime.strptime(s["snapshot_date"][:10], "%Y-%m-%d").date()
             
             if not valid_snapshots:
                 return []
 
-            # 4. Buscar preços para esses snapshots
-            prices_data = []
-            
-            all_prices_ne = read_records("energy_prices", filters={"energy_type": "I5", "submarket": "NE"})
-            
-            for p in all_prices_ne:
-                s_id = p["snapshot_id"]
-                if s_id in valid_snapshots:
-                    price_val = p["price"]
-                    date_val = valid_snapshots[s_id]
-                    if p["year"] == 2026:
-                        prices_data.append({"date": date_val, "price": price_val})
+            # 4. Buscar preços para esses snapshots (filtrados no servidor)
+            frame = load_price_frame(
+                snapshots,
+                energy_types=["I5"],
+                submarkets=["NE"],
+                years=[2026],
+            )
+            prices_data = [
+                {"date": valid_snapshots[s_id], "price": price_val}
+                for s_id, price_val in zip(frame["snapshot_id"], frame["price"])
+            ]
             
             if not prices_data:
                 return []
@@ -82,12 +96,42 @@ def create_precos_content(screen: Any) -> ft.Control:
             print(f"Erro ao buscar dados do gráfico: {ex}")
             return []
 
-    def create_i5_ne_chart() -> ft.Control:
-        data = get_i5_ne_prices()
-        
+    # Período selecionado do gráfico (dias) e carga em andamento
+    chart_days = [30]
+    chart_load: List[Any] = [None]
+
+    def load_chart() -> None:
+        if chart_load[0] is not None:
+            chart_load[0].cancel()
+        days = chart_days[0]
+        chart_load[0] = screen.load_into(chart_container, lambda: get_i5_ne_prices(days), create_i5_ne_chart)
+
+    def on_period_change(e):
+        # O gráfico atual fica na tela até o novo período chegar
+        chart_days[0] = int(e.control.value)
+        load_chart()
+
+    def period_dropdown() -> ft.Control:
+        return ft.Dropdown(
+            label="Período",
+            value=str(chart_days[0]),
+            options=[ft.dropdown.Option(str(days), label) for days, label in CHART_PERIODS.items()],
+            width=180,
+            dense=True,
+            on_change=on_period_change,
+        )
+
+    def create_i5_ne_chart(data: List[Tuple[datetime, float]]) -> ft.Control:
         if not data:
             return ft.Container(
-                content=ft.Text("Sem dados para exibir (SERENA - I5 NE - 2026)", color=ft.Colors.GREY_500),
+                content=ft.Column(
+                    controls=[
+                        period_dropdown(),
+                        ft.Text("Sem dados para exibir (SERENA - I5 NE - 2026)", color=ft.Colors.GREY_500),
+                    ],
+                    horizontal_alignment=ft.CrossAxisAlignment.CENTER,
+                    alignment=ft.MainAxisAlignment.CENTER,
+                ),
                 alignment=ft.alignment.center,
                 bgcolor=ft.Colors.BLUE_50,
                 border_radius=8,
@@ -100,27 +144,35 @@ def create_precos_content(screen: Any) -> ft.Control:
         max_y = ((max_price // 50) + 1) * 50
         min_y = 0
         
-        print(f"Dados do gráfico (Max: {max_price}): {[p for _, p in data]}")
+        # Reduzir a série a no máximo MAX_CHART_POINTS pontos (mantém picos e vales)
+        indices = downsample_indices([p for _, p in data], MAX_CHART_POINTS)
+        print(f"Dados do gráfico (Max: {max_price}): {len(data)} pontos, {len(indices)} desenhados")
 
         line_data = []
         bottom_axis_labels = []
+        # Labels do eixo X a cada 5 dias (ou ~6 labels em séries longas)
+        label_step = max(5, len(data) // 6)
+        label_format = "%d/%m" if len(data) <= 366 else "%m/%Y"
+        tooltip_format = "%d/%m" if len(data) <= 31 else "%d/%m/%Y"
         
-        for i, (dt, price) in enumerate(data):
+        for i in indices:
+            dt, price = data[i]
             line_data.append(
                 ft.LineChartDataPoint(
                     x=i, 
                     y=price,
-                    tooltip=f"{dt.strftime('%d/%m')}: R$ {price:.2f}",
+                    tooltip=f"{dt.strftime(tooltip_format)}: R$ {price:.2f}",
                 )
             )
-            # Labels do eixo X a cada 5 dias
-            if i % 5 == 0:
-                bottom_axis_labels.append(
-                    ft.ChartAxisLabel(
-                        value=i,
-                        label=ft.Text(dt.strftime("%d/%m"), size=10, weight=ft.FontWeight.BOLD),
-                    )
+
+        for i in range(0, len(data), label_step):
+            dt = data[i][0]
+            bottom_axis_labels.append(
+                ft.ChartAxisLabel(
+                    value=i,
+                    label=ft.Text(dt.strftime(label_format), size=10, weight=ft.FontWeight.BOLD),
                 )
+            )
             
         chart = ft.LineChart(
             data_series=[
@@ -153,7 +205,19 @@ def create_precos_content(screen: Any) -> ft.Control:
         return ft.Container(
             content=ft.Column(
                 controls=[
-                    ft.Text("Preço I5 NE (2026) - SERENA - Últimos 30 Dias", size=14, weight=ft.FontWeight.W_600, color=ft.Colors.GREY_800),
+                    ft.Row(
+                        controls=[
+                            ft.Text(
+                                f"Preço I5 NE (2026) - SERENA - {CHART_PERIODS[chart_days[0]]}",
+                                size=14,
+                                weight=ft.FontWeight.W_600,
+                                color=ft.Colors.GREY_800,
+                            ),
+                            period_dropdown(),
+                        ],
+                        spacing=15,
+                        vertical_alignment=ft.CrossAxisAlignment.CENTER,
+                    ),
                     ft.Container(
                         content=chart,
                         expand=True,
@@ -257,81 +321,24 @@ def create_precos_content(screen: Any) -> ft.Control:
     )
 
     # --- 4. Seção de Gráficos (Preços Médios) ---
-    def get_best_prices() -> Tuple[Optional[date], List[dict]]:
+    def get_best_prices() -> Tuple[Optional[date], pd.DataFrame]:
         """
-        Encontra o menor preço de I5 NE para cada ano (2026-2030).
-        Busca retroativa a partir de hoje.
-        Retorna (data_encontrada, lista_de_resultados).
+        Matriz de menores preços (ano × submercado × tipo) da data de
+        snapshot mais recente nos últimos 30 dias, com a comercializadora
+        vencedora e os descontos de ICMS já aplicados.
+        Retorna (data_encontrada, matriz).
         """
         try:
-            current_date = datetime.today().date()
-            # Limite de busca retroativa (ex: 30 dias) para evitar loop infinito
-            for _ in range(30):
-                # Buscar snapshots para a data
-                snapshots = read_records("energy_price_snapshots", filters={"snapshot_date": current_date.isoformat()})
-                
-                if not snapshots:
-                    current_date -= timedelta(days=1)
-                    continue
-                
-                # Se encontrou snapshots, buscar preços
-                snapshot_ids = [s["id"] for s in snapshots]
-                
-                # Buscar preços I5 NE para os anos 2026-2030 nesses snapshots
-                # Como não temos filtro "IN", vamos buscar por tipo e submercado e filtrar em memória
-                all_prices_ne = read_records("energy_prices", filters={"energy_type": "I5", "submarket": "NE"})
-                
-                # Filtrar pelos snapshots da data e anos desejados
-                relevant_prices = [
-                    p for p in all_prices_ne 
-                    if p["snapshot_id"] in snapshot_ids and 2026 <= p["year"] <= 2033
-                ]
-                
-                if not relevant_prices:
-                    current_date -= timedelta(days=1)
-                    continue
-                
-                # Encontrou preços! Agora achar o menor por ano
-                results = []
-                years = range(2026, 2034)
-                
-                # Carregar traders para pegar nomes
-                all_traders = read_records("traders")
-                trader_map = {t["id"]: t["name"] for t in all_traders}
-                snapshot_trader_map = {s["id"]: s["trader_id"] for s in snapshots}
-                
-                for year in years:
-                    year_prices = [p for p in relevant_prices if p["year"] == year]
-                    
-                    if not year_prices:
-                        results.append({"year": year, "price": None, "trader": "-"})
-                        continue
-                        
-                    # Encontrar menor preço
-                    best_price_record = min(year_prices, key=lambda x: x["price"])
-                    best_price = best_price_record["price"]
-                    
-                    # Encontrar fornecedor
-                    snap_id = best_price_record["snapshot_id"]
-                    trader_id = snapshot_trader_map.get(snap_id)
-                    trader_name = trader_map.get(trader_id, "Desconhecido")
-                    
-                    results.append({
-                        "year": year,
-                        "price": best_price,
-                        "trader": trader_name
-                    })
-                
-                return current_date, results
-            
-            return None, []
-            
+            found_date, matrix = prefetched("best_prices", get_best_price_matrix)
+            if matrix.empty:
+                return found_date, matrix
+            return found_date, apply_icms_discounts(matrix, ICMS_DISCOUNTS)
         except Exception as ex:
             print(f"Erro ao buscar melhores preços: {ex}")
-            return None, []
+            return None, pd.DataFrame()
 
-    def create_prices_table() -> ft.Control:
-        found_date, data = get_best_prices()
+    def create_prices_table(best_prices: Tuple[Optional[date], pd.DataFrame]) -> ft.Control:
+        found_date, matrix = best_prices
         
         title_text = "Preços NOVO"
         if found_date:
@@ -339,7 +346,7 @@ def create_precos_content(screen: Any) -> ft.Control:
         else:
             title_text = "Preços NOVO (Sem dados recentes)"
 
-        if not data:
+        if matrix.empty:
              return ft.Container(
                 content=ft.Column(
                     controls=[
@@ -406,13 +413,16 @@ def create_precos_content(screen: Any) -> ft.Control:
                     text_align=ft.TextAlign.CENTER,
                 ),
                 width=width,
-                height=35,
+                height=BEST_PRICE_ROW_HEIGHT,
                 bgcolor=bg_color,
                 padding=5,
                 alignment=ft.alignment.center,
                 border=ft.border.all(1, ft.Colors.GREY_300),
             )
 
+        # Seleção atual (submercado, tipo); padrão I5 NE
+        selected = ["NE", "I5"]
+
         # Criar linha de cabeçalho
         header_row = ft.Row(
             controls=[header_cell(headers[i], widths[i]) for i in range(len(headers))],
@@ -420,55 +430,52 @@ def create_precos_content(screen: Any) -> ft.Control:
         )
 
         # Criar linhas de dados
-        data_rows = []
-        for idx, row_data in enumerate(data):
-            year = row_data["year"]
-            price = row_data["price"]
-            trader = row_data["trader"]
-            
-            if price is not None:
-                p_base = f"R$ {price:.2f}".replace('.', ',')
-                p_10 = f"R$ {calculate_icms_price(price, 0.10):.2f}".replace('.', ',')
-                p_15 = f"R$ {calculate_icms_price(price, 0.15):.2f}".replace('.', ',')
-                p_20 = f"R$ {calculate_icms_price(price, 0.20):.2f}".replace('.', ',')
-                p_25 = f"R$ {calculate_icms_price(price, 0.25):.2f}".replace('.', ',')
-                
-                p_10_star = f"R$ {calculate_icms_price_star(price, 0.10):.2f}".replace('.', ',')
-                p_15_star = f"R$ {calculate_icms_price_star(price, 0.15):.2f}".replace('.', ',')
-                p_20_star = f"R$ {calculate_icms_price_star(price, 0.20):.2f}".replace('.', ',')
-                p_25_star = f"R$ {calculate_icms_price_star(price, 0.25):.2f}".replace('.', ',')
-            else:
-                p_base = "-"
-                p_10 = "-"
-                p_15 = "-"
-                p_20 = "-"
-                p_25 = "-"
-                p_10_star = "-"
-                p_15_star = "-"
-                p_20_star = "-"
-                p_25_star = "-"
-            
-            row_controls = [
-                data_cell(str(year), widths[0], idx),
-                data_cell(p_base, widths[1], idx),
-                data_cell(trader, widths[2], idx),
-                data_cell(p_10, widths[3], idx),
-                data_cell(p_15, widths[4], idx),
-                data_cell(p_20, widths[5], idx),
-                data_cell(p_25, widths[6], idx),
-                data_cell(p_10_star, widths[7], idx),
-                data_cell(p_15_star, widths[8], idx),
-                data_cell(p_20_star, widths[9], idx),
-                data_cell(p_25_star, widths[10], idx),
-            ]
-            
-            data_rows.append(ft.Row(controls=row_controls, spacing=0))
+        icms_columns = [icms_column_name(pct) for pct in ICMS_DISCOUNTS] + [
+            icms_column_name(pct, star=True) for pct in ICMS_DISCOUNTS
+        ]
+
+        def fmt_price(value: Optional[float]) -> str:
+            if value is None or pd.isna(value):
+                return "-"
+            return f"R$ {value:.2f}".replace('.', ',')
+
+        # Todos os anos com preço na matriz (os sem preço na seleção saem com "-")
+        years = range(int(matrix["year"].min()), int(matrix["year"].max()) + 1)
 
-        # Montar tabela final
+        # Matriz indexada por (submercado, tipo) -> {ano: linha}, montada uma única vez
+        rows_by_selection = {
+            (sub, tipo): {int(r["year"]): r for r in group.to_dict("records")}
+            for (sub, tipo), group in matrix.groupby(["submarket", "energy_type"])
+        }
+
+        def build_data_rows(submarket: str, energy_type: str) -> List[ft.Control]:
+            by_year = rows_by_selection.get((submarket, energy_type), {})
+            data_rows = []
+            for idx, year in enumerate(years):
+                row_data = by_year.get(year)
+                if row_data is None:
+                    values = ["-"] * (len(headers) - 1)
+                else:
+                    values = [fmt_price(row_data["price"]), row_data["trader"]] + [
+                        fmt_price(row_data[col]) for col in icms_columns
+                    ]
+
+                row_controls = [data_cell(str(year), widths[0], idx)] + [
+                    data_cell(value, widths[i + 1], idx) for i, value in enumerate(values)
+                ]
+                data_rows.append(ft.Row(controls=row_controls, spacing=0))
+            return data_rows
+
+        # Montar tabela final (cabeçalho fixo, anos com scroll vertical)
+        rows_column = ft.Column(
+            controls=build_data_rows(*selected),
+            spacing=0,
+            height=min(len(years), BEST_PRICE_VISIBLE_YEARS) * BEST_PRICE_ROW_HEIGHT,
+            scroll=ft.ScrollMode.AUTO,
+        )
         table_column = ft.Column(
-            controls=[header_row] + data_rows,
+            controls=[header_row, rows_column],
             spacing=0,
-            # scroll=ft.ScrollMode.AUTO, # Scroll vertical se necessário
         )
         
         # Container com largura total para permitir scroll horizontal
@@ -480,10 +487,42 @@ def create_precos_content(screen: Any) -> ft.Control:
             border=ft.border.all(1, ft.Colors.GREY_200),
         )
 
+        # Seletores de submercado e tipo: trocam apenas as linhas da tabela
+        def on_selection_change(e):
+            selected[0] = submarket_dd.value
+            selected[1] = energy_type_dd.value
+            rows_column.controls = build_data_rows(*selected)
+            screen.request_update(rows_column)
+
+        submarket_dd = ft.Dropdown(
+            label="Submercado",
+            value=selected[0],
+            options=[ft.dropdown.Option(sub) for sub in SUBMARKETS],
+            width=140,
+            dense=True,
+            on_change=on_selection_change,
+        )
+        energy_type_dd = ft.Dropdown(
+            label="Tipo de Energia",
+            value=selected[1],
+            options=[ft.dropdown.Option(tipo) for tipo in ENERGY_TYPES],
+            width=160,
+            dense=True,
+            on_change=on_selection_change,
+        )
+
         return ft.Container(
             content=ft.Column(
                 controls=[
-                    ft.Text(title_text, size=14, weight=ft.FontWeight.W_600, color=ft.Colors.GREY_800),
+                    ft.Row(
+                        controls=[
+                            ft.Text(title_text, size=14, weight=ft.FontWeight.W_600, color=ft.Colors.GREY_800),
+                            submarket_dd,
+                            energy_type_dd,
+                        ],
+                        spacing=15,
+                        vertical_alignment=ft.CrossAxisAlignment.CENTER,
+                    ),
                     ft.Container(
                         content=ft.Row(
                             controls=[table_container],
@@ -502,14 +541,19 @@ def create_precos_content(screen: Any) -> ft.Control:
             padding=10,
         )
 
+    # Consulta em segundo plano; esqueleto até os dados chegarem
+    chart_container = ft.Container(content=screen.create_skeleton(), height=350)
+    load_chart()
+
     charts_section = ft.Container(
         content=ft.Column(
             controls=[
                 ft.Text("Preços Médios de Energia", size=18, weight=ft.FontWeight.BOLD, color=ft.Colors.BLACK87),
                 ft.Column(
                     controls=[
-                        create_prices_table(),
-                        create_i5_ne_chart(),
+                        # Consultas em segundo plano; esqueleto até os dados chegarem
+                        screen.defer_content(get_best_prices, create_prices_table, height=350),
+                        chart_container,
                     ],
                     spacing=20,
                     expand=True,
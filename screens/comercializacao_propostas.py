@@ -1,8 +1,13 @@
+import os
+import threading
 from typing import Any, Dict, Optional, List
 from datetime import datetime
 
 import flet as ft
 from scripts.database import read_records, create_record, delete_records
+from scripts.prefetch import prefetched
+from scripts.proposals_repository import ProposalPage, ProposalsRepository
+from screens.virtual_table import TableColumn, VirtualTable
 
 def _format_date(value: Any) -> str:
     """Formata datas ISO/DateTime como dd/mm/aaaa."""
@@ -26,249 +31,206 @@ def _create_proposals_table(
     proposals: list[Dict[str, Any]],
     screen: Any,
     on_delete: Any, # Callback for delete action
+    selected_ids: Optional[set] = None, # Seleção para geração em lote (mutada in-place)
+    seasonalities: Optional[Dict[Any, list]] = None, # Sazonalidades pré-carregadas por proposta
+    *,
+    on_sort: Optional[Any] = None, # Callback(campo, decrescente): ordenação no servidor
+    order_by: str = "created_at",
+    descending: bool = True,
 ) -> ft.Control:
-    headers = [
-        "Comprador",
-        "Vendedor",
-        "Data",
-        "Status",
-        "Editar",
-        "Gerar",
-        "Excluir",
-        "Contrato",
-    ]
+    """Tabela virtualizada da página de propostas (ordenação feita no servidor)."""
+
+    def make_edit_action(proposal_data):
+        def handler(_):
+            screen.navigation.go(
+                "/comercializacao",
+                params={
+                    "submenu": "propostas",
+                    "propostas_view": "new",
+                    "proposal_id": str(proposal_data.get("id") or ""),
+                },
+            )
+        return handler
+
+    def make_generate_action(proposal_data):
+        def handler(e):
+            try:
+                if not proposal_data.get("id"):
+                    return
 
-    widths = [250, 200, 120, 80, 70, 70, 70, 80]
+                # ⚠️ VALIDAÇÃO: Obter e validar pasta de saída
+                from helpers.storage import get_output_directory
+                output_dir = get_output_directory(screen.page)
+                
+                if not output_dir:
+                    raise Exception(
+                        "⚠️ Pasta de saída não configurada!\n\n"
+                        "Por favor, vá até o Backoffice e clique em "
+                        "'Alterar Pasta de Saída' para escolher onde "
+                        "os arquivos serão salvos."
+                    )
 
-    def header_cell(text: str, width: int) -> ft.Control:
-        return ft.Container(
-            content=ft.Text(
-                text,
-                size=13,
-                weight=ft.FontWeight.BOLD,
-                color=ft.Colors.WHITE,
-                text_align=ft.TextAlign.CENTER,
-            ),
-            width=width,
-            height=44,
-            bgcolor=ft.Colors.BLUE_700,
-            padding=10,
-            alignment=ft.alignment.center,
-            border=ft.border.all(1, ft.Colors.BLUE_900),
-        )
+                # Enfileira a geração; o painel de documentos mostra o progresso
+                from scripts.document_jobs import get_document_job_queue
+                get_document_job_queue().submit_proposal(
+                    proposal_data,
+                    output_dir,
+                    seasonalities=(seasonalities or {}).get(proposal_data.get("id")),
+                )
 
-    def data_cell(content: ft.Control, width: int, row_index: int) -> ft.Control:
-        bg_color = ft.Colors.WHITE if row_index % 2 == 0 else ft.Colors.GREY_50
-        return ft.Container(
-            content=content,
-            width=width,
-            height=40,
-            bgcolor=bg_color,
-            padding=10,
-            alignment=ft.alignment.center,
-            border=ft.border.all(1, ft.Colors.GREY_300),
-        )
+                screen.show_snackbar(
+                    f"Proposta de {proposal_data.get('customer_name') or '-'} adicionada à fila de geração",
+                    bgcolor=ft.Colors.BLUE_600,
+                )
 
-    def action_button(
-        icon: str,
-        tooltip: str,
-        width: int,
-        row_index: int,
-        on_click,
-        icon_color: str = ft.Colors.BLACK,
-    ) -> ft.Control:
-        bg_color = ft.Colors.WHITE if row_index % 2 == 0 else ft.Colors.GREY_50
-        return ft.Container(
-            content=ft.IconButton(
-                icon=icon,
-                icon_color=icon_color,
-                tooltip=tooltip,
-                on_click=on_click,
-                icon_size=20,
-            ),
-            width=width,
-            height=40,
-            bgcolor=bg_color,
-            alignment=ft.alignment.center,
-            border=ft.border.all(1, ft.Colors.GREY_300),
-        )
+            except Exception as ex:
+                print(f"ERROR generating proposal: {ex}")
+                screen.show_snackbar(f"Erro ao gerar proposta: {ex}", bgcolor=ft.Colors.RED_600)
 
-    header_row = ft.Row(
-        controls=[header_cell(headers[i], widths[i]) for i in range(len(headers))],
-        spacing=0,
-    )
+        return handler
+        
+    def make_contract_action(proposal_data):
+        def handler(_):
+            try:
+                if not proposal_data.get("id"):
+                    return
+
+                from helpers.storage import get_output_directory
+                output_dir = get_output_directory(screen.page)
+                if not output_dir:
+                    raise Exception(
+                        "⚠️ Pasta de saída não configurada! Vá até o Backoffice e clique em "
+                        "'Alterar Pasta de Saída'."
+                    )
 
-    data_rows: list[ft.Control] = []
-    for idx, p in enumerate(proposals):
-        buyer = str(p.get("customer_name") or "-")
-        seller = "-" # Placeholder
-        date_str = _format_date(p.get("created_at"))
-        status_val = str(p.get("status") or "PENDING")
-
-        # Status Icon Logic
-        if status_val == "ACCEPTED":
-            status_icon = ft.Icon(ft.Icons.CHECK_CIRCLE, color=ft.Colors.GREEN, size=20, tooltip="Aceita")
-        else:
-            status_icon = ft.Icon(ft.Icons.HOURGLASS_EMPTY, color=ft.Colors.ORANGE, size=20, tooltip="Pendente")
-
-        def make_edit_action(proposal_data):
-            def handler(_):
-                print(f"DEBUG: Edit clicked for proposal {proposal_data.get('id')}")
-                screen.navigation.go(
-                    "/comercializacao",
-                    params={
-                        "submenu": "propostas",
-                        "propostas_view": "new",
-                        "proposal_id": str(proposal_data.get("id") or ""),
-                    },
+                # Mesmo motor e mesma fila das propostas
+                from scripts.document_jobs import get_document_job_queue
+                get_document_job_queue().submit_proposal(
+                    proposal_data,
+                    output_dir,
+                    kind="contract",
+                    seasonalities=(seasonalities or {}).get(proposal_data.get("id")),
                 )
-            return handler
 
-        def make_generate_action(proposal_data):
-            def handler(e):
-                print(f"DEBUG: Generate proposal clicked for {proposal_data.get('id')}")
-                
-                # Loading State
-                btn = e.control
-                original_icon = btn.icon
-                btn.icon = None
-                btn.content = ft.ProgressRing(width=16, height=16, stroke_width=2, color=ft.Colors.BLUE_600)
-                btn.update()
+                screen.show_snackbar(
+                    f"Contrato de {proposal_data.get('customer_name') or '-'} adicionado à fila de geração",
+                    bgcolor=ft.Colors.BLUE_600,
+                )
 
-                try:
-                    proposal_id = proposal_data.get("id")
-                    if not proposal_id:
-                        return
-
-                    # Fetch seasonalities
-                    seasonalities = read_records("proposal_seasonalities", {"proposal_id": proposal_id})
-                    # Sort by year
-                    seasonalities.sort(key=lambda x: x.get("year") or 0)
-
-                    if not seasonalities:
-                        raise Exception("Não há dados de sazonalidade para esta proposta.")
-
-                    # Extract lists
-                    anos = [s.get("year") for s in seasonalities]
-                    curva_vol = [s.get("average_volume") or 0.0 for s in seasonalities]
-                    curva_precos = [s.get("price") or 0.0 for s in seasonalities]
-                    
-                    # Extract single values (take from first year or default)
-                    first_sazo = seasonalities[0]
-                    flex_val = first_sazo.get("flex")
-                    sazo_val = first_sazo.get("seasonality")
-
-                    # Format params
-                    data_hoje = datetime.now().strftime("%d/%m/%Y")
-                    
-                    # CNPJ formatting
-                    raw_cnpj = str(proposal_data.get("customer_cnpj") or "")
-                    digits = "".join(filter(str.isdigit, raw_cnpj))
-                    if len(digits) == 14:
-                        cnpj_fmt = f"{digits[:2]}.{digits[2:5]}.{digits[5:8]}/{digits[8:12]}-{digits[12:]}"
-                    else:
-                        cnpj_fmt = raw_cnpj
-
-                    # Dates
-                    inicio = _format_date(proposal_data.get("supply_start"))
-                    fim = _format_date(proposal_data.get("supply_end"))
-
-                    # Tipo Proposta
-                    validade = proposal_data.get("proposal_validity") or "-"
-                    tipo_proposta = f"Indicativa - Validade até {validade}"
-
-                    # ⚠️ VALIDAÇÃO: Obter e validar pasta de saída
-                    from helpers.storage import get_output_directory
-                    output_dir = get_output_directory(screen.page)
-                    
-                    if not output_dir:
-                        raise Exception(
-                            "⚠️ Pasta de saída não configurada!\n\n"
-                            "Por favor, vá até o Backoffice e clique em "
-                            "'Alterar Pasta de Saída' para escolher onde "
-                            "os arquivos serão salvos."
-                        )
-
-                    # Call generator
-                    from scripts.proposal_generator import generate_proposal
-                    
-                    output_path = generate_proposal(
-                        data_hoje=data_hoje,
-                        razao_social=proposal_data.get("customer_name") or "",
-                        cnpj=cnpj_fmt,
-                        submercado=proposal_data.get("submarket") or "",
-                        inicio=inicio,
-                        fim=fim,
-                        curva_vol=curva_vol,
-                        curva_precos=curva_precos,
-                        anos=anos,
-                        tipo_energia=proposal_data.get("energy_type") or "",
-                        flex=str(flex_val) if flex_val is not None else "",
-                        sazo=str(sazo_val) if sazo_val is not None else "",
-                        modulacao=proposal_data.get("modulation") or "",
-                        pagamento=str(proposal_data.get("billing_due_day") or ""),
-                        qty_meses=str(proposal_data.get("guarantee_months") or ""),
-                        tipo_proposta=tipo_proposta,
-                        output_dir=output_dir  # Pass external directory
-                    )
+            except Exception as ex:
+                print(f"ERROR generating contract: {ex}")
+                screen.show_snackbar(f"Erro ao gerar contrato: {ex}", bgcolor=ft.Colors.RED_600)
+        return handler
+
+    def action_button(icon: str, tooltip: str, on_click, icon_color: str = ft.Colors.BLACK) -> ft.Control:
+        return ft.IconButton(
+            icon=icon,
+            icon_color=icon_color,
+            tooltip=tooltip,
+            on_click=on_click,
+            icon_size=20,
+        )
 
-                    # Show success
-                    snackbar = ft.SnackBar(ft.Text(f"Proposta gerada: {output_path}"), bgcolor=ft.Colors.GREEN_600)
-                    screen.page.overlay.append(snackbar)
-                    snackbar.open = True
-                    screen.page.update()
-
-                except Exception as ex:
-                    print(f"ERROR generating proposal: {ex}")
-                    snackbar = ft.SnackBar(ft.Text(f"Erro ao gerar proposta: {ex}"), bgcolor=ft.Colors.RED_600)
-                    screen.page.overlay.append(snackbar)
-                    snackbar.open = True
-                    screen.page.update()
-                
-                finally:
-                    # Restore State
-                    btn.content = None
-                    btn.icon = original_icon
-                    btn.update()
+    def status_cell(p: Dict[str, Any], _: int) -> ft.Control:
+        if str(p.get("status") or "PENDING") == "ACCEPTED":
+            return ft.Icon(ft.Icons.CHECK_CIRCLE, color=ft.Colors.GREEN, size=20, tooltip="Aceita")
+        return ft.Icon(ft.Icons.HOURGLASS_EMPTY, color=ft.Colors.ORANGE, size=20, tooltip="Pendente")
+
+    columns = [
+        TableColumn("Comprador", 250, text=lambda p: str(p.get("customer_name") or "-"), sort_field="customer_name"),
+        TableColumn("Vendedor", 200, text=lambda p: "-"), # Placeholder
+        TableColumn("Data", 120, text=lambda p: _format_date(p.get("created_at")), sort_field="created_at"),
+        TableColumn("Status", 80, cell=status_cell, sort_field="status"),
+        TableColumn(
+            "Editar",
+            70,
+            cell=lambda p, _: action_button(ft.Icons.EDIT, "Editar proposta", make_edit_action(p)),
+            padding=0,
+        ),
+        TableColumn(
+            "Gerar",
+            70,
+            cell=lambda p, _: action_button(ft.Icons.DESCRIPTION, "Gerar proposta", make_generate_action(p)),
+            padding=0,
+        ),
+        TableColumn(
+            "Excluir",
+            70,
+            cell=lambda p, _: action_button(ft.Icons.DELETE, "Excluir proposta", lambda _: on_delete(p)),
+            padding=0,
+        ),
+        TableColumn(
+            "Contrato",
+            80,
+            cell=lambda p, _: action_button(
+                ft.Icons.PICTURE_AS_PDF,
+                "Gerar Contrato",
+                make_contract_action(p),
+                icon_color=ft.Colors.RED_700,
+            ),
+            padding=0,
+        ),
+    ]
 
-            return handler
-            
-        def make_contract_action(proposal_data):
-            def handler(_):
-                print(f"DEBUG: Generate Contract clicked for proposal {proposal_data.get('id')}")
-                # Future implementation: Generate Contract PDF
+    # Coluna de seleção (geração em lote)
+    if selected_ids is not None:
+        # Só as linhas já materializadas têm checkbox
+        row_checkboxes: list[ft.Checkbox] = []
+
+        def toggle_all(e):
+            for proposal in proposals:
+                if e.control.value:
+                    selected_ids.add(proposal.get("id"))
+                else:
+                    selected_ids.discard(proposal.get("id"))
+            for checkbox in row_checkboxes:
+                checkbox.value = e.control.value
+            screen.request_update(table)
+
+        def make_select_action(proposal_id):
+            def handler(e):
+                if e.control.value:
+                    selected_ids.add(proposal_id)
+                else:
+                    selected_ids.discard(proposal_id)
             return handler
 
-        row = ft.Row(
-            controls=[
-                data_cell(ft.Text(buyer, size=12, color=ft.Colors.GREY_900, text_align=ft.TextAlign.CENTER), widths[0], idx),
-                data_cell(ft.Text(seller, size=12, color=ft.Colors.GREY_900, text_align=ft.TextAlign.CENTER), widths[1], idx),
-                data_cell(ft.Text(date_str, size=12, color=ft.Colors.GREY_900, text_align=ft.TextAlign.CENTER), widths[2], idx),
-                data_cell(status_icon, widths[3], idx),
-                action_button(ft.Icons.EDIT, "Editar proposta", widths[4], idx, make_edit_action(p)),
-                action_button(ft.Icons.DESCRIPTION, "Gerar proposta", widths[5], idx, make_generate_action(p)),
-                action_button(ft.Icons.DELETE, "Excluir proposta", widths[6], idx, lambda _: on_delete(p)),
-                action_button(ft.Icons.PICTURE_AS_PDF, "Gerar Contrato", widths[7], idx, make_contract_action(p), icon_color=ft.Colors.RED_700),
-            ],
-            spacing=0,
+        def select_cell(p: Dict[str, Any], _: int) -> ft.Control:
+            checkbox = ft.Checkbox(
+                value=p.get("id") in selected_ids,
+                data=p.get("id"),
+                on_change=make_select_action(p.get("id")),
+            )
+            row_checkboxes.append(checkbox)
+            return checkbox
+
+        columns.insert(
+            0,
+            TableColumn(
+                "",
+                50,
+                cell=select_cell,
+                header=ft.Checkbox(
+                    value=bool(proposals) and all(p.get("id") in selected_ids for p in proposals),
+                    on_change=toggle_all,
+                    fill_color=ft.Colors.WHITE,
+                    check_color=ft.Colors.BLUE_700,
+                    tooltip="Selecionar todas",
+                ),
+                padding=0,
+            ),
         )
-        data_rows.append(row)
-
-    total_width = sum(widths)
 
-    table_column = ft.Column(
-        controls=[header_row] + data_rows,
-        spacing=0,
-        scroll=ft.ScrollMode.AUTO,
-    )
-
-    return ft.Container(
-        content=table_column,
-        width=total_width,
-        border=ft.border.all(1, ft.Colors.GREY_300),
-        border_radius=8,
-        bgcolor=ft.Colors.WHITE,
+    table = VirtualTable(
+        columns,
+        proposals,
+        request_update=screen.request_update,
+        on_sort=on_sort,
+        sort_field=order_by,
+        descending=descending,
+        empty_message="Nenhuma proposta encontrada.",
     )
+    return table
 
 
 def create_propostas_content(screen: Any) -> ft.Control:
@@ -277,36 +239,84 @@ def create_propostas_content(screen: Any) -> ft.Control:
     # Container para a tabela que será atualizado
     table_container = ft.Container()
 
-    def load_proposals(search_term: str = "", status_filter: Optional[str] = None):
-        print(f"DEBUG: Loading proposals with search_term='{search_term}', status_filter='{status_filter}'")
+    # Propostas selecionadas para geração em lote
+    selected_ids: set = set()
+
+    # Filtros, ordenação e paginação no servidor; sazonalidades da página pré-carregadas
+    repository = ProposalsRepository()
+    query_state: Dict[str, Any] = {
+        "search": "",
+        "status": None,
+        "page": 0,
+        "order_by": "created_at",
+        "descending": True,
+    }
+
+    page_label = ft.Text("", size=12, color=ft.Colors.GREY_700)
+    previous_page_button = ft.IconButton(
+        icon=ft.Icons.CHEVRON_LEFT,
+        tooltip="Página anterior",
+        on_click=lambda _: load_proposals(query_state["search"], query_state["status"], query_state["page"] - 1),
+    )
+    next_page_button = ft.IconButton(
+        icon=ft.Icons.CHEVRON_RIGHT,
+        tooltip="Próxima página",
+        on_click=lambda _: load_proposals(query_state["search"], query_state["status"], query_state["page"] + 1),
+    )
+    pager_row = ft.Row(
+        controls=[previous_page_button, page_label, next_page_button],
+        spacing=4,
+        vertical_alignment=ft.CrossAxisAlignment.CENTER,
+    )
+
+    def show_page(page_data: ProposalPage) -> None:
+        # A seleção vale apenas para as linhas visíveis
+        selected_ids.clear()
+        query_state["page"] = page_data.page
+        table_container.content = _create_proposals_table(
+            page_data.items,
+            screen,
+            handle_delete_request,
+            selected_ids,
+            page_data.seasonalities,
+            on_sort=sort_proposals,
+            order_by=query_state["order_by"],
+            descending=query_state["descending"],
+        )
+        page_label.value = (
+            f"Página {page_data.page + 1} de {page_data.page_count} "
+            f"({page_data.total} proposta(s))"
+        )
+        previous_page_button.disabled = not page_data.has_previous
+        next_page_button.disabled = not page_data.has_next
+
+    def load_proposals(search_term: str = "", status_filter: Optional[str] = None, page: int = 0):
+        print(f"DEBUG: Loading proposals with search_term='{search_term}', status_filter='{status_filter}', page={page}")
+        query_state["search"] = search_term or ""
+        query_state["status"] = status_filter
         try:
-            # Fetch all proposals (filtering in memory for partial match)
-            all_proposals = read_records("proposals")
-            
-            filtered_proposals = all_proposals
-
-            if search_term:
-                filtered_proposals = [
-                    p for p in filtered_proposals 
-                    if search_term.lower() in str(p.get("customer_name", "")).lower()
-                ]
-            
-            if status_filter:
-                filtered_proposals = [
-                    p for p in filtered_proposals
-                    if str(p.get("status", "PENDING")) == status_filter
-                ]
-            
-            # Sort by created_at desc
-            filtered_proposals.sort(key=lambda x: x.get("created_at", ""), reverse=True)
-
-            table_container.content = _create_proposals_table(filtered_proposals, screen, handle_delete_request)
-            table_container.update()
-            
+            show_page(
+                repository.list_page(
+                    search=search_term or "",
+                    status=status_filter,
+                    page=page,
+                    order_by=query_state["order_by"],
+                    descending=query_state["descending"],
+                )
+            )
+            # Tabela e paginação no mesmo envio
+            screen.request_update(table_container, pager_row)
+
         except Exception as e:
             print(f"ERROR: Failed to load proposals: {e}")
             table_container.content = ft.Text(f"Erro ao carregar propostas: {e}", color=ft.Colors.RED)
-            table_container.update()
+            screen.request_update(table_container)
+
+    def sort_proposals(order_by: str, descending: bool) -> None:
+        # Ordena todas as propostas no servidor e volta para a primeira página
+        query_state["order_by"] = order_by
+        query_state["descending"] = descending
+        load_proposals(query_state["search"], query_state["status"], 0)
 
     def handle_delete_request(proposal: Dict[str, Any]):
         proposal_id = proposal.get("id")
@@ -344,21 +354,18 @@ def create_propostas_content(screen: Any) -> ft.Control:
 
                 # Sucesso
                 screen.page.close(dlg)
-                snackbar = ft.SnackBar(ft.Text("Proposta excluída com sucesso!"), bgcolor=ft.Colors.GREEN_600)
-                screen.page.overlay.append(snackbar)
-                snackbar.open = True
-                screen.page.update()
+                screen.show_snackbar("Proposta excluída com sucesso!")
                 
-                # Refresh table
-                load_proposals(buyer_field.value)
+                # Refresh table (mesma página e filtros). Descarta também a view
+                # em cache e a primeira página pré-carregada (`proposals_first_page`)
+                repository.invalidate()
+                screen.navigation.invalidate("/comercializacao", {"submenu": "propostas"})
+                load_proposals(query_state["search"], query_state["status"], query_state["page"])
 
             except Exception as ex:
                 screen.page.close(dlg)
                 print(f"[ERROR] Delete failed: {ex}")
-                snackbar = ft.SnackBar(ft.Text(f"Erro ao excluir: {str(ex)}"), bgcolor=ft.Colors.RED_600)
-                screen.page.overlay.append(snackbar)
-                snackbar.open = True
-                screen.page.update()
+                screen.show_snackbar(f"Erro ao excluir: {str(ex)}", bgcolor=ft.Colors.RED_600)
 
         dlg = ft.AlertDialog(
             modal=True,
@@ -483,6 +490,100 @@ def create_propostas_content(screen: Any) -> ft.Control:
         on_click=lambda _: (setattr(buyer_field, 'value', ''), load_proposals()),
     )
 
+    def show_snackbar(message: str, color: str) -> None:
+        screen.show_snackbar(message, bgcolor=color)
+
+    def generate_selected(e: ft.ControlEvent) -> None:
+        if not selected_ids:
+            show_snackbar("Selecione ao menos uma proposta.", ft.Colors.ORANGE_600)
+            return
+
+        from helpers.storage import get_output_directory
+        output_dir = get_output_directory(screen.page)
+        if not output_dir:
+            show_snackbar(
+                "⚠️ Pasta de saída não configurada! Vá até o Backoffice e clique em "
+                "'Alterar Pasta de Saída'.",
+                ft.Colors.RED_600,
+            )
+            return
+
+        try:
+            # Propostas e sazonalidades já carregadas com a página; um job por proposta
+            from scripts.document_jobs import get_document_job_queue
+
+            queue = get_document_job_queue()
+            records = repository.records_for(list(selected_ids))
+            for proposal, seasonalities in records:
+                queue.submit_proposal(proposal, output_dir, seasonalities=seasonalities)
+            show_snackbar(f"{len(records)} proposta(s) adicionada(s) à fila de geração", ft.Colors.BLUE_600)
+        except Exception as ex:
+            print(f"ERROR queueing proposals batch: {ex}")
+            show_snackbar(f"Erro ao gerar propostas: {ex}", ft.Colors.RED_600)
+
+    batch_button = ft.ElevatedButton(
+        text="Gerar Selecionadas",
+        icon=ft.Icons.LIBRARY_BOOKS,
+        bgcolor=ft.Colors.BLUE_600,
+        color=ft.Colors.WHITE,
+        style=ft.ButtonStyle(
+            shape=ft.RoundedRectangleBorder(radius=6),
+            padding=ft.padding.symmetric(horizontal=0, vertical=0),
+        ),
+        width=button_width,
+        height=button_height,
+        on_click=generate_selected,
+    )
+
+    def export_selected(e: ft.ControlEvent) -> None:
+        if not selected_ids:
+            show_snackbar("Selecione ao menos uma proposta.", ft.Colors.ORANGE_600)
+            return
+
+        from helpers.storage import get_output_directory
+        output_dir = get_output_directory(screen.page)
+        if not output_dir:
+            show_snackbar(
+                "⚠️ Pasta de saída não configurada! Vá até o Backoffice e clique em "
+                "'Alterar Pasta de Saída'.",
+                ft.Colors.RED_600,
+            )
+            return
+
+        from scripts.document_export import default_zip_name, export_documents_zip
+
+        ids = list(selected_ids)
+        zip_path = os.path.join(output_dir, default_zip_name())
+
+        def run_export() -> None:
+            # Espera a fila de documentos; fora da thread da interface
+            try:
+                result = export_documents_zip(ids, output_dir, zip_path, records=repository.records_for(ids))
+                message = f"ZIP gerado com {result['exported']} proposta(s): {result['zip_path']}"
+                if result["failed"]:
+                    message += f" ({result['failed']} com erro, ver manifest.csv)"
+                show_snackbar(message, ft.Colors.GREEN_600 if not result["failed"] else ft.Colors.ORANGE_600)
+            except Exception as ex:
+                print(f"ERROR exporting proposals zip: {ex}")
+                show_snackbar(f"Erro ao exportar ZIP: {ex}", ft.Colors.RED_600)
+
+        threading.Thread(target=run_export, daemon=True).start()
+        show_snackbar(f"Exportando {len(ids)} proposta(s) para ZIP...", ft.Colors.BLUE_600)
+
+    export_button = ft.ElevatedButton(
+        text="Exportar ZIP",
+        icon=ft.Icons.FOLDER_ZIP,
+        bgcolor=ft.Colors.BLUE_600,
+        color=ft.Colors.WHITE,
+        style=ft.ButtonStyle(
+            shape=ft.RoundedRectangleBorder(radius=6),
+            padding=ft.padding.symmetric(horizontal=0, vertical=0),
+        ),
+        width=button_width,
+        height=button_height,
+        on_click=export_selected,
+    )
+
     actions_row = ft.Row(
         controls=[
             search_button,
@@ -490,16 +591,18 @@ def create_propostas_content(screen: Any) -> ft.Control:
             pending_button,
             accepted_button,
             all_button,
+            batch_button,
+            export_button,
         ],
         spacing=12,
         alignment=ft.MainAxisAlignment.START,
     )
 
-    # Initial Load
+    # Initial Load (primeira página possivelmente pré-carregada em tempo ocioso)
     try:
-        initial_proposals = read_records("proposals")
-        initial_proposals.sort(key=lambda x: x.get("created_at", ""), reverse=True)
-        table_container.content = _create_proposals_table(initial_proposals, screen, handle_delete_request)
+        first_page = prefetched("proposals_first_page", repository.list_page)
+        repository.remember_page(first_page.items, first_page.seasonalities)
+        show_page(first_page)
     except Exception as e:
         table_container.content = ft.Text(f"Erro ao carregar propostas: {e}", color=ft.Colors.RED)
 
@@ -518,6 +621,7 @@ def create_propostas_content(screen: Any) -> ft.Control:
                     controls=[table_container],
                     scroll=ft.ScrollMode.ALWAYS,
                 ),
+                pager_row,
             ],
             spacing=6,
             alignment=ft.MainAxisAlignment.START,
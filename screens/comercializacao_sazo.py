@@ -1,23 +1,9 @@
 import flet as ft
 from datetime import datetime
 from typing import Any, Dict, Optional, List
+from helpers.seasonality_grid import SeasonalityGrid
 from scripts.database import read_records, create_record, update_record
 
-# Constantes de horas por mês
-HOURS_PER_MONTH = [
-    744,  # Jan
-    672,  # Fev (28 dias - simplificado)
-    744,  # Mar
-    720,  # Abr
-    744,  # Mai
-    720,  # Jun
-    744,  # Jul
-    744,  # Ago
-    720,  # Set
-    744,  # Out
-    720,  # Nov
-    744,  # Dez
-]
 
 def create_sazo_content(screen: Any, contract_id: str, start_date: Any, end_date: Any) -> ft.Control:
     """
@@ -74,9 +60,7 @@ def create_sazo_content(screen: Any, contract_id: str, start_date: Any, end_date
                 existing_data_map[int(y)] = r
     except Exception as e:
         print(f"Erro ao carregar sazonalidades: {e}")
-        screen.page.show_snack_bar(
-            ft.SnackBar(content=ft.Text(f"Erro ao carregar dados: {e}"), bgcolor=ft.Colors.RED_600)
-        )
+        screen.show_snackbar(f"Erro ao carregar dados: {e}", bgcolor=ft.Colors.RED_600)
 
     # Armazenar dados do formulário
     # Estrutura: { ano: { 'year': ..., 'contract_id': ..., 'db_id': ..., 'price_energy': ..., ... } }
@@ -104,56 +88,28 @@ def create_sazo_content(screen: Any, contract_id: str, start_date: Any, end_date
             on_change=on_change,
         )
 
-    def atualizar_dados(ano, campo, valor):
+    # Valores numéricos da grade (preço, volume e meses) e a curva flat; a
+    # digitação só guarda o valor e os meses derivados saem em um único envio
+    grade = SeasonalityGrid(
+        fields=('price_energy', 'medium_volume'),
+        month_keys=meses_keys,
+        volume_field='medium_volume',
+        on_flush=lambda campos: screen.request_update(*campos),
+    )
+
+    def _garantir_ano(ano):
         if ano not in form_data:
             form_data[ano] = {'year': ano, 'contract_id': contract_id}
 
+    def atualizar_dados(ano, campo, valor):
+        _garantir_ano(ano)
         if campo in ['price_energy', 'medium_volume'] or campo in meses_keys:
-            try:
-                # Substitui vírgula por ponto para conversão
-                val_str = str(valor).replace(',', '.')
-                val_float = float(val_str) if val_str else None
-                form_data[ano][campo] = val_float
-                
-                # Lógica do Flat Switch
-                # Se alterou medium_volume e flat está ativo, recalcula meses
-                if campo == 'medium_volume':
-                    # Encontrar a referência da linha
-                    linha_ref = next((r for r in linhas_refs if r['ano'] == ano), None)
-                    if linha_ref and linha_ref['flat'].value:
-                        aplicar_flat(ano, linha_ref, val_float)
-
-            except ValueError:
-                form_data[ano][campo] = None
+            grade.set_text(ano, campo, valor)
         else:
             form_data[ano][campo] = valor
 
-    def aplicar_flat(ano, linha_ref, volume_medio):
-        if volume_medio is None:
-            return
-        
-        for idx, mes_key in enumerate(meses_keys):
-            horas = HOURS_PER_MONTH[idx]
-            valor_mes = volume_medio * horas
-            
-            # Atualiza form_data
-            form_data[ano][mes_key] = valor_mes
-            
-            # Atualiza UI
-            if idx < len(linha_ref['meses']):
-                linha_ref['meses'][idx].value = f"{valor_mes:.2f}"
-        
-        screen.page.update()
-
     def on_flat_change(e, ano):
-        is_flat = e.control.value
-        if is_flat:
-            # Pega o volume médio atual
-            vol_medio = form_data.get(ano, {}).get('medium_volume')
-            if vol_medio is not None:
-                linha_ref = next((r for r in linhas_refs if r['ano'] == ano), None)
-                if linha_ref:
-                    aplicar_flat(ano, linha_ref, vol_medio)
+        grade.set_flat(ano, e.control.value)
 
     def limpar_linha(e, ano):
         linha_ref = next((r for r in linhas_refs if r['ano'] == ano), None)
@@ -168,15 +124,11 @@ def create_sazo_content(screen: Any, contract_id: str, start_date: Any, end_date
             if db_id:
                 form_data[ano]['db_id'] = db_id
 
-        # Limpar UI
-        linha_ref['preco'].value = ""
-        linha_ref['volume'].value = ""
+        # Limpar UI (os campos de texto são esvaziados pela grade)
         linha_ref['garantia'].value = False
         linha_ref['flat'].value = False
-        for campo in linha_ref['meses']:
-            campo.value = ""
-        
-        screen.page.update()
+        screen.request_update(linha_ref['garantia'], linha_ref['flat'])
+        grade.clear_row(ano)
 
     def copiar_primeira_linha(e):
         if not linhas_refs or len(linhas_refs) < 2:
@@ -188,43 +140,18 @@ def create_sazo_content(screen: Any, contract_id: str, start_date: Any, end_date
         # Dados da origem
         dados_origem = form_data.get(ano_origem, {})
 
-        # Copiar para todas as linhas abaixo
-        for i in range(1, len(linhas_refs)):
-            linha = linhas_refs[i]
-            ano_destino = linha['ano']
-
-            # Copiar UI
-            linha['preco'].value = primeira_linha['preco'].value
-            linha['volume'].value = primeira_linha['volume'].value
+        # Não copiamos o estado do switch Flat, mas copiamos os valores resultantes
+        anos_destino = [linha['ano'] for linha in linhas_refs[1:]]
+        for linha in linhas_refs[1:]:
             linha['garantia'].value = primeira_linha['garantia'].value
-            # Não copiamos o estado do switch Flat, mas copiamos os valores resultantes
-            # linha['flat'].value = primeira_linha['flat'].value 
-            
-            for j in range(12):
-                linha['meses'][j].value = primeira_linha['meses'][j].value
-            
-            # Atualizar form_data
-            if ano_destino not in form_data:
-                form_data[ano_destino] = {'year': ano_destino, 'contract_id': contract_id}
-            
-            # Preservar db_id se existir
-            db_id = form_data[ano_destino].get('db_id')
-            
-            # Copiar valores
-            for key in ['price_energy', 'medium_volume', 'financial_guarantee'] + meses_keys:
-                if key in dados_origem:
-                    form_data[ano_destino][key] = dados_origem[key]
-            
-            if db_id:
-                form_data[ano_destino]['db_id'] = db_id
+            _garantir_ano(linha['ano'])
+            if 'financial_guarantee' in dados_origem:
+                form_data[linha['ano']]['financial_guarantee'] = dados_origem['financial_guarantee']
 
-        screen.page.update()
-        screen.page.show_snack_bar(
-            ft.SnackBar(
-                content=ft.Text("✅ Dados copiados para todas as linhas!"),
-                bgcolor=ft.Colors.GREEN_600,
-            )
-        )
+        screen.request_update(*(linha['garantia'] for linha in linhas_refs[1:]))
+        # Campos e meses de todas as linhas em um único envio, junto com o snackbar
+        grade.copy_row(ano_origem, anos_destino)
+        screen.show_snackbar("✅ Dados copiados para todas as linhas!")
 
     def criar_linha_ano(ano, is_first=False):
         # Recuperar dados existentes se houver
@@ -237,6 +164,7 @@ def create_sazo_content(screen: Any, contract_id: str, start_date: Any, end_date
             form_data[ano]['year'] = ano
             form_data[ano]['contract_id'] = contract_id
             form_data[ano]['db_id'] = dados_existentes.get('id') # Guardar ID para update
+            grade.load(ano, dados_existentes)
 
         campos_meses = []
         refs = {'ano': ano}
@@ -249,6 +177,7 @@ def create_sazo_content(screen: Any, contract_id: str, start_date: Any, end_date
             on_change=lambda e: atualizar_dados(ano, 'price_energy', e.control.value)
         )
         refs['preco'] = preco_field
+        grade.bind(ano, 'price_energy', preco_field)
 
         # Campo Volume MWm
         val_volume = dados_existentes.get('medium_volume')
@@ -258,6 +187,7 @@ def create_sazo_content(screen: Any, contract_id: str, start_date: Any, end_date
             on_change=lambda e: atualizar_dados(ano, 'medium_volume', e.control.value)
         )
         refs['volume'] = volume_field
+        grade.bind(ano, 'medium_volume', volume_field)
 
         # Switch garantia
         val_garantia = dados_existentes.get('financial_guarantee', False)
@@ -285,6 +215,7 @@ def create_sazo_content(screen: Any, contract_id: str, start_date: Any, end_date
                 value=val_mes,
                 on_change=lambda e, mk=mes_key: atualizar_dados(ano, mk, e.control.value)
             )
+            grade.bind(ano, mes_key, campo)
             campos_meses.append(campo)
         refs['meses'] = campos_meses
 
@@ -337,9 +268,7 @@ def create_sazo_content(screen: Any, contract_id: str, start_date: Any, end_date
 
     def salvar_dados(e):
         if not form_data:
-            screen.page.show_snack_bar(
-                ft.SnackBar(content=ft.Text("⚠ Preencha os dados primeiro!"), bgcolor=ft.Colors.ORANGE_600)
-            )
+            screen.show_snackbar("⚠ Preencha os dados primeiro!", bgcolor=ft.Colors.ORANGE_600)
             return
 
         count_sucesso = 0
@@ -350,16 +279,13 @@ def create_sazo_content(screen: Any, contract_id: str, start_date: Any, end_date
             # Se tudo for None, talvez devêssemos ignorar ou limpar?
             # O usuário pediu para salvar. Vamos salvar o que tem.
             
-            # Preparar payload
+            # Preparar payload (preço, volume e meses vêm da grade)
             payload = {
                 'year': dados.get('year'),
                 'contract_id': dados.get('contract_id'),
-                'price_energy': dados.get('price_energy'),
-                'medium_volume': dados.get('medium_volume'),
                 'financial_guarantee': dados.get('financial_guarantee', False),
+                **grade.record(ano),
             }
-            for mk in meses_keys:
-                payload[mk] = dados.get(mk)
 
             db_id = dados.get('db_id')
             
@@ -386,23 +312,12 @@ def create_sazo_content(screen: Any, contract_id: str, start_date: Any, end_date
 
         if erros:
             print("Erros ao salvar:", erros)
-            snackbar = ft.SnackBar(
-                content=ft.Text(f"⚠ Erro ao salvar alguns registros. Verifique o console."),
-                bgcolor=ft.Colors.RED_600,
-            )
-            screen.page.overlay.append(snackbar)
-            snackbar.open = True
-            screen.page.update()
+            screen.show_snackbar(f"⚠ Erro ao salvar alguns registros. Verifique o console.", bgcolor=ft.Colors.RED_600)
         else:
-            snackbar = ft.SnackBar(
-                content=ft.Text(f"✅ {count_sucesso} registro(s) salvo(s) com sucesso!"),
-                bgcolor=ft.Colors.GREEN_600,
-            )
-            screen.page.overlay.append(snackbar)
-            snackbar.open = True
-            screen.page.update()
+            screen.show_snackbar(f"✅ {count_sucesso} registro(s) salvo(s) com sucesso!")
         
         # Retornar para a tela de contratos
+        screen.navigation.invalidate("/comercializacao")
         screen.navigation.go("/comercializacao", params={"submenu": "contratos"})
 
     def cancelar(e):
@@ -1,22 +1,10 @@
+import importlib
+from types import ModuleType
 from typing import Any, Dict, Optional
 from datetime import datetime
 
 import flet as ft
 from screens import BaseScreen
-from screens import (
-    comercializacao_contratos,
-    comercializacao_novo_contrato,
-    comercializacao_portfolio,
-    comercializacao_visao_geral,
-    comercializacao_fluxos,
-    comercializacao_clientes,
-    comercializacao_produtos,
-    comercializacao_sazo,
-    comercializacao_precos,
-    comercializacao_novo_preco,
-    comercializacao_propostas,
-    comercializacao_nova_proposta,
-)
 from scripts.comercializacao_service import (
     MONTH_LABELS,
     get_client_dashboard_data,
@@ -24,8 +12,57 @@ from scripts.comercializacao_service import (
 )
 
 
+def _submenu_module(name: str) -> ModuleType:
+    """Importa o módulo da subtela só quando ela é aberta pela primeira vez.
+
+    As subtelas trazem pandas, requests e python-docx; importá-las junto com
+    a tela deixaria a abertura da Comercialização (e da aplicação) mais lenta.
+    """
+    return importlib.import_module(f"screens.{name}")
+
+
 class ComercializacaoScreen(BaseScreen):
     route: str = "/comercializacao"
+    cacheable: bool = True
+
+    # Parâmetros que abrem formulários; essas views não entram no cache
+    _FORM_VIEW_PARAMS = ("contracts_view", "precos_view", "propostas_view")
+
+    # Submenus na ordem do menu: (rótulo, chave, ícone)
+    _SUBMENU_ITEMS = (
+        ("Portfólio", "visao", ft.Icons.INSIGHTS),
+        ("Visão Geral", "visao_geral", ft.Icons.DASHBOARD),
+        ("Fluxos", "fluxos", ft.Icons.TIMELINE),
+        ("Contratos", "contratos", ft.Icons.DESCRIPTION),
+        ("Preços", "precos", ft.Icons.ATTACH_MONEY),
+        ("Propostas", "propostas", ft.Icons.SHOPPING_BAG),
+    )
+
+    # Dados de cada submenu que podem ser pré-carregados (ver scripts.prefetch)
+    _PREFETCH_BY_SUBMENU = {
+        "visao": ("contract_clients",),
+        "contratos": ("contracts", "traders"),
+        "precos": ("best_prices", "traders"),
+        "propostas": ("proposals_first_page",),
+    }
+
+    @classmethod
+    def is_cacheable(cls, params: Optional[Dict[str, Any]] = None) -> bool:
+        params = params or {}
+        return cls.cacheable and not any(params.get(name) for name in cls._FORM_VIEW_PARAMS)
+
+    @classmethod
+    def prefetch_keys(cls, params: Optional[Dict[str, Any]] = None) -> list[str]:
+        """Dados dos outros submenus, do mais próximo ao mais distante no menu."""
+        selected = (params or {}).get("submenu", "visao")
+        order = [key for _, key, _ in cls._SUBMENU_ITEMS]
+        position = order.index(selected) if selected in order else 0
+        current = set(cls._PREFETCH_BY_SUBMENU.get(selected, ()))
+        keys: list[str] = []
+        for submenu in sorted(order, key=lambda key: abs(order.index(key) - position)):
+            if submenu != selected:
+                keys.extend(k for k in cls._PREFETCH_BY_SUBMENU.get(submenu, ()) if k not in current)
+        return list(dict.fromkeys(keys))
 
     def create_header(self) -> ft.Control:
         return self._create_header_container()
@@ -140,14 +177,7 @@ class ComercializacaoScreen(BaseScreen):
     # ------------------------------------------------------------------
     def _create_submenu_items(self) -> list[tuple[str, str, str]]:
         """Retorna a definição dos submenus da área de Comercialização."""
-        return [
-            ("Portfólio", "visao", ft.Icons.INSIGHTS),
-            ("Visão Geral", "visao_geral", ft.Icons.DASHBOARD),
-            ("Fluxos", "fluxos", ft.Icons.TIMELINE),
-            ("Contratos", "contratos", ft.Icons.DESCRIPTION),
-            ("Preços", "precos", ft.Icons.ATTACH_MONEY),
-            ("Propostas", "propostas", ft.Icons.SHOPPING_BAG),
-        ]
+        return list(self._SUBMENU_ITEMS)
 
     def _create_submenu_button(
         self,
@@ -239,7 +269,7 @@ class ComercializacaoScreen(BaseScreen):
             },
         )
         if selected_submenu == "visao":
-            inner = comercializacao_portfolio.create_portfolio_content(
+            inner = _submenu_module("comercializacao_portfolio").create_portfolio_content(
                 self,
                 selected_client,
                 energy_type,
@@ -247,13 +277,13 @@ class ComercializacaoScreen(BaseScreen):
                 contract_type,
             )
         elif selected_submenu == "visao_geral":
-            inner = comercializacao_visao_geral.create_visao_geral_content(self)
+            inner = _submenu_module("comercializacao_visao_geral").create_visao_geral_content(self)
         elif selected_submenu == "fluxos":
-            inner = comercializacao_fluxos.create_fluxos_content(self)
+            inner = _submenu_module("comercializacao_fluxos").create_fluxos_content(self)
         elif selected_submenu == "contratos":
             if contracts_view == "new":
                 print("[ComercializacaoScreen] Abrindo formulário de novo contrato")
-                inner = comercializacao_novo_contrato.create_novo_contrato_content(
+                inner = _submenu_module("comercializacao_novo_contrato").create_novo_contrato_content(
                     self,
                     buyer_filter,
                     seller_filter,
@@ -265,7 +295,7 @@ class ComercializacaoScreen(BaseScreen):
 
             elif contracts_view == "sazo":
                 print("[ComercializacaoScreen] Abrindo formulário de sazonalidade")
-                inner = comercializacao_sazo.create_sazo_content(
+                inner = _submenu_module("comercializacao_sazo").create_sazo_content(
                     self,
                     contract_id=contract_id,
                     start_date=start_date,
@@ -274,7 +304,7 @@ class ComercializacaoScreen(BaseScreen):
                 return inner
             else:
                 print("[ComercializacaoScreen] Abrindo listagem de contratos")
-                inner = comercializacao_contratos.create_contratos_content(
+                inner = _submenu_module("comercializacao_contratos").create_contratos_content(
                     self,
                     buyer_filter,
                     seller_filter,
@@ -282,17 +312,17 @@ class ComercializacaoScreen(BaseScreen):
         elif selected_submenu == "precos":
             if precos_view == "new":
                 print("[ComercializacaoScreen] Abrindo formulário de novo preço")
-                inner = comercializacao_novo_preco.create_novo_preco_content(self)
+                inner = _submenu_module("comercializacao_novo_preco").create_novo_preco_content(self)
                 return inner
             else:
-                inner = comercializacao_precos.create_precos_content(self)
+                inner = _submenu_module("comercializacao_precos").create_precos_content(self)
         elif selected_submenu == "propostas":
             if propostas_view == "new":
                 print("[ComercializacaoScreen] Abrindo formulário de nova proposta")
-                inner = comercializacao_nova_proposta.create_nova_proposta_content(self, proposal_id=proposal_id)
+                inner = _submenu_module("comercializacao_nova_proposta").create_nova_proposta_content(self, proposal_id=proposal_id)
                 return inner
             else:
-                inner = comercializacao_propostas.create_propostas_content(self)
+                inner = _submenu_module("comercializacao_propostas").create_propostas_content(self)
         else:
             # Fallback
             inner = self._create_dashboard_content()
@@ -0,0 +1,152 @@
+"""Painel fixo com a fila de geração de documentos.
+
+Fica no layout raiz, abaixo do conteúdo, então continua visível (e sendo
+atualizado) enquanto o usuário navega entre as telas. A inscrição não cria
+a fila: o painel só passa a ouvir quando o primeiro documento é enfileirado.
+"""
+
+import threading
+from pathlib import Path
+from typing import Optional
+
+import flet as ft
+
+from helpers.update_scheduler import UpdateScheduler
+from scripts.document_jobs import (
+    STATUS_CANCELLED,
+    STATUS_DONE,
+    STATUS_ERROR,
+    STATUS_QUEUED,
+    DocumentJob,
+    get_document_job_queue,
+    subscribe_when_created,
+)
+
+
+STATUS_ICONS = {
+    STATUS_QUEUED: (ft.Icons.SCHEDULE, ft.Colors.GREY_600),
+    STATUS_DONE: (ft.Icons.CHECK_CIRCLE, ft.Colors.GREEN),
+    STATUS_ERROR: (ft.Icons.ERROR, ft.Colors.RED_600),
+    STATUS_CANCELLED: (ft.Icons.CANCEL, ft.Colors.GREY_500),
+}
+
+
+def create_document_jobs_panel(page: ft.Page, updates: UpdateScheduler) -> ft.Control:
+    """Cria o painel e o inscreve na fila compartilhada de documentos.
+
+    O progresso dos documentos chega em rajadas (vários eventos por
+    segundo); cada evento só marca o painel, e `updates` o envia uma vez
+    por quadro.
+    """
+    expanded = {"value": True}
+    refresh_lock = threading.Lock()
+
+    title = ft.Text("", size=13, weight=ft.FontWeight.BOLD, color=ft.Colors.GREY_900)
+    jobs_column = ft.Column(spacing=2, scroll=ft.ScrollMode.AUTO, height=150)
+
+    def open_output(job: DocumentJob) -> None:
+        if job.output_path:
+            page.launch_url(Path(job.output_path).resolve().as_uri())
+
+    def job_row(job: DocumentJob) -> ft.Control:
+        if job.status in STATUS_ICONS:
+            icon_name, icon_color = STATUS_ICONS[job.status]
+            status_icon = ft.Icon(icon_name, color=icon_color, size=18)
+        else:
+            status_icon = ft.ProgressRing(width=16, height=16, stroke_width=2, color=ft.Colors.BLUE_600)
+
+        if job.is_finished:
+            action = ft.IconButton(
+                icon=ft.Icons.OPEN_IN_NEW,
+                icon_size=18,
+                tooltip="Abrir arquivo",
+                visible=job.status == STATUS_DONE,
+                on_click=lambda _, j=job: open_output(j),
+            )
+        else:
+            action = ft.IconButton(
+                icon=ft.Icons.CLOSE,
+                icon_size=18,
+                tooltip="Cancelar",
+                disabled=job.cancel_requested,
+                on_click=lambda _, job_id=job.id: get_document_job_queue().cancel(job_id),
+            )
+
+        return ft.Row(
+            controls=[
+                status_icon,
+                ft.Text(job.label, size=12, width=260, no_wrap=True, tooltip=job.label),
+                ft.ProgressBar(
+                    value=job.progress,
+                    width=160,
+                    color=ft.Colors.RED_600 if job.status == STATUS_ERROR else ft.Colors.BLUE_600,
+                    bgcolor=ft.Colors.GREY_300,
+                ),
+                ft.Text(
+                    job.message,
+                    size=12,
+                    color=ft.Colors.RED_600 if job.status == STATUS_ERROR else ft.Colors.GREY_700,
+                    expand=True,
+                    no_wrap=True,
+                    tooltip=job.output_path or job.message,
+                ),
+                action,
+            ],
+            spacing=10,
+            vertical_alignment=ft.CrossAxisAlignment.CENTER,
+        )
+
+    def refresh(_job: Optional[DocumentJob] = None) -> None:
+        # Chamado pelas threads da fila; serializa a reconstrução das linhas
+        with refresh_lock:
+            jobs = get_document_job_queue().jobs()
+            active = sum(1 for job in jobs if not job.is_finished)
+            failed = sum(1 for job in jobs if job.status == STATUS_ERROR)
+            summary = f"Documentos: {active} em andamento, {len(jobs) - active} encerrado(s)"
+            if failed:
+                summary += f" ({failed} com erro)"
+
+            title.value = summary
+            jobs_column.controls = [job_row(job) for job in reversed(jobs)]
+            jobs_column.visible = expanded["value"]
+            toggle_button.icon = ft.Icons.EXPAND_MORE if expanded["value"] else ft.Icons.EXPAND_LESS
+            clear_button.disabled = active == len(jobs)
+            panel.visible = bool(jobs)
+            updates.invalidate(panel)
+
+    def toggle(_: ft.ControlEvent) -> None:
+        expanded["value"] = not expanded["value"]
+        refresh()
+
+    toggle_button = ft.IconButton(icon=ft.Icons.EXPAND_MORE, icon_size=20, tooltip="Mostrar/ocultar", on_click=toggle)
+    clear_button = ft.TextButton(
+        text="Limpar encerrados",
+        on_click=lambda _: get_document_job_queue().clear_finished(),
+    )
+
+    panel = ft.Container(
+        visible=False,
+        bgcolor=ft.Colors.GREY_100,
+        border=ft.border.only(top=ft.BorderSide(1, ft.Colors.GREY_300)),
+        padding=ft.padding.symmetric(horizontal=16, vertical=6),
+        content=ft.Column(
+            controls=[
+                ft.Row(
+                    controls=[
+                        ft.Icon(ft.Icons.DESCRIPTION, color=ft.Colors.BLUE_600, size=18),
+                        title,
+                        ft.Container(expand=True),
+                        clear_button,
+                        toggle_button,
+                    ],
+                    spacing=8,
+                    vertical_alignment=ft.CrossAxisAlignment.CENTER,
+                ),
+                jobs_column,
+            ],
+            spacing=2,
+        ),
+    )
+
+    subscribe_when_created(refresh)
+    return panel
@@ -1,74 +1,100 @@
 import flet as ft
 
-def NavBar(on_nav, selected_nav=None, on_cadastro_option=None):
-    nav_items = [
-        ("Backoffice", "backoffice"),
-        ("Comercialização", "comercializacao"),
-        ("Financeiro", "financeiro"),
-        ("Banco de dados", "banco_de_dados"),
-        ("E-mails", "emails"),
-        ("Relatórios", "relatorios"),
-        ("Simulador", "simulador"),
-        ("Logout", "logout"),
-    ]
-    def handle_nav(e):
-        if on_nav:
-            on_nav(e.control.data)
-    def handle_cadastro(e):
-        if on_nav:
-            on_nav("cadastro")
-    return ft.Row(
-        controls=[
-            ft.Container(
-                content=ft.Row(
-                    [
-                        ft.Text(
-                            "MER",
-                            size=22,
-                            weight=ft.FontWeight.BOLD,
-                            color=ft.Colors.BLACK,
-                        ),
-                        ft.Text(
-                            "X",
-                            size=22,
-                            weight=ft.FontWeight.BOLD,
-                            color=ft.Colors.GREEN,
-                        ),
-                        ft.Text(
-                            " Energia",
-                            size=22,
-                            weight=ft.FontWeight.BOLD,
-                            color=ft.Colors.BLACK,
-                        ),
-                    ],
-                    spacing=0,
-                    vertical_alignment=ft.CrossAxisAlignment.CENTER,
-                ),
-                padding=ft.padding.only(left=10),
-            ),
-            ft.Container(expand=True),
-            *[
-                ft.TextButton(
-                    text=label,
-                    data=data,
-                    on_click=handle_nav,
-                    style=ft.ButtonStyle(
-                        color=(
-                            ft.Colors.BLUE_600
-                            if selected_nav == data
-                            else ft.Colors.GREY_800
-                        ),
-                        bgcolor=(
-                            ft.Colors.BLUE_50
-                            if selected_nav == data
-                            else None
-                        ),
-                        padding=ft.padding.symmetric(horizontal=16, vertical=8),
+NAV_ITEMS = [
+    ("Backoffice", "backoffice"),
+    ("Comercialização", "comercializacao"),
+    ("Financeiro", "financeiro"),
+    ("Banco de dados", "banco_de_dados"),
+    ("E-mails", "emails"),
+    ("Relatórios", "relatorios"),
+    ("Simulador", "simulador"),
+    ("Logout", "logout"),
+]
+
+
+def _nav_button_style(selected):
+    return ft.ButtonStyle(
+        color=ft.Colors.BLUE_600 if selected else ft.Colors.GREY_800,
+        bgcolor=ft.Colors.BLUE_50 if selected else None,
+        padding=ft.padding.symmetric(horizontal=16, vertical=8),
+    )
+
+
+class NavBar(ft.Row):
+    """Barra de navegação fixa no topo.
+
+    A barra é criada uma única vez; ao trocar de rota, `set_selected` altera
+    apenas o estilo dos itens que mudaram, então o próximo `page.update()`
+    envia só essas propriedades em vez da barra inteira.
+    """
+
+    def __init__(self, on_nav, selected_nav=None, on_cadastro_option=None):
+        self.on_nav = on_nav
+        self.on_cadastro_option = on_cadastro_option
+        self.selected_nav = selected_nav
+        self._buttons = {
+            data: ft.TextButton(
+                text=label,
+                data=data,
+                on_click=self._handle_nav,
+                style=_nav_button_style(selected_nav == data),
+            )
+            for label, data in NAV_ITEMS
+        }
+        super().__init__(
+            controls=[
+                ft.Container(
+                    content=ft.Row(
+                        [
+                            ft.Text(
+                                "MER",
+                                size=22,
+                                weight=ft.FontWeight.BOLD,
+                                color=ft.Colors.BLACK,
+                            ),
+                            ft.Text(
+                                "X",
+                                size=22,
+                                weight=ft.FontWeight.BOLD,
+                                color=ft.Colors.GREEN,
+                            ),
+                            ft.Text(
+                                " Energia",
+                                size=22,
+                                weight=ft.FontWeight.BOLD,
+                                color=ft.Colors.BLACK,
+                            ),
+                        ],
+                        spacing=0,
+                        vertical_alignment=ft.CrossAxisAlignment.CENTER,
                     ),
-                )
-                for label, data in nav_items
+                    padding=ft.padding.only(left=10),
+                ),
+                ft.Container(expand=True),
+                *self._buttons.values(),
             ],
-        ],
-        alignment=ft.MainAxisAlignment.START,
-        spacing=0,
-    )
\ No newline at end of file
+            alignment=ft.MainAxisAlignment.START,
+            spacing=0,
+        )
+
+    def _handle_nav(self, e):
+        if self.on_nav:
+            self.on_nav(e.control.data)
+
+    def set_selected(self, key):
+        """Marca o item `key` como selecionado, alterando só os itens afetados.
+
+        Não chama `update()`: quem navega atualiza a página uma vez no fim.
+        Retorna os botões alterados.
+        """
+        if key == self.selected_nav:
+            return []
+
+        changed = []
+        for data in (self.selected_nav, key):
+            button = self._buttons.get(data)
+            if button is not None:
+                button.style = _nav_button_style(data == key)
+                changed.append(button)
+        self.selected_nav = key
+        return changed
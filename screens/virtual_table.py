@@ -0,0 +1,272 @@
+"""Tabela virtualizada para listagens longas (contratos, propostas).
+
+As linhas ficam em um `ft.ListView` com altura fixa por item, então o Flutter
+só desenha as visíveis; do lado do Python, os controles das linhas são
+criados em blocos conforme o usuário rola, em vez de todos de uma vez. O
+clique no cabeçalho ordena a coluna: localmente (`sort_key`) ou pedindo uma
+nova página ao servidor (`sort_field` + `on_sort`). As mudanças da tabela
+são enviadas por `request_update` (ver `BaseScreen.request_update`), junto
+com as demais do mesmo quadro.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, List, Optional
+
+import flet as ft
+
+
+ROW_HEIGHT = 40
+HEADER_HEIGHT = 44
+# Linhas visíveis antes de a tabela passar a rolar
+VISIBLE_ROWS = 12
+# Linhas materializadas por vez (na abertura e a cada chegada ao fim da rolagem)
+CHUNK_SIZE = 40
+# Distância (px) do fim da lista em que o próximo bloco é criado
+LOAD_MORE_THRESHOLD = ROW_HEIGHT * 10
+
+RowData = Dict[str, Any]
+
+
+def _sort_value(value: Any) -> tuple:
+    # Vazios sempre no fim (na ordem crescente), sem comparar None com texto
+    return (value is None or value == "", value if value is not None else "")
+
+
+class TableColumn:
+    """Coluna da VirtualTable.
+
+    `text(row)` gera o texto da célula; `cell(row, index)` gera um controle
+    próprio (ícones, botões de ação, checkbox). `sort_key(row)` habilita a
+    ordenação local e `sort_field` a ordenação no servidor. `header`
+    substitui o título (ex.: checkbox de selecionar todas).
+    """
+
+    def __init__(
+        self,
+        label: str,
+        width: int,
+        *,
+        text: Optional[Callable[[RowData], str]] = None,
+        cell: Optional[Callable[[RowData, int], ft.Control]] = None,
+        sort_key: Optional[Callable[[RowData], Any]] = None,
+        sort_field: Optional[str] = None,
+        header: Optional[ft.Control] = None,
+        padding: int = 10,
+    ):
+        self.label = label
+        self.width = width
+        self.text = text
+        self.cell = cell
+        self.sort_key = sort_key
+        self.sort_field = sort_field
+        self.header = header
+        self.padding = padding
+
+    @property
+    def sortable(self) -> bool:
+        return self.sort_key is not None or self.sort_field is not None
+
+
+class VirtualTable(ft.Container):
+    """Tabela com cabeçalho ordenável e linhas materializadas sob demanda."""
+
+    def __init__(
+        self,
+        columns: List[TableColumn],
+        rows: List[RowData],
+        *,
+        request_update: Callable[..., None],
+        on_sort: Optional[Callable[[str, bool], None]] = None,
+        sort_field: Optional[str] = None,
+        descending: bool = False,
+        visible_rows: int = VISIBLE_ROWS,
+        chunk_size: int = CHUNK_SIZE,
+        empty_message: str = "Nenhum registro encontrado.",
+    ):
+        self.columns = columns
+        self._request_update = request_update
+        self.on_sort = on_sort
+        self.visible_rows = visible_rows
+        self.chunk_size = max(1, chunk_size)
+        self.empty_message = empty_message
+        # Coluna ordenada: sort_field (servidor) ou o rótulo (ordenação local)
+        self.sorted_by = sort_field
+        self.descending = descending
+        self._rows: List[RowData] = list(rows)
+        self._materialized = 0
+
+        self._header_row = ft.Row(spacing=0)
+        self._list_view = ft.ListView(
+            spacing=0,
+            item_extent=ROW_HEIGHT,
+            on_scroll=self._on_scroll,
+        )
+        self._empty_text = ft.Container(
+            padding=20,
+            content=ft.Text(empty_message, size=13, color=ft.Colors.GREY_600),
+        )
+        total_width = sum(column.width for column in columns)
+
+        super().__init__(
+            content=ft.Column(
+                controls=[self._header_row, self._list_view, self._empty_text],
+                spacing=0,
+            ),
+            width=total_width,
+            border=ft.border.all(1, ft.Colors.GREY_300),
+            border_radius=8,
+            bgcolor=ft.Colors.WHITE,
+        )
+        self._render_header()
+        self._reset_rows()
+
+    # -- dados -----------------------------------------------------------
+    @property
+    def rows(self) -> List[RowData]:
+        """Linhas na ordem exibida (inclui as ainda não materializadas)."""
+        return self._rows
+
+    def set_rows(
+        self,
+        rows: List[RowData],
+        *,
+        sort_field: Optional[str] = None,
+        descending: Optional[bool] = None,
+    ) -> None:
+        """Troca as linhas (ex.: nova página do servidor, filtro) sem recriar a tabela.
+
+        Uma ordenação local ativa é reaplicada às novas linhas.
+        """
+        self._rows = list(rows)
+        if sort_field is not None:
+            self.sorted_by = sort_field
+        if descending is not None:
+            self.descending = descending
+        self._apply_local_sort()
+        self._render_header()
+        self._reset_rows()
+
+    def _reset_rows(self) -> None:
+        self._materialized = 0
+        self._list_view.controls = []
+        self._list_view.height = max(1, min(len(self._rows), self.visible_rows)) * ROW_HEIGHT
+        self._list_view.visible = bool(self._rows)
+        self._empty_text.visible = not self._rows
+        self._materialize_next()
+
+    def _materialize_next(self) -> bool:
+        start = self._materialized
+        end = min(len(self._rows), start + self.chunk_size)
+        if start >= end:
+            return False
+        self._list_view.controls.extend(
+            self._build_row(self._rows[index], index) for index in range(start, end)
+        )
+        self._materialized = end
+        return True
+
+    def _on_scroll(self, e: ft.OnScrollEvent) -> None:
+        if self._materialized >= len(self._rows):
+            return
+        if e.pixels >= e.max_scroll_extent - LOAD_MORE_THRESHOLD and self._materialize_next():
+            self._request_update(self._list_view)
+
+    # -- ordenação -------------------------------------------------------
+    def _sort_id(self, column: TableColumn) -> str:
+        return column.sort_field or column.label
+
+    def _apply_local_sort(self) -> None:
+        for column in self.columns:
+            if column.sort_key is not None and self._sort_id(column) == self.sorted_by:
+                self._rows.sort(
+                    key=lambda row: _sort_value(column.sort_key(row)),
+                    reverse=self.descending,
+                )
+                return
+
+    def _sort_by(self, column: TableColumn) -> None:
+        sort_id = self._sort_id(column)
+        descending = not self.descending if self.sorted_by == sort_id else False
+
+        if column.sort_key is not None:
+            self.sorted_by = sort_id
+            self.descending = descending
+            self._apply_local_sort()
+            self._render_header()
+            self._reset_rows()
+            self._request_update(self)
+        elif self.on_sort is not None:
+            # O dono da tabela busca a página ordenada e chama set_rows
+            self.on_sort(column.sort_field, descending)
+
+    # -- controles -------------------------------------------------------
+    def _render_header(self) -> None:
+        self._header_row.controls = [self._header_cell(column) for column in self.columns]
+
+    def _header_cell(self, column: TableColumn) -> ft.Control:
+        if column.header is not None:
+            content = column.header
+        else:
+            label = ft.Text(
+                column.label,
+                size=13,
+                weight=ft.FontWeight.BOLD,
+                color=ft.Colors.WHITE,
+                text_align=ft.TextAlign.CENTER,
+            )
+            content = label
+            if column.sortable and self.sorted_by == self._sort_id(column):
+                content = ft.Row(
+                    controls=[
+                        label,
+                        ft.Icon(
+                            ft.Icons.ARROW_DOWNWARD if self.descending else ft.Icons.ARROW_UPWARD,
+                            size=14,
+                            color=ft.Colors.WHITE,
+                        ),
+                    ],
+                    spacing=4,
+                    alignment=ft.MainAxisAlignment.CENTER,
+                    tight=True,
+                )
+
+        return ft.Container(
+            content=content,
+            width=column.width,
+            height=HEADER_HEIGHT,
+            bgcolor=ft.Colors.BLUE_700,
+            padding=10 if column.header is None else 0,
+            alignment=ft.alignment.center,
+            border=ft.border.all(1, ft.Colors.BLUE_900),
+            tooltip="Ordenar" if column.sortable else None,
+            on_click=(lambda _, c=column: self._sort_by(c)) if column.sortable else None,
+        )
+
+    def _build_row(self, row: RowData, index: int) -> ft.Control:
+        bg_color = ft.Colors.WHITE if index % 2 == 0 else ft.Colors.GREY_50
+        cells: List[ft.Control] = []
+        for column in self.columns:
+            if column.cell is not None:
+                content = column.cell(row, index)
+            else:
+                value = column.text(row) if column.text is not None else "-"
+                content = ft.Text(
+                    value,
+                    size=12,
+                    color=ft.Colors.GREY_900,
+                    text_align=ft.TextAlign.CENTER,
+                    no_wrap=True,
+                )
+            cells.append(
+                ft.Container(
+                    content=content,
+                    width=column.width,
+                    height=ROW_HEIGHT,
+                    bgcolor=bg_color,
+                    padding=column.padding,
+                    alignment=ft.alignment.center,
+                    border=ft.border.all(1, ft.Colors.GREY_300),
+                )
+            )
+        return ft.Row(controls=cells, spacing=0)
@@ -0,0 +1,374 @@
+"""Benchmark do pipeline de renderização de propostas.
+
+Renderiza propostas sintéticas variando o tamanho das curvas (anos) e do
+template (o corpo do template padrão repetido N vezes) e mede cada etapa:
+
+    template_compile  leitura e indexação do template (a frio, uma vez)
+    template_load     clone do template compilado
+    tables            inserção das tabelas de curvas
+    placeholders      substituição dos placeholders de texto
+    bold_removal      ajuste de negrito após os rótulos
+    save              gravação do DOCX
+    pdf               geração do PDF (backend configurado)
+
+Cada combinação roda `--repeats` vezes e guarda a mediana (ms). Os
+resultados são acrescentados em `benchmarks/proposal_rendering.jsonl` (uma
+linha por execução) e comparados com a última execução no mesmo ambiente;
+etapas mais lentas que o limite (`--threshold`) são listadas como regressão.
+
+Uso:
+
+    python -m scripts.benchmark_proposals
+    python -m scripts.benchmark_proposals --years 1 5 10 20 --template-scale 1 4 --repeats 10
+    python -m scripts.benchmark_proposals --no-pdf --fail-on-regression
+"""
+
+from __future__ import annotations
+
+import argparse
+import copy
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from docx import Document
+from docx.oxml.ns import qn
+
+from scripts.docx_template import get_compiled_template
+from scripts.document_engine import (
+    DocumentType,
+    build_document,
+    get_output_backend,
+    pdf_format,
+    resolve_pdf_backend,
+)
+from scripts.proposal_generator import PROPOSTA
+
+
+DEBUG_PREFIX = "[Benchmark]"
+
+STAGES = [
+    "template_compile",
+    "template_load",
+    "tables",
+    "placeholders",
+    "bold_removal",
+    "save",
+    "pdf",
+]
+
+DEFAULT_YEARS = [1, 5, 10, 20]
+DEFAULT_TEMPLATE_SCALES = [1, 4]
+DEFAULT_REPEATS = 5
+# Regressão: etapa ao menos 20% mais lenta que a execução anterior...
+DEFAULT_THRESHOLD = 0.20
+# ...e com diferença acima de 1 ms (evita ruído em etapas muito curtas)
+MIN_REGRESSION_MS = 1.0
+
+
+def _debug_print(message: str, *, data: Any | None = None) -> None:
+    print(f"{DEBUG_PREFIX} {message}")
+    if data is not None:
+        print(f"{DEBUG_PREFIX} -> {data}")
+
+
+def default_results_path() -> Path:
+    from helpers.paths import get_base_path
+
+    return get_base_path() / "benchmarks" / "proposal_rendering.jsonl"
+
+
+def synthetic_proposal(years: int) -> Dict[str, Any]:
+    """Dados de uma proposta fictícia com curvas de `years` anos."""
+    anos = [2026 + i for i in range(years)]
+    return {
+        "data_hoje": "19/10/2026",
+        "razao_social": "EMPRESA DE BENCHMARK LTDA",
+        "cnpj": "12.345.678/0001-90",
+        "submercado": "Nordeste",
+        "inicio": "01/01/2026",
+        "fim": f"31/12/{anos[-1]}",
+        "curva_vol": [0.5 + 0.05 * i for i in range(years)],
+        "curva_precos": [199.0 + 7.25 * i for i in range(years)],
+        "anos": anos,
+        "tipo_energia": "I5",
+        "flex": "30",
+        "sazo": "100",
+        "modulacao": "Flat",
+        "pagamento": "6",
+        "qty_meses": "3",
+        "tipo_proposta": "Indicativa - Validade até 31/10/2026",
+    }
+
+
+def scaled_template(scale: int, directory: Path) -> Path:
+    """Cópia do template da proposta com o corpo repetido `scale` vezes."""
+    path = directory / f"standard_proposal_x{scale}.docx"
+    document = Document(str(PROPOSTA.template_path))
+    body = document.element.body
+    original = [child for child in body.iterchildren() if child.tag != qn("w:sectPr")]
+    sect_pr = body.find(qn("w:sectPr"))
+    for _ in range(scale - 1):
+        for child in original:
+            # Placeholders repetidos também são substituídos (template maior)
+            clone = copy.deepcopy(child)
+            if sect_pr is not None:
+                sect_pr.addprevious(clone)
+            else:
+                body.append(clone)
+    document.save(str(path))
+    return path
+
+
+def _benchmark_type(template_path: Path, scale: int) -> DocumentType:
+    # Caminho absoluto: get_asset_path("assets" / absoluto) devolve o próprio caminho
+    return DocumentType(
+        f"benchmark_proposal_x{scale}",
+        (str(template_path),),
+        build_values=PROPOSTA.build_values,
+        table_slots=PROPOSTA.table_slots,
+        labels=PROPOSTA.labels,
+        file_name=PROPOSTA.file_name,
+    )
+
+
+def _environment() -> Dict[str, Any]:
+    from helpers.paths import get_base_path
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=str(get_base_path()),
+            capture_output=True,
+            text=True,
+            timeout=10,
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "machine": platform.node(),
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "commit": commit,
+    }
+
+
+def run_benchmark(
+    *,
+    years: List[int] = DEFAULT_YEARS,
+    template_scales: List[int] = DEFAULT_TEMPLATE_SCALES,
+    repeats: int = DEFAULT_REPEATS,
+    pdf_backend: Optional[str] = None,
+    with_pdf: bool = True,
+) -> Dict[str, Any]:
+    """Executa a matriz anos x escala do template e retorna a execução.
+
+    A execução tem `created_at`, `environment`, `pdf_backend`, `repeats` e
+    `results` (um item por combinação com a mediana em ms de cada etapa).
+    """
+    backend = get_output_backend(pdf_format(pdf_backend)) if with_pdf else None
+    results = []
+    with tempfile.TemporaryDirectory(prefix="merx_benchmark_") as tmp:
+        tmp_dir = Path(tmp)
+        for scale in template_scales:
+            template_path = scaled_template(scale, tmp_dir)
+            document_type = _benchmark_type(template_path, scale)
+
+            # Compilação a frio: o cache é por caminho + mtime, então o
+            # primeiro acesso a cada cópia do template compila de novo
+            start = time.perf_counter()
+            compiled = get_compiled_template(
+                template_path,
+                table_placeholders=tuple(document_type.table_slots),
+                labels=document_type.labels,
+            )
+            compile_ms = (time.perf_counter() - start) * 1000
+            paragraphs = len(compiled.placeholder_paths) + len(compiled.label_paths)
+
+            for n_years in years:
+                dados = synthetic_proposal(n_years)
+                samples: Dict[str, List[float]] = {stage: [] for stage in STAGES[1:]}
+                for repeat in range(repeats):
+                    timings: Dict[str, float] = {}
+                    documento = build_document(document_type, dados, timings=timings)
+
+                    docx_path = tmp_dir / f"bench_{scale}_{n_years}_{repeat}.docx"
+                    start = time.perf_counter()
+                    documento.save(str(docx_path))
+                    timings["save"] = time.perf_counter() - start
+
+                    if backend is not None:
+                        start = time.perf_counter()
+                        backend.write(documento, docx_path.with_suffix(".pdf"), docx_path=docx_path)
+                        timings["pdf"] = time.perf_counter() - start
+
+                    for stage, seconds in timings.items():
+                        samples[stage].append(seconds * 1000)
+
+                stages = {"template_compile": round(compile_ms, 3)}
+                for stage, values in samples.items():
+                    if values:
+                        stages[stage] = round(statistics.median(values), 3)
+                stages["total"] = round(sum(v for k, v in stages.items() if k != "template_compile"), 3)
+                results.append(
+                    {
+                        "years": n_years,
+                        "template_scale": scale,
+                        "template_paragraphs": paragraphs,
+                        "stages_ms": stages,
+                    }
+                )
+                _debug_print(
+                    f"{n_years:>3} ano(s), template x{scale}: "
+                    + ", ".join(f"{k}={v:.1f}" for k, v in stages.items())
+                )
+
+    return {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "environment": _environment(),
+        "pdf_backend": resolve_pdf_backend(pdf_backend) if with_pdf else None,
+        "repeats": repeats,
+        "results": results,
+    }
+
+
+def load_runs(path: Path) -> List[Dict[str, Any]]:
+    """Execuções gravadas (linhas ilegíveis são ignoradas)."""
+    runs = []
+    try:
+        with open(path, "r", encoding="utf-8") as handle:
+            for line in handle:
+                try:
+                    runs.append(json.loads(line))
+                except ValueError:
+                    continue
+    except FileNotFoundError:
+        pass
+    return runs
+
+
+def save_run(run: Dict[str, Any], path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a", encoding="utf-8") as handle:
+        handle.write(json.dumps(run, ensure_ascii=False) + "\n")
+
+
+def find_baseline(run: Dict[str, Any], runs: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Última execução na mesma máquina, Python e backend de PDF."""
+    env = run["environment"]
+    for previous in reversed(runs):
+        previous_env = previous.get("environment", {})
+        if (
+            previous_env.get("machine") == env["machine"]
+            and previous_env.get("python") == env["python"]
+            and previous.get("pdf_backend") == run["pdf_backend"]
+        ):
+            return previous
+    return None
+
+
+def compare_runs(
+    run: Dict[str, Any],
+    baseline: Dict[str, Any],
+    *,
+    threshold: float = DEFAULT_THRESHOLD,
+) -> List[Dict[str, Any]]:
+    """Etapas mais lentas que `baseline` além do limite relativo."""
+    previous = {
+        (item["years"], item["template_scale"]): item["stages_ms"]
+        for item in baseline.get("results", [])
+    }
+    regressions = []
+    for item in run["results"]:
+        before = previous.get((item["years"], item["template_scale"]))
+        if not before:
+            continue
+        for stage, now_ms in item["stages_ms"].items():
+            before_ms = before.get(stage)
+            if not before_ms:
+                continue
+            if now_ms > before_ms * (1 + threshold) and now_ms - before_ms > MIN_REGRESSION_MS:
+                regressions.append(
+                    {
+                        "years": item["years"],
+                        "template_scale": item["template_scale"],
+                        "stage": stage,
+                        "before_ms": before_ms,
+                        "now_ms": now_ms,
+                    }
+                )
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark da renderização de propostas.")
+    parser.add_argument("--years", nargs="+", type=int, default=DEFAULT_YEARS, help="Tamanhos de curva (anos)")
+    parser.add_argument(
+        "--template-scale",
+        nargs="+",
+        type=int,
+        default=DEFAULT_TEMPLATE_SCALES,
+        help="Quantas vezes o corpo do template é repetido",
+    )
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS, help="Repetições por combinação")
+    parser.add_argument(
+        "--pdf-backend",
+        choices=["auto", "word", "native"],
+        default=None,
+        help="Backend do PDF (padrão: PROPOSAL_PDF_BACKEND ou auto)",
+    )
+    parser.add_argument("--no-pdf", action="store_true", help="Não mede a etapa de PDF")
+    parser.add_argument("--output", type=Path, default=None, help="Arquivo JSONL de resultados")
+    parser.add_argument("--no-save", action="store_true", help="Não grava a execução")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="Aumento relativo considerado regressão (0.2 = 20%%)",
+    )
+    parser.add_argument(
+        "--fail-on-regression",
+        action="store_true",
+        help="Sai com código 1 se alguma etapa regredir",
+    )
+    args = parser.parse_args(argv)
+
+    results_path = args.output or default_results_path()
+    run = run_benchmark(
+        years=args.years,
+        template_scales=args.template_scale,
+        repeats=max(1, args.repeats),
+        pdf_backend=args.pdf_backend,
+        with_pdf=not args.no_pdf,
+    )
+
+    regressions = []
+    baseline = find_baseline(run, load_runs(results_path))
+    if baseline is None:
+        print("Sem execução anterior neste ambiente para comparar.")
+    else:
+        regressions = compare_runs(run, baseline, threshold=args.threshold)
+        print(f"Comparado com {baseline['created_at']} ({baseline['environment'].get('commit') or '-'}):")
+        if not regressions:
+            print("  nenhuma regressão")
+        for item in regressions:
+            print(
+                f"  REGRESSÃO {item['stage']} ({item['years']} ano(s), template x{item['template_scale']}): "
+                f"{item['before_ms']:.1f} ms -> {item['now_ms']:.1f} ms"
+            )
+
+    if not args.no_save:
+        save_run(run, results_path)
+        print(f"Resultados gravados em {results_path}")
+    return 1 if regressions and args.fail_on_regression else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -73,6 +73,11 @@ def list_contract_clients() -> List[str]:
     return sorted(clients)
 
 
+def list_traders() -> List[Dict[str, Any]]:
+    """Retorna todas as comercializadoras (tabela `traders`)."""
+    return read_records("traders", filters=None)
+
+
 def _parse_year_from_date(value: Any) -> int | None:
     if value is None:
         return None
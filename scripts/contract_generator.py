@@ -0,0 +1,155 @@
+"""Contrato de compra e venda de energia gerado a partir de uma proposta.
+
+Usa o mesmo motor das propostas (`scripts.document_engine`) com o template
+`assets/documents/standard_contract.docx`. Os dados da compradora que a
+proposta não guarda (endereço) saem como campo em branco para preenchimento
+manual.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional
+
+from scripts.document_engine import (
+    DocumentType,
+    format_cnpj,
+    format_currency,
+    format_date,
+    format_decimal,
+    pdf_format,
+    register_document_type,
+    render_document,
+    year_table_slot,
+)
+
+
+DEBUG_PREFIX = "[ContractGenerator]"
+
+# Nome padrão dos arquivos gerados (sem extensão)
+NOME_ARQUIVO_CONTRATO = "{razao_social} - Contrato de Compra e Venda de Energia NOVO ATACAREJO"
+
+# Campo sem dado na proposta, preenchido à mão no documento
+CAMPO_EM_BRANCO = "____________"
+
+# Desconto na TUSD por tipo de energia
+DESCONTO_TUSD = {
+    "CONV": "0%",
+    "I5": "50%",
+    "I1": "100%",
+    "CQ5": "50%",
+}
+
+
+def _primeiro_reajuste(data_base: str) -> str:
+    """Mês/ano do primeiro reajuste: 12 meses após a data base (MM/AAAA)."""
+    try:
+        mes, ano = str(data_base).strip().split("/")
+        return f"{int(mes):02d}/{int(ano) + 1}"
+    except (ValueError, AttributeError):
+        return CAMPO_EM_BRANCO
+
+
+def build_contract_params(
+    proposal: Dict[str, Any],
+    seasonalities: List[Dict[str, Any]],
+) -> Dict[str, Any]:
+    """Monta os dados do contrato a partir da proposta e suas sazonalidades.
+
+    Levanta ValueError se a proposta não tiver sazonalidades.
+    """
+    seasonalities = sorted(seasonalities, key=lambda x: x.get("year") or 0)
+    if not seasonalities:
+        raise ValueError("Não há dados de sazonalidade para esta proposta.")
+
+    first_sazo = seasonalities[0]
+    flex_val = first_sazo.get("flex")
+    sazo_val = first_sazo.get("seasonality")
+    volumes = [s.get("average_volume") or 0.0 for s in seasonalities]
+    energy_type = proposal.get("energy_type") or ""
+    data_base = proposal.get("reference_date") or ""
+
+    return {
+        "razao_social": proposal.get("customer_name") or "",
+        "cnpj": format_cnpj(proposal.get("customer_cnpj")),
+        "cidade": proposal.get("customer_city") or CAMPO_EM_BRANCO,
+        "estado": proposal.get("customer_state") or CAMPO_EM_BRANCO,
+        "rua_numero": proposal.get("customer_address") or CAMPO_EM_BRANCO,
+        "bairro": proposal.get("customer_district") or CAMPO_EM_BRANCO,
+        "cep": proposal.get("customer_zip_code") or CAMPO_EM_BRANCO,
+        "tipo_energia": energy_type,
+        "retusd": DESCONTO_TUSD.get(energy_type, CAMPO_EM_BRANCO),
+        "data_inicio": format_date(proposal.get("supply_start")),
+        "data_fim": format_date(proposal.get("supply_end")),
+        "flex": str(flex_val) if flex_val is not None else "",
+        "sazo": str(sazo_val) if sazo_val is not None else "",
+        "modulacao": proposal.get("modulation") or "",
+        "vol_med": f"{format_decimal(sum(volumes) / len(volumes))} MWm",
+        "anos": [s.get("year") for s in seasonalities],
+        "curva_precos": [s.get("price") or 0.0 for s in seasonalities],
+        "pagamento": str(proposal.get("billing_due_day") or ""),
+        "data_base": data_base or CAMPO_EM_BRANCO,
+        "primeiro_reajuste": _primeiro_reajuste(data_base),
+        "garantia": proposal.get("guarantee_type") or CAMPO_EM_BRANCO,
+        "qty_meses": str(proposal.get("guarantee_months") or ""),
+    }
+
+
+def montar_valores(dados: Dict[str, Any]) -> Dict[str, str]:
+    """Mapa de placeholders de texto do contrato."""
+    return {
+        "{{RAZAO_SOCIAL}}": dados["razao_social"],
+        "{{CNPJ}}": dados["cnpj"],
+        "{{CIDADE}}": dados["cidade"],
+        "{{ESTADO}}": dados["estado"],
+        "{{RUA_NUMERO}}": dados["rua_numero"],
+        "{{BAIRRO}}": dados["bairro"],
+        "{{CEP}}": dados["cep"],
+        "{{TIPO_ENERGIA}}": dados["tipo_energia"],
+        "{{RETUSD}}": dados["retusd"],
+        "{{DATA_INICIO}}": dados["data_inicio"],
+        "{{DATA_FIM}}": dados["data_fim"],
+        "{{FLEX}}": dados["flex"],
+        "{{SAZO}}": dados["sazo"],
+        "{{MODULACAO}}": dados["modulacao"],
+        "{{VOL_MED}}": dados["vol_med"],
+        "{{PAGAMENTO}}": dados["pagamento"],
+        # No template, "01/{{DATA_BASE}}" fica sob "Data do primeiro reajuste"
+        # e "{{1_REAJUSTE}}" sob "Data base"
+        "{{DATA_BASE}}": dados["primeiro_reajuste"],
+        "{{1_REAJUSTE}}": dados["data_base"],
+        "{{GARANTIA}}": dados["garantia"],
+        "{{QTY_MESES}}": dados["qty_meses"],
+    }
+
+
+CONTRATO = register_document_type(
+    DocumentType(
+        "contract",
+        ("documents", "standard_contract.docx"),
+        build_values=montar_valores,
+        table_slots={
+            "{{CURVA_PRECOS}}": year_table_slot("Preço", "curva_precos", format_currency),
+        },
+        file_name=NOME_ARQUIVO_CONTRATO,
+    )
+)
+
+
+def generate_contract(
+    dados: Dict[str, Any],
+    output_dir: str,
+    *,
+    pdf_backend: Optional[str] = None,
+    use_cache: bool = True,
+) -> str:
+    """Gera DOCX + PDF do contrato e retorna o caminho do PDF."""
+    print(f"{DEBUG_PREFIX} Iniciando geração de contrato: {dados.get('razao_social')}")
+    paths = render_document(
+        CONTRATO,
+        dados,
+        output_dir,
+        formats=("docx", "pdf"),
+        pdf_backend=pdf_backend,
+        use_cache=use_cache,
+    )
+    return str(paths[pdf_format(pdf_backend)].resolve())
@@ -0,0 +1,83 @@
+"""Índice em memória para filtrar a listagem de contratos.
+
+Os contratos são baixados uma vez; comprador e vendedor ficam normalizados
+(minúsculas, sem acentos) e quebrados em termos na construção do índice, então
+filtrar enquanto o usuário digita é só comparação de strings, sem consultas
+ao banco.
+"""
+
+from __future__ import annotations
+
+import threading
+import unicodedata
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+# Campo de busca -> coluna do contrato
+SEARCH_FIELDS = {
+    "buyer": "contractor",
+    "seller": "service_provider",
+}
+
+
+def normalize_text(value: Any) -> str:
+    """Minúsculas e sem acentos ("Comercialização" -> "comercializacao")."""
+    text = unicodedata.normalize("NFKD", str(value or "").lower())
+    return "".join(ch for ch in text if not unicodedata.combining(ch))
+
+
+def _tokens(value: Any) -> Tuple[str, ...]:
+    return tuple(normalize_text(value).split())
+
+
+class ContractsIndex:
+    """Contratos carregados com os campos de busca pré-processados."""
+
+    def __init__(self, contracts: Iterable[Dict[str, Any]]):
+        self.contracts: List[Dict[str, Any]] = list(contracts)
+        # Texto normalizado completo de cada campo, por contrato (mesma ordem)
+        self._fields: Dict[str, List[str]] = {
+            name: [" ".join(_tokens(c.get(column))) for c in self.contracts]
+            for name, column in SEARCH_FIELDS.items()
+        }
+        # Última consulta e seus resultados: digitar mais letras só refina
+        self._last_query: Optional[Dict[str, Tuple[str, ...]]] = None
+        self._last_matches: List[int] = list(range(len(self.contracts)))
+        # A busca roda na thread do debounce e também no Enter/botão
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.contracts)
+
+    def filter(self, buyer: str = "", seller: str = "") -> List[Dict[str, Any]]:
+        """Contratos cujo comprador/vendedor contêm todos os termos digitados."""
+        query = {"buyer": _tokens(buyer), "seller": _tokens(seller)}
+        with self._lock:
+            candidates: Sequence[int] = range(len(self.contracts))
+            if self._last_query is not None and self._refines(query, self._last_query):
+                candidates = self._last_matches
+
+            matches = [
+                i
+                for i in candidates
+                if all(
+                    term in self._fields[name][i]
+                    for name, terms in query.items()
+                    for term in terms
+                )
+            ]
+            self._last_query = query
+            self._last_matches = matches
+        return [self.contracts[i] for i in matches]
+
+    @staticmethod
+    def _refines(query: Dict[str, Tuple[str, ...]], previous: Dict[str, Tuple[str, ...]]) -> bool:
+        # A nova consulta só pode restringir o resultado anterior se cada
+        # termo antigo continua contido no termo correspondente da nova
+        for name, old_terms in previous.items():
+            new_terms = query[name]
+            if len(new_terms) < len(old_terms):
+                return False
+            if any(old not in new for old, new in zip(old_terms, new_terms)):
+                return False
+        return True
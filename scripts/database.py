@@ -7,7 +7,7 @@ auxiliar (somente leitura), além de expor funções de CRUD simples.
 from __future__ import annotations
 
 import os
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from dotenv import load_dotenv
 from supabase import Client, create_client
@@ -100,27 +100,127 @@ def read_records(
         raise DatabaseError(f"Erro ao ler registros em {table}: {exc}") from exc
 
 
+# Linhas por requisição na leitura paginada (limite padrão do PostgREST)
+PAGE_SIZE = 1000
+# Valores por filtro IN (mantém a URL da requisição curta)
+IN_CHUNK_SIZE = 100
+
+
 def read_records_in(
     table: str,
     column: str,
     values: List[Any],
     *,
+    filters: Optional[Dict[str, Any]] = None,
+    in_filters: Optional[Dict[str, List[Any]]] = None,
     use_aux: bool = False,
 ) -> List[Dict[str, Any]]:
-    """Lê registros utilizando filtro IN em uma coluna."""
+    """Lê registros utilizando filtro IN em uma coluna.
+
+    `filters` são igualdades e `in_filters` outros filtros IN, aplicados no
+    servidor. Os valores vão em lotes de `IN_CHUNK_SIZE` e cada lote é lido
+    em páginas de `PAGE_SIZE` (ordenadas por id), então o limite de linhas
+    por resposta do PostgREST não trunca o resultado.
+    """
     if not values:
         return []
 
     client = _ensure_aux() if use_aux else _ensure_primary()
+    values = list(dict.fromkeys(values))
+
+    try:
+        records: List[Dict[str, Any]] = []
+        for start in range(0, len(values), IN_CHUNK_SIZE):
+            chunk = values[start:start + IN_CHUNK_SIZE]
+            offset = 0
+            while True:
+                query = client.table(table).select("*").in_(column, chunk)
+                for key, value in (filters or {}).items():
+                    query = query.eq(key, value)
+                for key, options in (in_filters or {}).items():
+                    query = query.in_(key, list(options))
+                # range() do PostgREST é inclusivo nas duas pontas
+                response = query.order("id").range(offset, offset + PAGE_SIZE - 1).execute()
+                if getattr(response, "error", None):
+                    raise DatabaseError(str(response.error))
+                page = getattr(response, "data", []) or []
+                records.extend(page)
+                if len(page) < PAGE_SIZE:
+                    break
+                offset += PAGE_SIZE
+        return records
+    except Exception as exc:  # pragma: no cover
+        raise DatabaseError(f"Erro ao ler registros em {table} com filtro IN: {exc}") from exc
+
+
+def query_records(
+    table: str,
+    *,
+    filters: Optional[Dict[str, Any]] = None,
+    ilike: Optional[Dict[str, str]] = None,
+    gte: Optional[Dict[str, Any]] = None,
+    lte: Optional[Dict[str, Any]] = None,
+    order_by: Optional[str] = None,
+    descending: bool = False,
+    offset: int = 0,
+    limit: Optional[int] = None,
+    count: bool = False,
+    use_aux: bool = False,
+) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+    """Consulta filtrada, ordenada e paginada no servidor.
+
+    `filters` são igualdades, `ilike` são padrões (ex.: {"nome": "%abc%"})
+    e `gte`/`lte` são limites inclusivos (ex.: intervalo de datas).
+    Com `count=True`, o total de linhas que atendem aos filtros (sem a
+    paginação) vem na mesma requisição. Retorna (registros, total | None).
+    """
+    client = _ensure_aux() if use_aux else _ensure_primary()
 
     try:
-        query = client.table(table).select("*").in_(column, values)
+        query = client.table(table).select("*", count="exact" if count else None)
+        for key, value in (filters or {}).items():
+            query = query.eq(key, value)
+        for key, pattern in (ilike or {}).items():
+            query = query.ilike(key, pattern)
+        for key, value in (gte or {}).items():
+            query = query.gte(key, value)
+        for key, value in (lte or {}).items():
+            query = query.lte(key, value)
+        if order_by:
+            query = query.order(order_by, desc=descending)
+        if limit is not None:
+            # range() do PostgREST é inclusivo nas duas pontas
+            query = query.range(offset, offset + limit - 1)
         response = query.execute()
+        if getattr(response, "error", None):
+            raise DatabaseError(str(response.error))
+        return getattr(response, "data", []) or [], getattr(response, "count", None)
+    except Exception as exc:  # pragma: no cover
+        raise DatabaseError(f"Erro ao consultar registros em {table}: {exc}") from exc
+
+
+def upsert_records(
+    table: str,
+    data: List[Dict[str, Any]],
+    *,
+    on_conflict: str = "id",
+) -> List[Dict[str, Any]]:
+    """Insere ou atualiza registros em lote usando o banco principal.
+
+    Todos os registros vão em uma única requisição, que o PostgREST executa
+    em uma única transação: ou todas as linhas são gravadas, ou nenhuma.
+    """
+    if not data:
+        return []
+
+    client = _ensure_primary()
+    try:
+        response = client.table(table).upsert(data, on_conflict=on_conflict).execute()
         if getattr(response, "error", None):
             raise DatabaseError(str(response.error))
         return getattr(response, "data", []) or []
     except Exception as exc:  # pragma: no cover
-        raise DatabaseError(f"Erro ao ler registros em {table} com filtro IN: {exc}") from exc
+        raise DatabaseError(f"Erro ao gravar registros em {table}: {exc}") from exc
 
 
 def update_record(table: str, record_id: Any, data: Dict[str, Any]) -> Dict[str, Any]:
@@ -164,3 +264,17 @@ def delete_records(table: str, filters: Dict[str, Any]) -> None:
             raise DatabaseError(str(response.error))
     except Exception as exc:  # pragma: no cover
         raise DatabaseError(f"Erro ao excluir registros em {table}: {exc}") from exc
+
+
+def delete_records_in(table: str, column: str, values: List[Any]) -> None:
+    """Remove registros utilizando filtro IN em uma coluna."""
+    if not values:
+        return
+
+    client = _ensure_primary()
+    try:
+        response = client.table(table).delete().in_(column, values).execute()
+        if getattr(response, "error", None):
+            raise DatabaseError(str(response.error))
+    except Exception as exc:  # pragma: no cover
+        raise DatabaseError(f"Erro ao excluir registros em {table} com filtro IN: {exc}") from exc
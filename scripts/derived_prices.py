@@ -0,0 +1,175 @@
+"""Motor de regras para produtos de preço derivados (I1, CQ5, ...).
+
+Um produto derivado é obtido somando um spread (R$/MWh) ao preço de um
+produto base do mesmo ano, submercado e snapshot. As regras são
+declarativas e podem ser restritas por submercado, ano e comercializadora;
+quando mais de uma regra se aplica a uma célula, vence a mais específica
+(e, em empate, a que aparece por último na lista).
+
+Preços gravados explicitamente sempre têm precedência sobre os derivados,
+a menos que `overwrite=True` seja usado.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import pandas as pd
+
+
+# Quando False, os produtos derivados não são preenchidos na importação da
+# planilha nem gravados em `energy_prices`: eles são calculados no momento
+# da consulta (ver `scripts.energy_prices_service.load_price_frame`).
+STORE_DERIVED_PRICES = True
+
+# Regras padrão. Chaves opcionais: "submarket", "year" e "trader_id".
+DERIVED_PRICE_RULES: List[Dict[str, Any]] = [
+    {"target": "I1", "base": "I5", "spread": 170.0},
+    {"target": "CQ5", "base": "I5", "spread": -2.0},
+]
+
+# Colunas que identificam uma célula de preço
+_CELL_COLUMNS = ["year", "submarket", "energy_type"]
+_SCOPE_COLUMNS = ["snapshot_id", "trader_id"]
+
+# Célula da grade do formulário: (ano, submercado, tipo_energia)
+PriceKey = Tuple[int, str, str]
+
+
+def _rule_specificity(rule: Dict[str, Any]) -> int:
+    return sum(rule.get(key) is not None for key in ("submarket", "year", "trader_id"))
+
+
+def derived_energy_types(rules: Optional[List[Dict[str, Any]]] = None) -> Set[str]:
+    """Tipos de energia produzidos por alguma regra."""
+    rules = DERIVED_PRICE_RULES if rules is None else rules
+    return {str(rule["target"]) for rule in rules}
+
+
+def required_energy_types(
+    energy_types: Iterable[str],
+    rules: Optional[List[Dict[str, Any]]] = None,
+) -> Set[str]:
+    """Tipos que precisam ser lidos do banco para obter `energy_types`.
+
+    Inclui os próprios tipos pedidos e os produtos base de cada derivado.
+    """
+    rules = DERIVED_PRICE_RULES if rules is None else rules
+    wanted = set(energy_types)
+    return wanted | {str(rule["base"]) for rule in rules if rule["target"] in wanted}
+
+
+def apply_derived_prices(
+    prices: pd.DataFrame,
+    rules: Optional[List[Dict[str, Any]]] = None,
+    *,
+    overwrite: bool = False,
+) -> pd.DataFrame:
+    """Acrescenta os produtos derivados a um DataFrame de preços.
+
+    `prices` deve ter as colunas `year`, `submarket`, `energy_type` e
+    `price`; `snapshot_id` e `trader_id` são opcionais e, quando presentes,
+    delimitam as células (e permitem regras por comercializadora).
+
+    O resultado ganha a coluna booleana `is_derived`.
+    """
+    rules = DERIVED_PRICE_RULES if rules is None else rules
+    result = prices.copy()
+    if "is_derived" not in result.columns:
+        result["is_derived"] = False
+    if result.empty or not rules:
+        return result
+
+    scope = [col for col in _SCOPE_COLUMNS if col in result.columns]
+    keys = scope + _CELL_COLUMNS
+
+    grouped: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+    for rule in rules:
+        grouped.setdefault((str(rule["target"]), str(rule["base"])), []).append(rule)
+
+    derived_frames: List[pd.DataFrame] = []
+    for (target, base), group_rules in grouped.items():
+        base_rows = result[(result["energy_type"] == base) & result["price"].notna()]
+        if base_rows.empty:
+            continue
+
+        spread = pd.Series(float("nan"), index=base_rows.index)
+        # Ordem crescente de especificidade: a regra mais específica escreve por último
+        for rule in sorted(group_rules, key=_rule_specificity):
+            mask = pd.Series(True, index=base_rows.index)
+            if rule.get("submarket") is not None:
+                mask &= base_rows["submarket"] == rule["submarket"]
+            if rule.get("year") is not None:
+                mask &= base_rows["year"].astype(int) == int(rule["year"])
+            if rule.get("trader_id") is not None:
+                if "trader_id" not in base_rows.columns:
+                    continue
+                mask &= base_rows["trader_id"].astype(str) == str(rule["trader_id"])
+            spread[mask] = float(rule["spread"])
+
+        has_rule = spread.notna()
+        if not has_rule.any():
+            continue
+
+        derived = base_rows.loc[has_rule].copy()
+        derived["energy_type"] = target
+        derived["price"] = derived["price"].astype(float) + spread[has_rule]
+        derived["is_derived"] = True
+        if "id" in derived.columns:
+            derived["id"] = None
+        derived_frames.append(derived)
+
+    if not derived_frames:
+        return result
+
+    derived = pd.concat(derived_frames, ignore_index=True)
+    derived = derived.drop_duplicates(subset=keys, keep="last")
+
+    if overwrite:
+        existing_keys = result[keys].merge(derived[keys], on=keys, how="left", indicator=True)
+        result = result.loc[(existing_keys["_merge"] == "left_only").to_numpy()]
+    else:
+        derived_keys = derived[keys].merge(
+            result[keys].drop_duplicates(), on=keys, how="left", indicator=True
+        )
+        derived = derived.loc[(derived_keys["_merge"] == "left_only").to_numpy()]
+
+    return pd.concat([result, derived], ignore_index=True)
+
+
+def grid_to_frame(grid: Dict[PriceKey, float]) -> pd.DataFrame:
+    """Converte a grade `{(ano, submercado, tipo): preço}` em DataFrame."""
+    return pd.DataFrame(
+        [
+            {"year": ano, "submarket": sub, "energy_type": tipo, "price": preco}
+            for (ano, sub, tipo), preco in grid.items()
+        ],
+        columns=_CELL_COLUMNS + ["price"],
+    )
+
+
+def apply_derived_to_grid(
+    grid: Dict[PriceKey, float],
+    *,
+    trader_id: Optional[str] = None,
+    rules: Optional[List[Dict[str, Any]]] = None,
+    keep_blank: Iterable[PriceKey] = (),
+) -> Dict[PriceKey, float]:
+    """Versão de `apply_derived_prices` para a grade do formulário de preços.
+
+    Preenche apenas as células derivadas que ainda não existem na grade e
+    que não estão em `keep_blank` (células que o usuário apagou de
+    propósito, e que por isso não voltam a ser preenchidas).
+    """
+    keep_blank = set(keep_blank)
+    frame = grid_to_frame(grid)
+    if trader_id is not None:
+        frame["trader_id"] = str(trader_id)
+
+    frame = apply_derived_prices(frame, rules)
+    result = {}
+    for ano, sub, tipo, preco in frame[_CELL_COLUMNS + ["price"]].itertuples(index=False):
+        key = (int(ano), str(sub), str(tipo))
+        if key in grid or key not in keep_blank:
+            result[key] = float(preco)
+    return result
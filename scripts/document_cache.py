@@ -0,0 +1,247 @@
+"""Cache de documentos gerados endereçado pelo conteúdo da entrada.
+
+A chave é o SHA-256 de tudo que define o documento: os dados preenchidos
+(campos da proposta, curvas, data) e o hash do arquivo de template. O
+índice fica na própria pasta de saída (`CACHE_INDEX_NAME`) e guarda, para
+cada chave, os arquivos já gerados por formato (`docx`, `pdf_word`,
+`pdf_native`) com tamanho, data de modificação e SHA-256 do conteúdo. Os
+arquivos têm o nome visível ao usuário e podem ser sobrescritos (inclusive
+por outro documento com o mesmo nome), então o conteúdo é conferido a cada
+acerto; se algum arquivo sumir ou mudar, a entrada é descartada e o
+documento é gerado de novo.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+
+
+DEBUG_PREFIX = "[DocumentCache]"
+
+CACHE_INDEX_NAME = ".merx_document_cache.json"
+
+# Incrementar quando a renderização mudar a saída para a mesma entrada (ou
+# o formato do índice mudar)
+CACHE_VERSION = 2
+
+_digests: Dict[str, Tuple[int, int, str]] = {}
+_digests_lock = threading.Lock()
+
+_indexes: Dict[str, "DocumentCacheIndex"] = {}
+_indexes_lock = threading.Lock()
+
+
+def _debug_print(message: str, *, data: Any | None = None) -> None:
+    print(f"{DEBUG_PREFIX} {message}")
+    if data is not None:
+        print(f"{DEBUG_PREFIX} -> {data}")
+
+
+def _file_stamp(path: Path) -> Tuple[int, int]:
+    stat = path.stat()
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _hash_file(path: Path) -> str:
+    sha = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(1 << 20), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def file_digest(path) -> str:
+    """SHA-256 do arquivo, memorizado enquanto tamanho e mtime não mudarem."""
+    path = Path(path).resolve()
+    size, mtime_ns = _file_stamp(path)
+    key = str(path)
+    with _digests_lock:
+        cached = _digests.get(key)
+        if cached and cached[:2] == (size, mtime_ns):
+            return cached[2]
+
+    digest = _hash_file(path)
+    with _digests_lock:
+        _digests[key] = (size, mtime_ns, digest)
+    return digest
+
+
+def document_owner(kind: str, record_id: Any) -> str:
+    """Dono de uma entrada do índice: o registro que gerou o documento."""
+    return f"{kind}:{record_id}"
+
+
+def document_cache_key(
+    kind: str,
+    data: Dict[str, Any],
+    *,
+    template_path,
+) -> str:
+    """Chave de cache de um documento (hex SHA-256)."""
+    payload = {
+        "version": CACHE_VERSION,
+        "kind": kind,
+        "template": file_digest(template_path),
+        "data": data,
+    }
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class DocumentCacheIndex:
+    """Índice chave -> arquivos gerados, persistido na pasta de saída."""
+
+    def __init__(self, output_dir):
+        self.output_dir = Path(output_dir)
+        self.index_path = self.output_dir / CACHE_INDEX_NAME
+        self._entries: Optional[Dict[str, Dict[str, Any]]] = None
+        self._lock = threading.RLock()
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if self._entries is None:
+            entries: Dict[str, Dict[str, Any]] = {}
+            try:
+                with open(self.index_path, "r", encoding="utf-8") as handle:
+                    stored = json.load(handle)
+                if stored.get("version") == CACHE_VERSION:
+                    entries = stored.get("entries") or {}
+            except FileNotFoundError:
+                pass
+            except (OSError, ValueError, AttributeError) as exc:
+                _debug_print(f"Índice ilegível, recriando: {exc}")
+            self._entries = entries
+        return self._entries
+
+    def _save(self) -> None:
+        # Falha ao gravar o índice só desativa o cache, nunca a geração
+        tmp_path = self.index_path.with_name(self.index_path.name + ".tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as handle:
+                json.dump(
+                    {"version": CACHE_VERSION, "entries": self._entries},
+                    handle,
+                    ensure_ascii=False,
+                    indent=1,
+                )
+            os.replace(tmp_path, self.index_path)
+        except OSError as exc:
+            _debug_print(f"Não foi possível gravar o índice: {exc}")
+
+    def lookup(self, key: str, *, require: Iterable[str] = ("docx",)) -> Optional[Dict[str, str]]:
+        """Caminhos dos arquivos em cache (por formato) ou None.
+
+        Todos os formatos de `require` precisam existir e estar intactos:
+        mesmo tamanho e mtime e, por fim, o mesmo SHA-256 registrado (tamanho
+        e mtime não bastam para notar um arquivo sobrescrito).
+        """
+        with self._lock:
+            entry = self._load().get(key)
+            if not entry:
+                return None
+
+            paths: Dict[str, str] = {}
+            stale = []
+            for fmt, info in entry.get("files", {}).items():
+                path = self.output_dir / info["name"]
+                try:
+                    intact = (
+                        _file_stamp(path) == (info["size"], info["mtime_ns"])
+                        and _hash_file(path) == info.get("sha256")
+                    )
+                except OSError:
+                    intact = False
+                if intact:
+                    paths[fmt] = str(path)
+                else:
+                    # Arquivo removido ou editado fora da aplicação
+                    stale.append(fmt)
+
+            if stale:
+                for fmt in stale:
+                    del entry["files"][fmt]
+                if not entry["files"]:
+                    del self._entries[key]
+                self._save()
+
+            if any(fmt not in paths for fmt in require):
+                return None
+            return paths
+
+    def store(self, key: str, *, owner: Optional[str] = None, **paths: Optional[str]) -> None:
+        """Registra arquivos gerados para a chave (ex.: docx=..., pdf_word=...).
+
+        Os formatos informados são somados aos já registrados na entrada.
+        `owner` (ver `document_owner`) identifica o documento dono dos
+        arquivos, para que outros não escolham os mesmos nomes.
+        """
+        files = {}
+        for fmt, path in paths.items():
+            if not path:
+                continue
+            path = Path(path)
+            size, mtime_ns = _file_stamp(path)
+            try:
+                name = str(path.resolve().relative_to(self.output_dir.resolve()))
+            except ValueError:
+                # Fora da pasta de saída: o índice só referencia arquivos dela
+                continue
+            files[fmt] = {
+                "name": name,
+                "size": size,
+                "mtime_ns": mtime_ns,
+                "sha256": _hash_file(path),
+            }
+        if not files:
+            return
+
+        with self._lock:
+            entries = self._load()
+            # Um arquivo pertence a uma única chave (nomes são reaproveitados)
+            names = {info["name"] for info in files.values()}
+            for old_key, entry in list(entries.items()):
+                if old_key == key:
+                    continue
+                old_files = entry.get("files", {})
+                for fmt in [f for f, info in old_files.items() if info["name"] in names]:
+                    del old_files[fmt]
+                if not old_files:
+                    del entries[old_key]
+
+            entry = entries.setdefault(key, {"files": {}})
+            entry["files"].update(files)
+            if owner is not None:
+                entry["owner"] = owner
+            entry["updated_at"] = datetime.now().isoformat(timespec="seconds")
+            self._save()
+
+    def names_in_use(self, *, exclude_owner: Optional[str] = None) -> Set[str]:
+        """Nomes (sem extensão, em minúsculas) dos arquivos em cache na pasta.
+
+        Os de `exclude_owner` ficam de fora: o próprio documento pode
+        reaproveitar seu nome. Entradas sem dono contam como de outro.
+        """
+        with self._lock:
+            names = set()
+            for entry in self._load().values():
+                if exclude_owner is not None and entry.get("owner") == exclude_owner:
+                    continue
+                for info in entry.get("files", {}).values():
+                    names.add(os.path.splitext(info["name"])[0].lower())
+            return names
+
+
+def get_cache_index(output_dir) -> DocumentCacheIndex:
+    """Índice compartilhado da pasta de saída (um por pasta e processo)."""
+    key = str(Path(output_dir).resolve())
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = DocumentCacheIndex(output_dir)
+            _indexes[key] = index
+        return index
@@ -0,0 +1,778 @@
+"""Motor único de renderização de documentos DOCX.
+
+Cada tipo de documento (proposta, contrato, ...) é registrado como um
+`DocumentType`: template em `assets/`, função que monta o mapa de
+placeholders de texto, renderizadores dos slots de tabela e rótulos cujo
+texto seguinte perde o negrito. Todos os tipos passam pelo mesmo pipeline:
+
+    template compilado em cache (`scripts.docx_template`)
+    -> slots de tabela -> placeholders em passada única -> ajuste de negrito
+    -> backends de saída (`docx`, `pdf_native`, `pdf_word`)
+
+então qualquer otimização do pipeline vale para todos os documentos. Os
+nomes dos backends são os mesmos formatos do índice de cache
+(`scripts.document_cache`).
+"""
+
+from __future__ import annotations
+
+import importlib
+import os
+import re
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from bisect import bisect_right
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from docx.enum.table import WD_TABLE_ALIGNMENT
+from docx.enum.text import WD_ALIGN_PARAGRAPH
+from docx.oxml import OxmlElement
+from docx.oxml.ns import qn
+
+from scripts.docx_template import CompiledDocxTemplate, get_compiled_template
+
+
+DEBUG_PREFIX = "[DocumentEngine]"
+
+# Backend do PDF: "word" (docx2pdf/COM, só Windows), "native" (fpdf2, em
+# processo) ou "auto" (Word no Windows, nativo nos demais sistemas)
+PDF_BACKEND = os.getenv("DOCUMENT_PDF_BACKEND") or os.getenv("PROPOSAL_PDF_BACKEND", "auto")
+
+# Tipos embutidos, registrados na importação do módulo que os define
+BUILTIN_DOCUMENT_MODULES = {
+    "proposal": "scripts.proposal_generator",
+    "contract": "scripts.contract_generator",
+}
+
+
+def _debug_print(message: str, *, data: Any | None = None) -> None:
+    print(f"{DEBUG_PREFIX} {message}")
+    if data is not None:
+        print(f"{DEBUG_PREFIX} -> {data}")
+
+
+# ==========================================================
+# Primitivas DOCX
+# ==========================================================
+
+def copy_run_attrs(src_run, dst_run):
+    """Copia atributos de formatação de um run para outro."""
+    dst_run.bold = src_run.bold
+    dst_run.italic = src_run.italic
+    dst_run.underline = src_run.underline
+
+    if src_run.font.size:
+        dst_run.font.size = src_run.font.size
+    if src_run.font.name:
+        dst_run.font.name = src_run.font.name
+    if src_run.font.color and src_run.font.color.rgb:
+        dst_run.font.color.rgb = src_run.font.color.rgb
+
+    # Copiar estilo se houver
+    dst_run.style = src_run.style
+
+
+def set_cell_background(cell, color_hex):
+    """Define a cor de fundo de uma célula."""
+    tc = cell._tc
+    tcPr = tc.get_or_add_tcPr()
+    shd = OxmlElement('w:shd')
+    shd.set(qn('w:val'), 'clear')
+    shd.set(qn('w:color'), 'auto')
+    shd.set(qn('w:fill'), color_hex)
+    tcPr.append(shd)
+
+
+def format_decimal(val):
+    """Formata float para string com vírgula decimal (ex: 0.69 -> 0,69)."""
+    if isinstance(val, (int, float)):
+        return f"{val:.2f}".replace('.', ',')
+    return str(val)
+
+
+def format_currency(val):
+    """Formata float para string BRL sem símbolo (ex: 199.0 -> 199,00)."""
+    if isinstance(val, (int, float)):
+        # Formata com separador de milhar ponto e decimal vírgula
+        s = f"{val:,.2f}"
+        s = s.replace(',', 'X').replace('.', ',').replace('X', '.')
+        return s
+    return str(val)
+
+
+def format_date(value: Any) -> str:
+    """Formata datas ISO/DateTime como dd/mm/aaaa."""
+    if value is None:
+        return "-"
+    s = str(value)
+    if not s:
+        return "-"
+    try:
+        dt = datetime.fromisoformat(s.replace("Z", "+00:00"))
+        return dt.strftime("%d/%m/%Y")
+    except Exception:
+        if len(s) >= 10:
+            return f"{s[8:10]}/{s[5:7]}/{s[0:4]}"
+        return s
+
+
+def format_cnpj(value: Any) -> str:
+    """Formata CNPJ com 14 dígitos (ex: 00.000.000/0000-00); outros valores ficam como vieram."""
+    raw_cnpj = str(value or "")
+    digits = "".join(filter(str.isdigit, raw_cnpj))
+    if len(digits) == 14:
+        return f"{digits[:2]}.{digits[2:5]}.{digits[5:8]}/{digits[8:12]}-{digits[12:]}"
+    return raw_cnpj
+
+
+def replace_placeholder_with_table(doc, placeholder, headers, row_label, data_values, target_paragraph=None):
+    """
+    Substitui um parágrafo contendo o placeholder por uma tabela dinâmica.
+    Se `target_paragraph` (âncora já indexada) não for informado, procura o parágrafo.
+    """
+    if target_paragraph is None:
+        for p in doc.paragraphs:
+            if placeholder in p.text:
+                target_paragraph = p
+                break
+
+    if not target_paragraph:
+        return
+
+    # Criar tabela
+    # Colunas = Label + Dados (len(data_values))
+    cols = 1 + len(data_values)
+    table = doc.add_table(rows=2, cols=cols)
+    table.style = 'Table Grid'
+    table.alignment = WD_TABLE_ALIGNMENT.CENTER
+
+    # Preencher Cabeçalho
+    hdr_cells = table.rows[0].cells
+    hdr_cells[0].text = headers[0]
+    set_cell_background(hdr_cells[0], "D9D9D9")  # Cinza claro
+    hdr_cells[0].paragraphs[0].runs[0].bold = True
+    hdr_cells[0].paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.CENTER
+
+    for i, header_text in enumerate(headers[1:]):
+        cell = hdr_cells[i + 1]
+        cell.text = str(header_text)
+        set_cell_background(cell, "D9D9D9")
+        cell.paragraphs[0].runs[0].bold = True
+        cell.paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.CENTER
+
+    # Preencher Dados
+    row_cells = table.rows[1].cells
+    row_cells[0].text = row_label
+    # set_cell_background(row_cells[0], "FFFFFF") # Branco (padrão)
+    row_cells[0].paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.CENTER
+
+    for i, val in enumerate(data_values):
+        cell = row_cells[i + 1]
+        cell.text = str(val)
+        cell.paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.CENTER
+
+    # Mover tabela para depois do parágrafo alvo
+    target_paragraph._p.addnext(table._tbl)
+
+    # Remover o parágrafo do placeholder
+    p = target_paragraph._p
+    parent = p.getparent()
+    parent.remove(p)
+
+    # Célula de tabela precisa terminar em parágrafo (exigência do Word)
+    if parent.tag == qn('w:tc') and parent[-1] is table._tbl:
+        parent.append(OxmlElement('w:p'))
+
+
+# -------------------------------
+# Substituir placeholders
+# -------------------------------
+
+@lru_cache(maxsize=32)
+def _compilar_padrao(chaves):
+    """Regex única (alternância) para um conjunto de chaves; as mais longas primeiro."""
+    ordenadas = sorted(chaves, key=len, reverse=True)
+    return re.compile("|".join(re.escape(k) for k in ordenadas))
+
+
+def substituir_placeholders_paragrafo(paragraph, mapa):
+    """
+    Substitui todos os placeholders do parágrafo em uma única passada.
+
+    O texto dos runs é concatenado e varrido uma vez com uma regex combinada.
+    Placeholders quebrados entre runs são resolvidos por aritmética de
+    offsets: o valor (e o restante do último run envolvido) vai para o
+    primeiro run do placeholder, que mantém sua formatação, e os demais runs
+    envolvidos ficam vazios.
+    """
+    if not mapa:
+        return
+
+    runs = paragraph.runs
+    if not runs:
+        return
+
+    textos = [run.text for run in runs]
+    full_text = "".join(textos)
+    padrao = _compilar_padrao(tuple(mapa))
+    if padrao.search(full_text) is None:
+        return
+
+    # Offset inicial de cada run no texto concatenado
+    inicios = []
+    pos = 0
+    for texto in textos:
+        inicios.append(pos)
+        pos += len(texto)
+
+    def run_do_offset(offset):
+        return bisect_right(inicios, offset) - 1
+
+    partes = [[] for _ in runs]
+    # Trecho [cursor, fim_herdado) pertence a `dono_herdado` (sobra de um merge)
+    fim_herdado = -1
+    dono_herdado = None
+
+    def dono(offset):
+        if offset < fim_herdado:
+            return dono_herdado
+        return run_do_offset(offset)
+
+    def emitir(inicio, fim):
+        # Distribui o texto original [inicio, fim) entre os donos de cada trecho
+        while inicio < fim:
+            idx = run_do_offset(inicio)
+            limite = min(fim, inicios[idx] + len(textos[idx]))
+            if inicio < fim_herdado:
+                limite = min(limite, fim_herdado)
+            partes[dono(inicio)].append(full_text[inicio:limite])
+            inicio = limite
+
+    cursor = 0
+    for match in padrao.finditer(full_text):
+        inicio, fim = match.span()
+        emitir(cursor, inicio)
+
+        alvo = dono(inicio)
+        partes[alvo].append(mapa[match.group(0)])
+
+        ultimo = run_do_offset(fim - 1)
+        if ultimo != run_do_offset(inicio):
+            # Placeholder quebrado: o restante do último run envolvido vai para o alvo
+            fim_herdado = inicios[ultimo] + len(textos[ultimo])
+            dono_herdado = alvo
+        cursor = fim
+
+    emitir(cursor, len(full_text))
+
+    for run, texto, parte in zip(runs, textos, partes):
+        novo = "".join(parte)
+        if novo != texto:
+            run.text = novo
+
+
+def substituir_placeholders(documento, mapa):
+    for paragraph in documento.paragraphs:
+        substituir_placeholders_paragrafo(paragraph, mapa)
+
+    for table in documento.tables:
+        for row in table.rows:
+            for cell in row.cells:
+                for paragraph in cell.paragraphs:
+                    substituir_placeholders_paragrafo(paragraph, mapa)
+
+
+# -------------------------------
+# Remover negrito após rótulos
+# -------------------------------
+
+def remover_negrito_apos_rotulos(documento, rotulos, paragrafos=None):
+    """
+    Remove o negrito do texto após os `rotulos`. Se `paragrafos` for informado
+    (ex.: parágrafos indexados do template compilado), processa apenas eles.
+    """
+    def process_paragraph(paragraph):
+        full_text = "".join(run.text for run in paragraph.runs)
+
+        # Verifica se o parágrafo contém algum dos rótulos
+        matched_label = None
+        match_index = -1
+
+        for label in rotulos:
+            if label in full_text:
+                idx = full_text.find(label)
+                if idx != -1:
+                    matched_label = label
+                    match_index = idx
+                    break
+
+        if not matched_label:
+            return
+
+        split_point = match_index + len(matched_label)
+
+        if split_point >= len(full_text):
+            return
+
+        # Coletar dados dos runs para reconstrução preservando formatação
+        runs_data = []
+        current_pos = 0
+
+        for run in paragraph.runs:
+            run_len = len(run.text)
+            run_end = current_pos + run_len
+
+            # Caso 1: Run totalmente antes do split point (Manter como está)
+            if run_end <= split_point:
+                runs_data.append({
+                    "text": run.text,
+                    "src_run": run,
+                    "force_unbold": False
+                })
+
+            # Caso 2: Run totalmente depois do split point (Forçar sem negrito)
+            elif current_pos >= split_point:
+                runs_data.append({
+                    "text": run.text,
+                    "src_run": run,
+                    "force_unbold": True
+                })
+
+            # Caso 3: Run atravessa o split point (Dividir)
+            else:
+                split_in_run = split_point - current_pos
+                text_before = run.text[:split_in_run]
+                text_after = run.text[split_in_run:]
+
+                if text_before:
+                    runs_data.append({
+                        "text": text_before,
+                        "src_run": run,
+                        "force_unbold": False
+                    })
+                if text_after:
+                    runs_data.append({
+                        "text": text_after,
+                        "src_run": run,
+                        "force_unbold": True
+                    })
+
+            current_pos += run_len
+
+        # Limpar runs existentes
+        p = paragraph._p
+        for run in paragraph.runs:
+            p.remove(run._r)
+
+        # Reconstruir runs
+        for data in runs_data:
+            new_run = paragraph.add_run(data["text"])
+            copy_run_attrs(data["src_run"], new_run)
+
+            if data["force_unbold"]:
+                new_run.bold = False
+
+    if paragrafos is not None:
+        for paragraph in paragrafos:
+            process_paragraph(paragraph)
+        return
+
+    # Texto normal
+    for paragraph in documento.paragraphs:
+        process_paragraph(paragraph)
+
+    # Também processa texto interno de tabelas
+    for table in documento.tables:
+        for row in table.rows:
+            for cell in row.cells:
+                for paragraph in cell.paragraphs:
+                    process_paragraph(paragraph)
+
+
+# ==========================================================
+# Slots de tabela
+# ==========================================================
+
+# renderer(documento, placeholder, parágrafo_âncora, dados)
+SlotRenderer = Callable[[Any, str, Any, Dict[str, Any]], None]
+
+
+def year_table_slot(
+    row_label: str,
+    values_key: str,
+    formatter: Callable[[Any], str],
+    *,
+    years_key: str = "anos",
+) -> SlotRenderer:
+    """Slot que troca a âncora por uma tabela Ano x valor (uma coluna por ano)."""
+
+    def render(documento, placeholder, anchor, dados):
+        headers = ["Ano"] + [str(ano) for ano in dados[years_key]]
+        values = [formatter(v) for v in dados[values_key]]
+        replace_placeholder_with_table(
+            documento, placeholder, headers, row_label, values, target_paragraph=anchor
+        )
+
+    return render
+
+
+# ==========================================================
+# Registro de tipos de documento
+# ==========================================================
+
+class DocumentType:
+    """Definição de um tipo de documento renderizado pelo motor."""
+
+    def __init__(
+        self,
+        name: str,
+        template: Sequence[str],
+        *,
+        build_values: Callable[[Dict[str, Any]], Dict[str, str]],
+        table_slots: Optional[Dict[str, SlotRenderer]] = None,
+        labels: Iterable[str] = (),
+        file_name: str = "{name}",
+    ):
+        self.name = name
+        # Partes do caminho em assets/ (ex.: ("documents", "standard_proposal.docx"))
+        self.template = tuple(template)
+        self.build_values = build_values
+        self.table_slots = dict(table_slots or {})
+        self.labels = tuple(labels)
+        # Formatado com os dados do documento (ex.: "{razao_social} - Contrato")
+        self.file_name = file_name
+
+    @property
+    def template_path(self) -> Path:
+        from helpers.paths import get_asset_path
+
+        # Template em assets (somente leitura)
+        return Path(get_asset_path(*self.template))
+
+    def compiled(self) -> CompiledDocxTemplate:
+        return get_compiled_template(
+            self.template_path,
+            table_placeholders=tuple(self.table_slots),
+            labels=self.labels,
+        )
+
+    def output_name(self, dados: Dict[str, Any]) -> str:
+        return self.file_name.format(name=self.name, **dados)
+
+
+_document_types: Dict[str, DocumentType] = {}
+_registry_lock = threading.Lock()
+
+
+def register_document_type(document_type: DocumentType) -> DocumentType:
+    """Registra (ou substitui) um tipo de documento."""
+    with _registry_lock:
+        _document_types[document_type.name] = document_type
+    return document_type
+
+
+def get_document_type(kind) -> DocumentType:
+    """Tipo registrado pelo nome (importa o módulo dos tipos embutidos)."""
+    if isinstance(kind, DocumentType):
+        return kind
+    if kind not in _document_types and kind in BUILTIN_DOCUMENT_MODULES:
+        importlib.import_module(BUILTIN_DOCUMENT_MODULES[kind])
+    try:
+        return _document_types[kind]
+    except KeyError:
+        raise ValueError(f"Tipo de documento desconhecido: {kind}") from None
+
+
+def document_type_names() -> List[str]:
+    return sorted(set(_document_types) | set(BUILTIN_DOCUMENT_MODULES))
+
+
+# ==========================================================
+# Backends de saída
+# ==========================================================
+
+def resolve_pdf_backend(backend=None) -> str:
+    """Resolve o backend de PDF efetivo ("word" ou "native")."""
+    backend = (backend or PDF_BACKEND or "auto").lower()
+    if backend == "auto":
+        return "word" if sys.platform == "win32" else "native"
+    if backend not in ("word", "native"):
+        raise ValueError(f"Backend de PDF desconhecido: {backend}")
+    return backend
+
+
+def pdf_format(pdf_backend=None) -> str:
+    """Nome do backend/formato de PDF ("pdf_word" ou "pdf_native")."""
+    return f"pdf_{resolve_pdf_backend(pdf_backend)}"
+
+
+def convert_docx_to_pdf(docx_path, pdf_path):
+    """Converte um DOCX em PDF via Word (docx2pdf). Deve rodar em um único processo."""
+    try:
+        import pythoncom
+        pythoncom.CoInitialize()
+
+        print(f"Convertendo para PDF...")
+        print(f"  DOCX: {docx_path}")
+        print(f"  PDF:  {pdf_path}")
+
+        # ⚠️ CORREÇÃO CRÍTICA PARA CX_FREEZE:
+        # Em apps GUI congelados, sys.stdout e sys.stderr são None.
+        # A biblioteca docx2pdf (via tqdm) tenta escrever neles e causa erro:
+        # 'NoneType' object has no attribute 'write'
+        # Solução: Redirecionar para um dummy writer se necessário.
+
+        class DummyWriter:
+            def write(self, message): pass
+            def flush(self): pass
+
+        original_stdout = sys.stdout
+        original_stderr = sys.stderr
+
+        try:
+            if sys.stdout is None: sys.stdout = DummyWriter()
+            if sys.stderr is None: sys.stderr = DummyWriter()
+
+            from docx2pdf import convert
+            convert(str(docx_path), str(pdf_path))
+
+        finally:
+            sys.stdout = original_stdout
+            sys.stderr = original_stderr
+
+        print("PDF gerado com sucesso.")
+    finally:
+        try:
+            import pythoncom
+            pythoncom.CoUninitialize()
+        except:
+            pass
+
+
+class OutputBackend:
+    """Grava um documento preenchido em um formato de saída."""
+
+    name = ""
+    extension = ""
+    # Falso quando o backend não pode rodar em processos/threads paralelos
+    parallel = True
+    # Verdadeiro quando o backend converte a partir do DOCX salvo em disco
+    needs_docx = False
+
+    def write(self, documento, path: Path, *, docx_path: Optional[Path] = None) -> None:
+        raise NotImplementedError
+
+
+class DocxOutput(OutputBackend):
+    name = "docx"
+    extension = ".docx"
+
+    def write(self, documento, path, *, docx_path=None):
+        documento.save(path)
+        print(f"Documento DOCX salvo em: {path}")
+
+
+class NativePdfOutput(OutputBackend):
+    name = "pdf_native"
+    extension = ".pdf"
+
+    def write(self, documento, path, *, docx_path=None):
+        from scripts.pdf_renderer import render_document_pdf
+
+        render_document_pdf(documento, path)
+
+
+class WordPdfOutput(OutputBackend):
+    name = "pdf_word"
+    extension = ".pdf"
+    parallel = False
+    needs_docx = True
+
+    def write(self, documento, path, *, docx_path=None):
+        convert_docx_to_pdf(str(docx_path), str(path))
+
+
+_output_backends: Dict[str, OutputBackend] = {}
+
+
+def register_output_backend(backend: OutputBackend) -> OutputBackend:
+    _output_backends[backend.name] = backend
+    return backend
+
+
+def get_output_backend(name: str) -> OutputBackend:
+    try:
+        return _output_backends[name]
+    except KeyError:
+        raise ValueError(f"Backend de saída desconhecido: {name}") from None
+
+
+for _backend in (DocxOutput(), NativePdfOutput(), WordPdfOutput()):
+    register_output_backend(_backend)
+
+
+def resolve_formats(formats: Iterable[str], pdf_backend=None) -> Tuple[str, ...]:
+    """Troca o apelido "pdf" pelo backend de PDF efetivo, sem repetições."""
+    resolved = [pdf_format(pdf_backend) if fmt == "pdf" else fmt for fmt in formats]
+    for fmt in resolved:
+        get_output_backend(fmt)
+    return tuple(dict.fromkeys(resolved))
+
+
+# ==========================================================
+# Renderização
+# ==========================================================
+
+def build_document(kind, dados: Dict[str, Any], *, timings: Optional[Dict[str, float]] = None):
+    """Preenche o template do tipo e retorna o documento em memória.
+
+    Com `timings`, soma a duração (s) de cada etapa em `template_load`,
+    `tables`, `placeholders` e `bold_removal` (usado pelo benchmark).
+    """
+    document_type = get_document_type(kind)
+    marca = time.perf_counter()
+
+    def etapa(nome: str) -> None:
+        nonlocal marca
+        agora = time.perf_counter()
+        if timings is not None:
+            timings[nome] = timings.get(nome, 0.0) + (agora - marca)
+        marca = agora
+
+    # Template compilado uma vez por processo; cada documento usa um clone
+    # em memória (sem cópia temporária e sem abrir o arquivo de assets)
+    instancia = document_type.compiled().instantiate()
+    documento = instancia.document
+    etapa("template_load")
+
+    # 1. Slots de tabela
+    for placeholder, render in document_type.table_slots.items():
+        anchor = instancia.anchors.get(placeholder)
+        if anchor is not None:
+            render(documento, placeholder, anchor, dados)
+    etapa("tables")
+
+    # 2. Placeholders de texto (apenas parágrafos indexados)
+    valores = document_type.build_values(dados)
+    for paragraph in instancia.placeholder_paragraphs:
+        substituir_placeholders_paragrafo(paragraph, valores)
+    etapa("placeholders")
+
+    # 3. Remover negrito após rótulos (apenas parágrafos indexados)
+    if document_type.labels:
+        remover_negrito_apos_rotulos(documento, document_type.labels, instancia.label_paragraphs)
+    etapa("bold_removal")
+
+    return documento
+
+
+def output_path(output_dir, nome_arquivo: str, extension: str) -> Path:
+    from helpers.paths import get_output_path
+
+    # ⚠️ VALIDAÇÃO CRÍTICA: output_dir NUNCA pode ser None
+    if not output_dir:
+        raise ValueError(
+            "output_dir não configurado. "
+            "Configure a pasta de saída no Backoffice antes de gerar documentos."
+        )
+    # Save generated files to external directory (WRITE)
+    return Path(get_output_path(output_dir, f"{nome_arquivo}{extension}"))
+
+
+def cache_key(kind, dados: Dict[str, Any]) -> str:
+    """Chave de cache dos dados do documento + hash do template."""
+    from scripts.document_cache import document_cache_key
+
+    document_type = get_document_type(kind)
+    return document_cache_key(document_type.name, dados, template_path=document_type.template_path)
+
+
+def render_document(
+    kind,
+    dados: Dict[str, Any],
+    output_dir,
+    *,
+    formats: Iterable[str] = ("docx",),
+    pdf_backend=None,
+    nome_arquivo: Optional[str] = None,
+    use_cache: bool = False,
+) -> Dict[str, Path]:
+    """Renderiza o documento nos formatos pedidos e retorna {formato: caminho}.
+
+    `formats` aceita nomes de backends ou o apelido "pdf". Com `use_cache`,
+    arquivos já gerados para a mesma entrada na pasta são reaproveitados.
+    Um PDF pelo Word sem DOCX pedido usa um DOCX intermediário em uma pasta
+    temporária (nunca o DOCX da pasta de saída), removida ao final.
+    """
+    document_type = get_document_type(kind)
+    formats = resolve_formats(formats, pdf_backend)
+
+    cache = key = None
+    if use_cache and output_dir:
+        from scripts.document_cache import get_cache_index
+
+        cache = get_cache_index(output_dir)
+        key = cache_key(document_type, dados)
+        cached = cache.lookup(key, require=formats)
+        if cached:
+            _debug_print(f"{document_type.name} inalterado, reaproveitando arquivos em cache")
+            return {fmt: Path(cached[fmt]) for fmt in formats}
+
+    nome_arquivo = nome_arquivo or document_type.output_name(dados)
+    documento = build_document(document_type, dados)
+
+    paths: Dict[str, Path] = {}
+    docx_path = None
+    temp_dir = temp_docx = None
+    backends = [get_output_backend(fmt) for fmt in formats]
+    if any(backend.needs_docx for backend in backends) and "docx" not in formats:
+        temp_dir = tempfile.mkdtemp(prefix="merx_docx_")
+        temp_docx = Path(temp_dir) / f"{nome_arquivo}.docx"
+    try:
+        # O DOCX vai primeiro: backends de conversão leem o arquivo salvo
+        for backend in sorted(backends, key=lambda b: b.name != "docx"):
+            path = output_path(output_dir, nome_arquivo, backend.extension)
+            if backend.needs_docx and docx_path is None:
+                docx_path = temp_docx
+                get_output_backend("docx").write(documento, docx_path)
+            backend.write(documento, path, docx_path=docx_path)
+            if backend.name == "docx":
+                docx_path = path
+            paths[backend.name] = path
+    finally:
+        if temp_dir is not None:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    if cache is not None:
+        cache.store(key, **{fmt: str(path) for fmt, path in paths.items()})
+    return paths
+
+
+def render_document_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Tarefa para pools de processos; nunca propaga exceção.
+
+    `job` tem `kind`, `dados`, `output_dir` e opcionalmente `formats`,
+    `nome_arquivo` e `job_id` (devolvido no resultado). Retorna os caminhos
+    por formato em `paths` e a mensagem de falha em `error`.
+    """
+    try:
+        paths = render_document(
+            job["kind"],
+            job["dados"],
+            job["output_dir"],
+            formats=job.get("formats", ("docx",)),
+            nome_arquivo=job.get("nome_arquivo"),
+        )
+        return {
+            "job_id": job.get("job_id"),
+            "paths": {fmt: str(path) for fmt, path in paths.items()},
+            "error": None,
+        }
+    except Exception as exc:
+        return {"job_id": job.get("job_id"), "paths": {}, "error": str(exc)}
@@ -0,0 +1,277 @@
+"""Exportação de documentos gerados em um arquivo ZIP.
+
+Os documentos das propostas selecionadas passam pela fila de geração
+(`scripts.document_jobs`): os que não mudaram saem do cache da pasta de
+saída e os demais são renderizados na hora. Cada job concluído tem seus
+arquivos copiados para o ZIP assim que termina, em blocos, direto no disco
+(o arquivo nunca é montado inteiro em memória). Ao final entra o
+`manifest.csv` com proposta, cliente, hash da entrada e arquivos de cada
+item. O ZIP é escrito em `<nome>.zip.part` e só é renomeado quando completo.
+
+Uso sem interface:
+
+    python -m scripts.document_export --output-dir ./saida --zip ./envio.zip --ids <id1> <id2>
+    python -m scripts.document_export --output-dir ./saida --zip ./contratos.zip --kind contract --status ACCEPTED
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import io
+import os
+import queue
+import zipfile
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from scripts.document_jobs import (
+    DOCUMENT_KINDS,
+    STATUS_DONE,
+    STATUS_ERROR,
+    STATUS_LABELS,
+    DocumentJob,
+    DocumentJobQueue,
+    get_document_job_queue,
+)
+from scripts.proposal_batch import fetch_proposals_with_seasonalities
+
+
+DEBUG_PREFIX = "[DocumentExport]"
+
+MANIFEST_NAME = "manifest.csv"
+MANIFEST_COLUMNS = [
+    "proposal_id",
+    "cliente",
+    "documento",
+    "hash_entrada",
+    "arquivos",
+    "status",
+    "erro",
+]
+
+# DOCX já é um ZIP: comprimir de novo só gasta CPU
+COMPRESSION_BY_EXTENSION = {
+    ".docx": zipfile.ZIP_STORED,
+    ".pdf": zipfile.ZIP_DEFLATED,
+}
+
+# callback(concluídos, total, job)
+ExportProgressCallback = Callable[[int, int, Optional[DocumentJob]], None]
+
+
+def _debug_print(message: str, *, data: Any | None = None) -> None:
+    print(f"{DEBUG_PREFIX} {message}")
+    if data is not None:
+        print(f"{DEBUG_PREFIX} -> {data}")
+
+
+def default_zip_name(kind: str = "proposal") -> str:
+    """Nome padrão do ZIP (ex.: "Propostas 2026-10-19 14h30.zip")."""
+    label = DOCUMENT_KINDS[kind][0]
+    return f"{label}s {datetime.now().strftime('%Y-%m-%d %Hh%M')}.zip"
+
+
+def _unique_arcname(name: str, used: set) -> str:
+    # Nomes iguais no ZIP sobrescreveriam uns aos outros ao extrair
+    stem, ext = os.path.splitext(name)
+    candidate = name
+    count = 2
+    while candidate.lower() in used:
+        candidate = f"{stem} ({count}){ext}"
+        count += 1
+    used.add(candidate.lower())
+    return candidate
+
+
+def export_documents_zip(
+    proposal_ids: Iterable[Any],
+    output_dir: str,
+    zip_path,
+    *,
+    kind: str = "proposal",
+    include: Iterable[str] = ("docx", "pdf"),
+    use_cache: bool = True,
+    job_queue: Optional[DocumentJobQueue] = None,
+    on_progress: Optional[ExportProgressCallback] = None,
+    records: Optional[List[Tuple[Dict[str, Any], List[Dict[str, Any]]]]] = None,
+) -> Dict[str, Any]:
+    """Gera (ou reaproveita) os documentos e os grava em `zip_path`.
+
+    `include` escolhe os formatos copiados ("docx" e/ou "pdf"). `records`
+    são pares (proposta, sazonalidades) já carregados; sem eles, as
+    propostas são buscadas pelos IDs. Itens com erro não interrompem a
+    exportação e aparecem no manifesto. Bloqueia até todos os jobs
+    terminarem; na interface, chamar fora da thread da UI.
+    Retorna `zip_path`, `total`, `exported` e `failed`.
+    """
+    include = tuple(include)
+    if not include or any(fmt not in ("docx", "pdf") for fmt in include):
+        raise ValueError(f"Formatos inválidos para exportação: {include}")
+    if kind not in DOCUMENT_KINDS:
+        raise ValueError(f"Tipo de documento desconhecido: {kind}")
+
+    zip_path = Path(zip_path)
+    job_queue = job_queue or get_document_job_queue()
+    ids = [pid for pid in dict.fromkeys(proposal_ids) if pid]
+    if records is None:
+        records = fetch_proposals_with_seasonalities(ids)
+    missing = set(ids) - {proposal.get("id") for proposal, _ in records}
+
+    finished: "queue.Queue[DocumentJob]" = queue.Queue()
+
+    def on_job_change(job: Optional[DocumentJob]) -> None:
+        if job is not None and job.is_finished:
+            finished.put(job)
+
+    # Inscreve antes de enfileirar para não perder jobs servidos do cache
+    unsubscribe = job_queue.subscribe(on_job_change)
+    try:
+        pending: Dict[str, DocumentJob] = {}
+        for proposal, seasonalities in records:
+            job = job_queue.submit_proposal(
+                proposal,
+                output_dir,
+                kind=kind,
+                seasonalities=seasonalities,
+                to_pdf="pdf" in include,
+                use_cache=use_cache,
+            )
+            pending[job.id] = job
+
+        total = len(pending) + len(missing)
+        _debug_print(f"Exportando {total} documento(s) para {zip_path}")
+        zip_path.parent.mkdir(parents=True, exist_ok=True)
+        part_path = zip_path.with_name(zip_path.name + ".part")
+        rows: List[Dict[str, Any]] = []
+        used_names: set = set()
+        exported = 0
+
+        try:
+            with zipfile.ZipFile(part_path, "w", zipfile.ZIP_DEFLATED, allowZip64=True) as archive:
+                for proposal_id in missing:
+                    rows.append(
+                        {
+                            "proposal_id": proposal_id,
+                            "status": STATUS_LABELS[STATUS_ERROR],
+                            "erro": "Proposta não encontrada",
+                        }
+                    )
+                    if on_progress:
+                        on_progress(len(rows), total, None)
+
+                while pending:
+                    try:
+                        job = finished.get(timeout=0.5)
+                    except queue.Empty:
+                        # Rede de segurança caso um aviso se perca
+                        job = next((j for j in pending.values() if j.is_finished), None)
+                        if job is None:
+                            continue
+                    if pending.pop(job.id, None) is None:
+                        continue
+
+                    files = []
+                    if job.status == STATUS_DONE:
+                        paths = [job.docx_path if fmt == "docx" else job.pdf_path for fmt in include]
+                        for path in filter(None, paths):
+                            arcname = _unique_arcname(os.path.basename(path), used_names)
+                            compression = COMPRESSION_BY_EXTENSION.get(
+                                os.path.splitext(path)[1].lower(), zipfile.ZIP_DEFLATED
+                            )
+                            # ZipFile.write copia o arquivo em blocos
+                            archive.write(path, arcname, compress_type=compression)
+                            files.append(arcname)
+                        exported += 1
+
+                    rows.append(
+                        {
+                            "proposal_id": job.proposal_id,
+                            "cliente": job.proposal.get("customer_name") or "",
+                            "documento": DOCUMENT_KINDS[job.kind][0],
+                            "hash_entrada": job.input_hash or "",
+                            "arquivos": " | ".join(files),
+                            "status": STATUS_LABELS[job.status],
+                            "erro": job.error or "",
+                        }
+                    )
+                    if on_progress:
+                        on_progress(len(rows), total, job)
+
+                with archive.open(MANIFEST_NAME, "w") as handle:
+                    # utf-8-sig e ";" para o Excel em português abrir direto
+                    text = io.TextIOWrapper(handle, encoding="utf-8-sig", newline="")
+                    writer = csv.DictWriter(text, fieldnames=MANIFEST_COLUMNS, delimiter=";")
+                    writer.writeheader()
+                    for row in rows:
+                        writer.writerow({column: row.get(column, "") for column in MANIFEST_COLUMNS})
+                    text.flush()
+                    text.detach()
+            os.replace(part_path, zip_path)
+        except BaseException:
+            if part_path.exists():
+                part_path.unlink()
+            raise
+    finally:
+        unsubscribe()
+
+    failed = len(rows) - exported
+    _debug_print(f"ZIP concluído: {exported} exportado(s), {failed} com erro/cancelado(s)")
+    return {
+        "zip_path": str(zip_path),
+        "total": len(rows),
+        "exported": exported,
+        "failed": failed,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from scripts.proposal_batch import _select_proposal_ids
+
+    parser = argparse.ArgumentParser(description="Exporta documentos de propostas em um ZIP.")
+    parser.add_argument("--output-dir", required=True, help="Pasta de saída dos documentos")
+    parser.add_argument("--zip", help="Caminho do ZIP (padrão: na pasta de saída)")
+    parser.add_argument("--ids", nargs="*", help="IDs das propostas (padrão: todas)")
+    parser.add_argument("--status", help="Filtra por status (ex.: PENDING, ACCEPTED)")
+    parser.add_argument("--kind", choices=sorted(DOCUMENT_KINDS), default="proposal")
+    parser.add_argument("--no-pdf", action="store_true", help="Exporta apenas os DOCX")
+    parser.add_argument("--no-docx", action="store_true", help="Exporta apenas os PDF")
+    parser.add_argument(
+        "--pdf-backend",
+        choices=["auto", "word", "native"],
+        default=None,
+        help="Backend do PDF (padrão: PROPOSAL_PDF_BACKEND ou auto)",
+    )
+    parser.add_argument("--force", action="store_true", help="Ignora o cache e gera tudo de novo")
+    args = parser.parse_args(argv)
+
+    include = [fmt for fmt, skip in (("docx", args.no_docx), ("pdf", args.no_pdf)) if not skip]
+    zip_path = args.zip or os.path.join(args.output_dir, default_zip_name(args.kind))
+
+    def print_progress(done: int, total: int, job: Optional[DocumentJob]) -> None:
+        if job is None:
+            print(f"[{done}/{total}] proposta não encontrada")
+        else:
+            print(f"[{done}/{total}] {job.label}: {job.error or STATUS_LABELS[job.status]}")
+
+    job_queue = DocumentJobQueue(pdf_backend=args.pdf_backend)
+    try:
+        result = export_documents_zip(
+            _select_proposal_ids(args.ids, args.status),
+            args.output_dir,
+            zip_path,
+            kind=args.kind,
+            include=include,
+            use_cache=not args.force,
+            job_queue=job_queue,
+            on_progress=print_progress,
+        )
+    finally:
+        job_queue.shutdown(wait=True)
+    print(result["zip_path"])
+    return 1 if result["failed"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
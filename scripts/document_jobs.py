@@ -0,0 +1,459 @@
+"""Fila de geração de documentos em segundo plano.
+
+Os cliques em "Gerar" (proposta ou contrato) apenas enfileiram um job e
+retornam; a geração roda
+em um pool de threads que orquestra cada job em etapas (dados, renderização
+e PDF). A renderização do DOCX (e do PDF nativo) vai para um pool de
+processos, pois é CPU-bound; a conversão pelo Word é serializada, já que a
+automação COM não paraleliza. A tabela de jobs guarda status, progresso e
+mensagem de cada item, e os ouvintes (o painel da interface) são avisados a
+cada mudança. O cancelamento é cooperativo: um job na fila é descartado na
+hora e um job em execução para na próxima etapa, removendo os arquivos que
+já tenha gerado. Propostas sem alteração desde a última geração são
+servidas do cache da pasta de saída (`scripts.document_cache`).
+
+O motor de documentos (python-docx, fpdf2) e o banco só são importados
+quando a fila é criada ou um job roda: o painel da fila faz parte do layout
+raiz e não pode pesar na abertura da aplicação.
+"""
+
+from __future__ import annotations
+
+import importlib
+import itertools
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from scripts.document_cache import document_owner, get_cache_index
+
+
+DEBUG_PREFIX = "[DocumentJobs]"
+
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_DONE = "done"
+STATUS_ERROR = "error"
+STATUS_CANCELLED = "cancelled"
+
+STATUS_LABELS = {
+    STATUS_QUEUED: "Na fila",
+    STATUS_RUNNING: "Gerando",
+    STATUS_DONE: "Concluído",
+    STATUS_ERROR: "Erro",
+    STATUS_CANCELLED: "Cancelado",
+}
+
+FINISHED_STATUSES = (STATUS_DONE, STATUS_ERROR, STATUS_CANCELLED)
+
+# Documentos gerados a partir de uma proposta: tipo -> (rótulo, montagem dos
+# dados como "módulo:função", importada só na primeira geração)
+DOCUMENT_KINDS = {
+    "proposal": ("Proposta", "scripts.proposal_batch:build_proposal_params"),
+    "contract": ("Contrato", "scripts.contract_generator:build_contract_params"),
+}
+
+# listener(job) é chamado a cada mudança de estado de um job (None quando
+# vários jobs saem da tabela de uma vez)
+JobListener = Callable[[Optional["DocumentJob"]], None]
+
+
+def _debug_print(message: str, *, data: Any | None = None) -> None:
+    print(f"{DEBUG_PREFIX} {message}")
+    if data is not None:
+        print(f"{DEBUG_PREFIX} -> {data}")
+
+
+def _params_builder(kind: str) -> Callable[..., Dict[str, Any]]:
+    module_name, _, attr = DOCUMENT_KINDS[kind][1].partition(":")
+    return getattr(importlib.import_module(module_name), attr)
+
+
+class JobCancelled(Exception):
+    """Interrompe a execução de um job cancelado entre etapas."""
+
+
+class DocumentJob:
+    """Item da tabela de jobs de geração de documentos."""
+
+    def __init__(
+        self,
+        job_id: str,
+        label: str,
+        proposal: Dict[str, Any],
+        output_dir: str,
+        *,
+        kind: str = "proposal",
+        seasonalities: Optional[List[Dict[str, Any]]] = None,
+        nome_arquivo: Optional[str] = None,
+        to_pdf: bool = True,
+        use_cache: bool = True,
+    ):
+        self.id = job_id
+        self.kind = kind
+        self.label = label
+        self.proposal = proposal
+        self.seasonalities = seasonalities
+        self.output_dir = output_dir
+        self.nome_arquivo = nome_arquivo
+        self.to_pdf = to_pdf
+        self.use_cache = use_cache
+        self.cached = False
+        # SHA-256 da entrada do documento (mesma chave do cache)
+        self.input_hash: Optional[str] = None
+
+        self.status = STATUS_QUEUED
+        self.progress = 0.0
+        self.message = STATUS_LABELS[STATUS_QUEUED]
+        self.docx_path: Optional[str] = None
+        self.pdf_path: Optional[str] = None
+        self.error: Optional[str] = None
+        self.created_at = datetime.now()
+        self.finished_at: Optional[datetime] = None
+
+        self._cancel_event = threading.Event()
+        self._future = None
+
+    @property
+    def proposal_id(self) -> Any:
+        return self.proposal.get("id")
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in FINISHED_STATUSES
+
+    @property
+    def cancel_requested(self) -> bool:
+        return self._cancel_event.is_set()
+
+    @property
+    def output_path(self) -> Optional[str]:
+        """Arquivo final do job (PDF quando houver, senão o DOCX)."""
+        return self.pdf_path or self.docx_path
+
+
+class DocumentJobQueue:
+    """Fila de jobs com pool de workers e tabela de status."""
+
+    def __init__(self, *, max_workers: Optional[int] = None, pdf_backend: Optional[str] = None):
+        if not max_workers:
+            from scripts.proposal_batch import MAX_WORKERS
+
+            max_workers = MAX_WORKERS
+        self.max_workers = max(1, max_workers)
+        self.pdf_backend = pdf_backend
+        self._jobs: Dict[str, DocumentJob] = {}
+        self._listeners: List[JobListener] = []
+        self._lock = threading.RLock()
+        self._ids = itertools.count(1)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="document-job"
+        )
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        # Word (COM) converte um documento por vez
+        self._word_lock = threading.Lock()
+
+    # -- ouvintes ------------------------------------------------------
+    def subscribe(self, listener: JobListener) -> Callable[[], None]:
+        """Registra um ouvinte e retorna a função que o remove."""
+        with self._lock:
+            self._listeners.append(listener)
+
+        def unsubscribe() -> None:
+            with self._lock:
+                if listener in self._listeners:
+                    self._listeners.remove(listener)
+
+        return unsubscribe
+
+    def _notify(self, job: Optional[DocumentJob]) -> None:
+        with self._lock:
+            listeners = list(self._listeners)
+        for listener in listeners:
+            try:
+                listener(job)
+            except Exception as exc:
+                _debug_print(f"Falha ao notificar ouvinte: {exc}")
+
+    def _update(self, job: DocumentJob, **changes: Any) -> None:
+        with self._lock:
+            for name, value in changes.items():
+                setattr(job, name, value)
+            if job.is_finished and job.finished_at is None:
+                job.finished_at = datetime.now()
+        self._notify(job)
+
+    # -- tabela de jobs ------------------------------------------------
+    def jobs(self) -> List[DocumentJob]:
+        """Jobs na ordem de criação."""
+        with self._lock:
+            return list(self._jobs.values())
+
+    def get(self, job_id: str) -> Optional[DocumentJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def active_count(self) -> int:
+        with self._lock:
+            return sum(1 for job in self._jobs.values() if not job.is_finished)
+
+    def clear_finished(self) -> int:
+        """Remove da tabela os jobs encerrados e retorna quantos foram removidos."""
+        with self._lock:
+            finished = [job_id for job_id, job in self._jobs.items() if job.is_finished]
+            for job_id in finished:
+                del self._jobs[job_id]
+        self._notify(None)
+        return len(finished)
+
+    # -- enfileiramento ------------------------------------------------
+    @staticmethod
+    def _default_file_name(kind: str, customer_name: str) -> str:
+        from scripts.document_engine import get_document_type
+
+        return get_document_type(kind).output_name({"razao_social": customer_name})
+
+    def _unique_file_name(self, output_dir: str, kind: str, proposal: Dict[str, Any]) -> Optional[str]:
+        # Um documento não pode escrever no arquivo de outro job da tabela
+        # (em execução ou já concluído, ex.: servido do cache e à espera da
+        # cópia para um ZIP) nem no arquivo em cache de outro documento
+        proposal_id = proposal.get("id")
+        base = self._default_file_name(kind, proposal.get("customer_name") or "")
+        taken = set()
+        for job in self._jobs.values():
+            if job.output_dir != output_dir or job.status == STATUS_CANCELLED:
+                continue
+            if proposal_id and job.proposal_id == proposal_id and job.kind == kind:
+                continue
+            taken.add(
+                (job.nome_arquivo or self._default_file_name(
+                    job.kind, job.proposal.get("customer_name") or ""
+                )).lower()
+            )
+            for path in (job.docx_path, job.pdf_path):
+                if path:
+                    taken.add(os.path.splitext(os.path.basename(path))[0].lower())
+        taken |= get_cache_index(output_dir).names_in_use(
+            exclude_owner=document_owner(kind, proposal_id) if proposal_id else None
+        )
+        if base.lower() not in taken:
+            return None
+        count = 2
+        while f"{base} ({count})".lower() in taken:
+            count += 1
+        return f"{base} ({count})"
+
+    def submit_proposal(
+        self,
+        proposal: Dict[str, Any],
+        output_dir: str,
+        *,
+        kind: str = "proposal",
+        seasonalities: Optional[List[Dict[str, Any]]] = None,
+        to_pdf: bool = True,
+        use_cache: bool = True,
+    ) -> DocumentJob:
+        """Enfileira um documento da proposta (`kind`: proposal ou contract).
+
+        Se o mesmo documento já estiver na fila ou em execução, o job
+        existente é retornado. Sem `seasonalities`, elas são buscadas pelo
+        worker. Com `use_cache=False` o documento é gerado mesmo sem
+        alterações.
+        """
+        if kind not in DOCUMENT_KINDS:
+            raise ValueError(f"Tipo de documento desconhecido: {kind}")
+        if not output_dir:
+            raise ValueError(
+                "output_dir não configurado. "
+                "Configure a pasta de saída no Backoffice antes de gerar propostas."
+            )
+
+        with self._lock:
+            proposal_id = proposal.get("id")
+            for job in self._jobs.values():
+                if (
+                    not job.is_finished
+                    and proposal_id
+                    and job.proposal_id == proposal_id
+                    and job.kind == kind
+                ):
+                    return job
+
+            customer_name = proposal.get("customer_name") or ""
+            job = DocumentJob(
+                str(next(self._ids)),
+                f"{DOCUMENT_KINDS[kind][0]} - {customer_name or proposal_id or ''}",
+                proposal,
+                output_dir,
+                kind=kind,
+                seasonalities=seasonalities,
+                nome_arquivo=self._unique_file_name(output_dir, kind, proposal),
+                to_pdf=to_pdf,
+                use_cache=use_cache,
+            )
+            self._jobs[job.id] = job
+            job._future = self._executor.submit(self._run, job)
+
+        _debug_print(f"Job {job.id} enfileirado: {job.label}")
+        self._notify(job)
+        return job
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancela um job da fila ou pede a interrupção de um em execução."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.is_finished:
+                return False
+            job._cancel_event.set()
+            dropped = job._future is not None and job._future.cancel()
+
+        if dropped:
+            self._update(job, status=STATUS_CANCELLED, message=STATUS_LABELS[STATUS_CANCELLED])
+        else:
+            self._update(job, message="Cancelando...")
+        return True
+
+    def shutdown(self, *, wait: bool = False) -> None:
+        """Cancela os jobs pendentes e encerra os pools."""
+        for job in self.jobs():
+            if not job.is_finished:
+                self.cancel(job.id)
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+        with self._lock:
+            pool, self._process_pool = self._process_pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait, cancel_futures=True)
+
+    # -- execução ------------------------------------------------------
+    def _get_process_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._process_pool is None:
+                self._process_pool = ProcessPoolExecutor(max_workers=self.max_workers)
+            return self._process_pool
+
+    def _check_cancelled(self, job: DocumentJob) -> None:
+        if job.cancel_requested:
+            raise JobCancelled()
+
+    def _run(self, job: DocumentJob) -> None:
+        from scripts.database import read_records
+        from scripts.document_engine import (
+            cache_key,
+            convert_docx_to_pdf,
+            pdf_format,
+            render_document_job,
+            resolve_pdf_backend,
+        )
+
+        try:
+            self._check_cancelled(job)
+            self._update(job, status=STATUS_RUNNING, progress=0.05, message="Buscando dados...")
+
+            seasonalities = job.seasonalities
+            if seasonalities is None:
+                seasonalities = read_records(
+                    "proposal_seasonalities", {"proposal_id": job.proposal_id}
+                )
+            dados = _params_builder(job.kind)(job.proposal, seasonalities)
+            native_pdf = job.to_pdf and resolve_pdf_backend(self.pdf_backend) == "native"
+            pdf_fmt = pdf_format(self.pdf_backend) if job.to_pdf else None
+
+            key = job.input_hash = cache_key(job.kind, dados)
+            cache = None
+            if job.use_cache:
+                cache = get_cache_index(job.output_dir)
+                cached = cache.lookup(key, require=("docx", pdf_fmt) if job.to_pdf else ("docx",))
+                if cached:
+                    job.docx_path = cached["docx"]
+                    job.pdf_path = cached.get(pdf_fmt) if job.to_pdf else None
+                    job.cached = True
+                    self._update(job, status=STATUS_DONE, progress=1.0, message="Sem alterações (reaproveitado)")
+                    _debug_print(f"Job {job.id} servido do cache: {job.output_path}")
+                    return
+
+            self._check_cancelled(job)
+            self._update(job, progress=0.25, message="Gerando documento...")
+            rendered = self._get_process_pool().submit(
+                render_document_job,
+                {
+                    "kind": job.kind,
+                    "dados": dados,
+                    "output_dir": job.output_dir,
+                    "formats": ("docx", "pdf_native") if native_pdf else ("docx",),
+                    "nome_arquivo": job.nome_arquivo,
+                },
+            ).result()
+            if rendered["error"]:
+                raise RuntimeError(rendered["error"])
+            job.docx_path = rendered["paths"].get("docx")
+            job.pdf_path = rendered["paths"].get("pdf_native")
+
+            if job.to_pdf and not native_pdf:
+                self._check_cancelled(job)
+                self._update(job, progress=0.6, message="Aguardando conversão para PDF...")
+                pdf_path = os.path.splitext(job.docx_path)[0] + ".pdf"
+                with self._word_lock:
+                    self._check_cancelled(job)
+                    self._update(job, progress=0.7, message="Convertendo para PDF...")
+                    convert_docx_to_pdf(job.docx_path, pdf_path)
+                job.pdf_path = pdf_path
+
+            self._check_cancelled(job)
+            if cache is not None:
+                outputs = {"docx": job.docx_path}
+                if job.to_pdf:
+                    outputs[pdf_fmt] = job.pdf_path
+                cache.store(key, owner=document_owner(job.kind, job.proposal_id), **outputs)
+            self._update(job, status=STATUS_DONE, progress=1.0, message=STATUS_LABELS[STATUS_DONE])
+            _debug_print(f"Job {job.id} concluído: {job.output_path}")
+
+        except JobCancelled:
+            self._discard_outputs(job)
+            self._update(job, status=STATUS_CANCELLED, message=STATUS_LABELS[STATUS_CANCELLED])
+            _debug_print(f"Job {job.id} cancelado")
+        except Exception as exc:
+            _debug_print(f"Job {job.id} falhou: {exc}")
+            self._update(job, status=STATUS_ERROR, error=str(exc), message=str(exc))
+
+    @staticmethod
+    def _discard_outputs(job: DocumentJob) -> None:
+        for path in (job.docx_path, job.pdf_path):
+            if path and os.path.exists(path):
+                try:
+                    os.remove(path)
+                except OSError as exc:
+                    _debug_print(f"Não foi possível remover {path}: {exc}")
+        job.docx_path = job.pdf_path = None
+
+
+_queue: Optional[DocumentJobQueue] = None
+_queue_lock = threading.Lock()
+# Ouvintes inscritos antes de a fila existir (ex.: o painel, na abertura)
+_pending_listeners: List[JobListener] = []
+
+
+def get_document_job_queue() -> DocumentJobQueue:
+    """Fila compartilhada pela aplicação (criada no primeiro uso)."""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = DocumentJobQueue()
+            for listener in _pending_listeners:
+                _queue.subscribe(listener)
+            _pending_listeners.clear()
+        return _queue
+
+
+def subscribe_when_created(listener: JobListener) -> None:
+    """Inscreve o ouvinte na fila compartilhada sem forçar a criação dela.
+
+    Se a fila ainda não existe, a inscrição acontece quando ela for criada.
+    """
+    with _queue_lock:
+        if _queue is None:
+            _pending_listeners.append(listener)
+            return
+        queue = _queue
+    queue.subscribe(listener)
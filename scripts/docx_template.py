@@ -0,0 +1,182 @@
+"""Compilação de templates DOCX com índice de placeholders.
+
+O template é lido e analisado uma única vez por processo. Na compilação
+são registrados os caminhos (índices de filhos a partir do `w:body`) dos
+parágrafos que contêm placeholders `{{CHAVE}}`, das âncoras de tabela e
+dos parágrafos com rótulos. Cada renderização clona a árvore em memória
+(`copy.deepcopy`) e resolve esses caminhos diretamente, sem arquivo
+temporário e sem varrer o documento inteiro.
+"""
+
+import copy
+import re
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+from docx import Document
+from docx.text.paragraph import Paragraph
+
+
+DEBUG_PREFIX = "[DocxTemplate]"
+
+# Placeholders no texto concatenado dos runs de um parágrafo
+PLACEHOLDER_PATTERN = re.compile(r"\{\{[A-Z0-9_]+\}\}")
+
+# Caminho de um elemento: índices de filhos a partir do w:body
+ElementPath = Tuple[int, ...]
+
+_cache: Dict[Tuple[str, float, Tuple[str, ...], Tuple[str, ...]], "CompiledDocxTemplate"] = {}
+_cache_lock = threading.Lock()
+
+
+def _element_path(root, element) -> ElementPath:
+    path: List[int] = []
+    while element is not root:
+        parent = element.getparent()
+        if parent is None:
+            raise ValueError("Elemento fora da raiz informada.")
+        path.append(parent.index(element))
+        element = parent
+    return tuple(reversed(path))
+
+
+def _resolve_path(root, path: ElementPath):
+    element = root
+    for idx in path:
+        element = element[idx]
+    return element
+
+
+def _iter_paragraphs(document) -> Iterable[Paragraph]:
+    """Parágrafos do corpo e das tabelas de nível superior.
+
+    Mesma ordem e abrangência usadas por `substituir_placeholders`
+    (document.paragraphs + document.tables).
+    """
+    yield from document.paragraphs
+
+    # Guarda os próprios elementos: ids de proxies lxml temporários são reaproveitados
+    seen = set()
+    for table in document.tables:
+        for row in table.rows:
+            for cell in row.cells:
+                # Células mescladas aparecem repetidas em row.cells
+                if cell._tc in seen:
+                    continue
+                seen.add(cell._tc)
+                yield from cell.paragraphs
+
+
+class TemplateInstance:
+    """Cópia de um template compilado pronta para ser preenchida."""
+
+    def __init__(self, document, placeholder_paragraphs, label_paragraphs, anchors):
+        self.document = document
+        # Parágrafos com algum placeholder de texto, na ordem do documento
+        self.placeholder_paragraphs: List[Paragraph] = placeholder_paragraphs
+        # Parágrafos que contêm algum dos rótulos informados na compilação
+        self.label_paragraphs: List[Paragraph] = label_paragraphs
+        # Parágrafo-âncora de cada placeholder de tabela
+        self.anchors: Dict[str, Paragraph] = anchors
+
+
+class CompiledDocxTemplate:
+    """Template DOCX analisado uma vez, com o índice de placeholders."""
+
+    def __init__(
+        self,
+        path,
+        *,
+        table_placeholders: Iterable[str] = (),
+        labels: Iterable[str] = (),
+    ):
+        self.path = Path(path)
+        self.table_placeholders = tuple(table_placeholders)
+        self.labels = tuple(labels)
+
+        self._document = Document(str(self.path))
+        body = self._document.element.body
+
+        self.placeholders: Dict[str, List[ElementPath]] = {}
+        self.anchor_paths: Dict[str, ElementPath] = {}
+        self.placeholder_paths: List[ElementPath] = []
+        self.label_paths: List[ElementPath] = []
+
+        for paragraph in _iter_paragraphs(self._document):
+            text = paragraph.text
+            if not text:
+                continue
+            path = _element_path(body, paragraph._p)
+
+            has_text_placeholder = False
+            for key in PLACEHOLDER_PATTERN.findall(text):
+                self.placeholders.setdefault(key, []).append(path)
+                if key in self.table_placeholders:
+                    # Primeira ocorrência (o corpo vem antes das células de tabela)
+                    if key not in self.anchor_paths:
+                        self.anchor_paths[key] = path
+                else:
+                    has_text_placeholder = True
+
+            if has_text_placeholder:
+                self.placeholder_paths.append(path)
+            if any(label in text for label in self.labels):
+                self.label_paths.append(path)
+
+        print(
+            f"{DEBUG_PREFIX} Template compilado: {self.path.name} "
+            f"({len(self.placeholders)} placeholders, {len(self.anchor_paths)} âncoras)"
+        )
+
+    def instantiate(self) -> TemplateInstance:
+        """Clona o documento em memória e resolve os parágrafos indexados.
+
+        Todos os caminhos são resolvidos antes de qualquer alteração, então
+        inserir/remover elementos depois não invalida as referências.
+        """
+        document = copy.deepcopy(self._document)
+        # O deepcopy de elementos lxml ignora o memo: o `_Body` em cache do
+        # original viria apontando para uma cópia solta de <w:body>
+        # (document.tables/paragraphs veriam o template sem alterações)
+        document._Document__body = None
+        body = document.element.body
+
+        def resolve(path: ElementPath) -> Paragraph:
+            # O pai só é usado para chegar à `part` (estilos), então o corpo basta
+            return Paragraph(_resolve_path(body, path), document._body)
+
+        return TemplateInstance(
+            document,
+            [resolve(path) for path in self.placeholder_paths],
+            [resolve(path) for path in self.label_paths],
+            {key: resolve(path) for key, path in self.anchor_paths.items()},
+        )
+
+
+def get_compiled_template(
+    path,
+    *,
+    table_placeholders: Iterable[str] = (),
+    labels: Iterable[str] = (),
+) -> CompiledDocxTemplate:
+    """Retorna o template compilado em cache (recompila se o arquivo mudar)."""
+    path = Path(path)
+    key = (str(path.resolve()), path.stat().st_mtime, tuple(table_placeholders), tuple(labels))
+    with _cache_lock:
+        compiled = _cache.get(key)
+        if compiled is None:
+            # Descarta versões antigas do mesmo arquivo
+            for old_key in [k for k in _cache if k[0] == key[0] and k[1] != key[1]]:
+                del _cache[old_key]
+            compiled = CompiledDocxTemplate(
+                path, table_placeholders=table_placeholders, labels=labels
+            )
+            _cache[key] = compiled
+        return compiled
+
+
+def clear_template_cache() -> None:
+    """Esvazia o cache de templates compilados."""
+    with _cache_lock:
+        _cache.clear()
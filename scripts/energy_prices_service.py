@@ -0,0 +1,429 @@
+"""Serviço de gravação e leitura de curvas de preço de energia (snapshots).
+
+Um snapshot (`energy_price_snapshots`) é único por comercializadora e data
+e agrupa as células de preço (`energy_prices`) de cada combinação
+ano × submercado × tipo de energia.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+from scripts.database import (
+    PAGE_SIZE,
+    DatabaseError,
+    create_record,
+    delete_records,
+    delete_records_in,
+    query_records,
+    read_records,
+    read_records_in,
+    update_record,
+    upsert_records,
+)
+from scripts.derived_prices import apply_derived_prices, required_energy_types
+
+
+DEBUG_PREFIX = "[EnergyPricesService]"
+
+# Precisão da coluna energy_prices.price (DECIMAL(12,4))
+PRICE_DECIMALS = 4
+
+# Chave de uma célula da grade: (ano, submercado, tipo_energia)
+PriceKey = Tuple[int, str, str]
+
+# Tentativas da exclusão das células removidas após o upsert já gravado
+DELETE_ATTEMPTS = 3
+DELETE_RETRY_DELAY = 0.5
+
+
+def _debug_print(message: str, *, data: Any | None = None) -> None:
+    print(f"{DEBUG_PREFIX} {message}")
+    if data is not None:
+        print(f"{DEBUG_PREFIX} -> {data}")
+
+
+def flatten_price_grid(
+    form_data: Dict[int, Dict[Tuple[str, str], Optional[float]]],
+) -> Dict[PriceKey, float]:
+    """Converte `{ano: {(submercado, tipo): valor}}` em `{(ano, sub, tipo): valor}`.
+
+    Células vazias (None) são descartadas.
+    """
+    grid: Dict[PriceKey, float] = {}
+    for ano, dados_ano in form_data.items():
+        for (sub, tipo), valor in dados_ano.items():
+            if valor is None:
+                continue
+            grid[(int(ano), str(sub), str(tipo))] = float(valor)
+    return grid
+
+
+def diff_price_grid(
+    stored_rows: List[Dict[str, Any]],
+    edited: Dict[PriceKey, float],
+) -> Tuple[List[Dict[str, Any]], List[Any]]:
+    """Compara as linhas gravadas com a grade editada.
+
+    Retorna `(upserts, delete_ids)`:
+    - `upserts`: células novas ou com preço alterado, já com `id` (o atual,
+      para atualização, ou um UUID novo, para inserção);
+    - `delete_ids`: ids das linhas gravadas que não existem mais na grade.
+
+    Células iguais (na precisão da coluna) não geram escrita.
+    """
+    stored_by_key: Dict[PriceKey, Dict[str, Any]] = {}
+    delete_ids: List[Any] = []
+
+    for row in stored_rows:
+        try:
+            key = (int(row["year"]), str(row["submarket"]), str(row["energy_type"]))
+        except (KeyError, TypeError, ValueError):
+            continue
+        if key in stored_by_key:
+            # Linha duplicada para a mesma célula: mantém a primeira
+            delete_ids.append(row.get("id"))
+            continue
+        stored_by_key[key] = row
+
+    upserts: List[Dict[str, Any]] = []
+    for key, price in edited.items():
+        stored = stored_by_key.get(key)
+        if stored is not None:
+            stored_price = stored.get("price")
+            if stored_price is not None and round(float(stored_price), PRICE_DECIMALS) == round(
+                price, PRICE_DECIMALS
+            ):
+                continue
+            row_id = stored.get("id")
+        else:
+            row_id = str(uuid.uuid4())
+
+        ano, sub, tipo = key
+        upserts.append(
+            {
+                "id": row_id,
+                "year": ano,
+                "submarket": sub,
+                "energy_type": tipo,
+                "price": price,
+            }
+        )
+
+    for key, row in stored_by_key.items():
+        if key not in edited:
+            delete_ids.append(row.get("id"))
+
+    delete_ids = [row_id for row_id in delete_ids if row_id is not None]
+    return upserts, delete_ids
+
+
+def save_price_snapshot(
+    trader_id: str,
+    snapshot_date: str,
+    grid: Dict[PriceKey, float],
+    *,
+    snapshot_id: Optional[str] = None,
+) -> Dict[str, int]:
+    """Grava a grade de preços de uma comercializadora em uma data.
+
+    Quando `snapshot_id` é informado, o snapshot existente é mantido e apenas
+    as células alteradas são escritas, em um único upsert em lote; as células
+    removidas da grade são excluídas em seguida. O snapshot nunca deixa de
+    existir durante a sobrescrita.
+
+    Upsert e exclusão são duas requisições (o PostgREST não as agrupa em uma
+    transação). Se o upsert falhar, nada foi alterado e o snapshot criado
+    nesta chamada é removido. Se a exclusão falhar mesmo após
+    `DELETE_ATTEMPTS` tentativas, os preços novos já estão gravados e
+    `DatabaseError` informa quantas células antigas sobraram; salvar de novo
+    a mesma grade as remove.
+
+    Retorna a contagem de células `written`, `deleted` e `unchanged`.
+    """
+    if snapshot_id is None:
+        snapshot_res = create_record(
+            "energy_price_snapshots",
+            {"trader_id": trader_id, "snapshot_date": snapshot_date},
+        )
+        if not snapshot_res:
+            raise DatabaseError("Falha ao criar snapshot.")
+        snapshot_id = snapshot_res[0]["id"]
+        created = True
+        stored_rows: List[Dict[str, Any]] = []
+        _debug_print(f"Snapshot criado: {snapshot_id}")
+    else:
+        created = False
+        stored_rows = read_records_in("energy_prices", "snapshot_id", [snapshot_id])
+
+    upserts, delete_ids = diff_price_grid(stored_rows, grid)
+    for row in upserts:
+        row["snapshot_id"] = snapshot_id
+
+    _debug_print(
+        f"Snapshot {snapshot_id}: diff calculado",
+        data={"upserts": len(upserts), "deletes": len(delete_ids)},
+    )
+
+    try:
+        upsert_records("energy_prices", upserts)
+    except DatabaseError:
+        if created:
+            # Não deixa um snapshot vazio para trás
+            delete_records("energy_price_snapshots", {"id": snapshot_id})
+        raise
+
+    try:
+        _delete_with_retry(delete_ids)
+    finally:
+        # Mesmo com a exclusão falhando, o upsert já mudou os preços
+        if upserts or delete_ids:
+            # Muda a assinatura do snapshot: caches de outros processos expiram
+            update_record(
+                "energy_price_snapshots",
+                snapshot_id,
+                {"updated_at": datetime.now(timezone.utc).isoformat()},
+            )
+        invalidate_best_price_cache(snapshot_date)
+
+    return {
+        "written": len(upserts),
+        "deleted": len(delete_ids),
+        "unchanged": len(grid) - len(upserts),
+    }
+
+
+def _delete_with_retry(delete_ids: List[str]) -> None:
+    for attempt in range(1, DELETE_ATTEMPTS + 1):
+        try:
+            delete_records_in("energy_prices", "id", delete_ids)
+            return
+        except DatabaseError as exc:
+            _debug_print(f"Exclusão de células falhou (tentativa {attempt}/{DELETE_ATTEMPTS}): {exc}")
+            if attempt == DELETE_ATTEMPTS:
+                raise DatabaseError(
+                    f"Preços gravados, mas {len(delete_ids)} célula(s) removida(s) da grade "
+                    f"continuam no banco. Salve novamente para removê-las. ({exc})"
+                ) from exc
+            time.sleep(DELETE_RETRY_DELAY * attempt)
+
+
+def load_price_frame(
+    snapshots: List[Dict[str, Any]],
+    *,
+    energy_types: Optional[Iterable[str]] = None,
+    submarkets: Optional[Iterable[str]] = None,
+    years: Optional[Iterable[int]] = None,
+    with_derived: bool = True,
+) -> pd.DataFrame:
+    """Carrega os preços dos snapshots informados em um único DataFrame.
+
+    Os preços são buscados por `snapshot_id`, com os filtros de tipo,
+    submercado e ano aplicados no servidor (leitura paginada, ver
+    `read_records_in`), e recebem as colunas `trader_id` e `snapshot_date`
+    do snapshot de origem.
+    Com `with_derived=True`, os produtos derivados ausentes (ver
+    `scripts.derived_prices`) são calculados em memória.
+    """
+    columns = [
+        "snapshot_id",
+        "trader_id",
+        "snapshot_date",
+        "year",
+        "submarket",
+        "energy_type",
+        "price",
+        "is_derived",
+    ]
+    snapshot_map = {s["id"]: s for s in snapshots if s.get("id") is not None}
+    if not snapshot_map:
+        return pd.DataFrame(columns=columns)
+
+    in_filters: Dict[str, List[Any]] = {}
+    if energy_types is not None:
+        energy_types = set(energy_types)
+        # Os derivados precisam também dos tipos de origem das regras
+        fetch_types = required_energy_types(energy_types) if with_derived else energy_types
+        in_filters["energy_type"] = sorted(fetch_types)
+    if submarkets is not None:
+        in_filters["submarket"] = sorted(set(submarkets))
+    if years is not None:
+        in_filters["year"] = sorted({int(y) for y in years})
+
+    rows = read_records_in(
+        "energy_prices",
+        "snapshot_id",
+        list(snapshot_map.keys()),
+        in_filters=in_filters,
+    )
+    frame = pd.DataFrame(rows)
+    if frame.empty:
+        return pd.DataFrame(columns=columns)
+
+    frame["year"] = frame["year"].astype(int)
+    frame["price"] = pd.to_numeric(frame["price"], errors="coerce")
+    frame["trader_id"] = frame["snapshot_id"].map(lambda sid: snapshot_map[sid].get("trader_id"))
+    frame["snapshot_date"] = frame["snapshot_id"].map(
+        lambda sid: snapshot_map[sid].get("snapshot_date")
+    )
+
+    if with_derived:
+        frame = apply_derived_prices(frame)
+    else:
+        frame = frame.assign(is_derived=False)
+
+    if energy_types is not None:
+        frame = frame[frame["energy_type"].isin(energy_types)]
+
+    return frame.reset_index(drop=True)[columns]
+
+
+# -------------------------------
+# Matriz de melhores preços
+# -------------------------------
+
+# Submercados e tipos de energia cotados pelas comercializadoras
+SUBMARKETS = ["SE/CO", "S", "NE", "N"]
+ENERGY_TYPES = ["CONV", "I5", "I1", "CQ5"]
+
+# Janela de busca retroativa (dias) pela data de snapshot mais recente
+BEST_PRICE_LOOKBACK_DAYS = 30
+
+# Validade máxima (segundos) de uma matriz em cache; cobre gravações que
+# não alteram `updated_at` dos snapshots (ex.: feitas direto no banco)
+BEST_PRICE_CACHE_TTL = 300.0
+
+# Assinatura dos snapshots de uma data: (id, updated_at) de cada um
+SnapshotSignature = Tuple[Tuple[str, str], ...]
+
+# Cache da matriz por data de snapshot (ISO): (momento, assinatura, matriz)
+_best_price_cache: Dict[str, Tuple[float, SnapshotSignature, pd.DataFrame]] = {}
+_best_price_lock = threading.Lock()
+
+
+def invalidate_best_price_cache(snapshot_date: Optional[str] = None) -> None:
+    """Descarta a matriz em cache de uma data (ou de todas, se None)."""
+    with _best_price_lock:
+        if snapshot_date is None:
+            _best_price_cache.clear()
+        else:
+            _best_price_cache.pop(str(snapshot_date), None)
+
+
+def _snapshot_signature(snapshots: List[Dict[str, Any]]) -> SnapshotSignature:
+    return tuple(sorted((str(s.get("id")), str(s.get("updated_at"))) for s in snapshots))
+
+
+def _cached_best_prices(cache_key: str, signature: SnapshotSignature) -> Optional[pd.DataFrame]:
+    with _best_price_lock:
+        entry = _best_price_cache.get(cache_key)
+        if entry is None:
+            return None
+        stored_at, stored_signature, matrix = entry
+        if stored_signature != signature or time.monotonic() - stored_at > BEST_PRICE_CACHE_TTL:
+            # Snapshot criado, regravado ou removido (por qualquer usuário), ou cache velho
+            del _best_price_cache[cache_key]
+            return None
+        return matrix
+
+
+def read_snapshots_between(
+    start_date: date,
+    end_date: date,
+    *,
+    trader_id: Optional[Any] = None,
+) -> List[Dict[str, Any]]:
+    """Snapshots com data no intervalo (de uma comercializadora, se informada).
+
+    Filtrados e paginados no servidor.
+    """
+    filters = {"trader_id": trader_id} if trader_id is not None else None
+    snapshots: List[Dict[str, Any]] = []
+    while True:
+        page, _ = query_records(
+            "energy_price_snapshots",
+            filters=filters,
+            gte={"snapshot_date": start_date.isoformat()},
+            lte={"snapshot_date": end_date.isoformat()},
+            order_by="id",
+            offset=len(snapshots),
+            limit=PAGE_SIZE,
+        )
+        snapshots.extend(page)
+        if len(page) < PAGE_SIZE:
+            return snapshots
+
+
+def compute_best_price_matrix(frame: pd.DataFrame) -> pd.DataFrame:
+    """Menor preço e comercializadora vencedora por ano × submercado × tipo.
+
+    Recebe um DataFrame no formato de `load_price_frame` e retorna as colunas
+    `year`, `submarket`, `energy_type`, `price`, `trader_id` e `is_derived`.
+    """
+    columns = ["year", "submarket", "energy_type", "price", "trader_id", "is_derived"]
+    priced = frame[frame["price"].notna()] if not frame.empty else frame
+    if priced.empty:
+        return pd.DataFrame(columns=columns)
+
+    keys = ["year", "submarket", "energy_type"]
+    best_idx = priced.groupby(keys, sort=True)["price"].idxmin()
+    return priced.loc[best_idx.to_numpy(), columns].reset_index(drop=True)
+
+
+def get_best_price_matrix(
+    *,
+    lookback_days: int = BEST_PRICE_LOOKBACK_DAYS,
+    reference_date: Optional[date] = None,
+) -> Tuple[Optional[date], pd.DataFrame]:
+    """Matriz de melhores preços da data de snapshot mais recente com preços.
+
+    Os snapshots da janela são lidos uma única vez e os preços de cada data
+    candidata em uma leitura paginada por `snapshot_id`. O resultado fica em
+    cache por data enquanto a assinatura dos snapshots daquela data (ids e
+    `updated_at`) não mudar, por no máximo `BEST_PRICE_CACHE_TTL` segundos.
+    A coluna `trader` traz o nome da comercializadora vencedora.
+    """
+    reference_date = reference_date or date.today()
+    start_date = reference_date - timedelta(days=lookback_days - 1)
+
+    snapshots_by_date: Dict[date, List[Dict[str, Any]]] = {}
+    for snapshot in read_snapshots_between(start_date, reference_date):
+        try:
+            s_date = datetime.strptime(str(snapshot["snapshot_date"])[:10], "%Y-%m-%d").date()
+        except (KeyError, ValueError):
+            continue
+        if start_date <= s_date <= reference_date:
+            snapshots_by_date.setdefault(s_date, []).append(snapshot)
+
+    trader_names: Optional[Dict[Any, str]] = None
+    for s_date in sorted(snapshots_by_date, reverse=True):
+        cache_key = s_date.isoformat()
+        signature = _snapshot_signature(snapshots_by_date[s_date])
+        cached = _cached_best_prices(cache_key, signature)
+        if cached is not None:
+            _debug_print(f"Matriz de melhores preços em cache para {cache_key}")
+            return s_date, cached
+
+        frame = load_price_frame(snapshots_by_date[s_date])
+        matrix = compute_best_price_matrix(frame)
+        if matrix.empty:
+            continue
+
+        if trader_names is None:
+            trader_names = {t["id"]: t["name"] for t in read_records("traders")}
+        matrix["trader"] = matrix["trader_id"].map(trader_names).fillna("Desconhecido")
+
+        with _best_price_lock:
+            _best_price_cache[cache_key] = (time.monotonic(), signature, matrix)
+        _debug_print(f"Matriz de melhores preços calculada para {cache_key}", data=len(matrix))
+        return s_date, matrix
+
+    return None, pd.DataFrame(
+        columns=["year", "submarket", "energy_type", "price", "trader_id", "is_derived", "trader"]
+    )
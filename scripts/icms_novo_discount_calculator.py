@@ -1,3 +1,49 @@
+from functools import lru_cache
+from typing import Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+# Alíquota de ICMS usada quando o estado não é informado (0.795 = 1 - 0.205)
+DEFAULT_ICMS_RATE = 0.205
+
+# Alíquotas modais internas de ICMS por UF. Conferir a legislação vigente
+# antes de usar um estado novo em propostas.
+ICMS_RATES_BY_STATE = {
+    "AC": 0.19,
+    "AL": 0.205,
+    "AM": 0.20,
+    "AP": 0.18,
+    "BA": 0.205,
+    "CE": 0.20,
+    "DF": 0.20,
+    "ES": 0.17,
+    "GO": 0.19,
+    "MA": 0.23,
+    "MG": 0.18,
+    "MS": 0.17,
+    "MT": 0.17,
+    "PA": 0.19,
+    "PB": 0.20,
+    "PE": 0.205,
+    "PI": 0.225,
+    "PR": 0.195,
+    "RJ": 0.22,
+    "RN": 0.20,
+    "RO": 0.195,
+    "RR": 0.20,
+    "RS": 0.17,
+    "SC": 0.17,
+    "SE": 0.20,
+    "SP": 0.18,
+    "TO": 0.20,
+}
+
+# Percentuais de desconto de ICMS exibidos nas tabelas de preço
+ICMS_DISCOUNTS = (0.10, 0.15, 0.20, 0.25)
+
+
 def calculate_icms_price(base_price: float, percentage: float) -> float:
     """
     Calcula o preço final sem ICMS dado um percentual de ICMS.
@@ -22,3 +68,96 @@ def calculate_icms_price_star(base_price: float, percentage: float) -> float:
     desc_icms = percentage * icms
     valor_final_sem_icms = base_price - desc_icms
     return valor_final_sem_icms
+
+
+# -------------------------------
+# Versões vetorizadas
+# -------------------------------
+
+def get_icms_rate(state: Optional[str] = None) -> float:
+    """Retorna a alíquota de ICMS da UF, ou a padrão se não houver."""
+    if not state:
+        return DEFAULT_ICMS_RATE
+    return ICMS_RATES_BY_STATE.get(str(state).upper(), DEFAULT_ICMS_RATE)
+
+
+@lru_cache(maxsize=64)
+def _factor_vectors(rate: float, percentages: Tuple[float, ...]) -> Tuple[np.ndarray, np.ndarray]:
+    pcts = np.asarray(percentages, dtype=float)
+    # As duas lógicas escalares se reduzem a um fator multiplicativo sobre o preço base:
+    #   calculate_icms_price:      base * (1 - p * r)
+    #   calculate_icms_price_star: base * (1 - p * r / (1 - r))
+    factors = 1.0 - pcts * rate
+    factors_star = 1.0 - pcts * rate / (1.0 - rate)
+    factors.setflags(write=False)
+    factors_star.setflags(write=False)
+    return factors, factors_star
+
+
+def icms_factor_vectors(
+    percentages: Sequence[float] = ICMS_DISCOUNTS,
+    *,
+    rate: float = DEFAULT_ICMS_RATE,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Fatores (normal, *) por percentual de desconto, pré-calculados por alíquota."""
+    return _factor_vectors(float(rate), tuple(float(p) for p in percentages))
+
+
+def calculate_icms_prices(
+    base_prices: Iterable[float],
+    percentages: Sequence[float] = ICMS_DISCOUNTS,
+    *,
+    rate: float = DEFAULT_ICMS_RATE,
+    star: bool = False,
+) -> np.ndarray:
+    """Versão vetorizada de `calculate_icms_price` / `calculate_icms_price_star`.
+
+    Retorna um array com formato `base_prices.shape + (len(percentages),)`.
+    """
+    prices = np.asarray(base_prices, dtype=float)
+    factors, factors_star = icms_factor_vectors(percentages, rate=rate)
+    return prices[..., np.newaxis] * (factors_star if star else factors)
+
+
+def icms_column_name(percentage: float, *, star: bool = False) -> str:
+    """Nome da coluna gerada por `apply_icms_discounts` (ex.: icms_10, icms_10_star)."""
+    name = f"icms_{round(percentage * 100):d}"
+    return f"{name}_star" if star else name
+
+
+def apply_icms_discounts(
+    prices: pd.DataFrame,
+    percentages: Sequence[float] = ICMS_DISCOUNTS,
+    *,
+    state: Optional[str] = None,
+    price_column: str = "price",
+) -> pd.DataFrame:
+    """Aplica todos os descontos de ICMS a uma grade de preços de uma só vez.
+
+    `prices` pode ter qualquer combinação de anos, submercados e tipos de
+    energia. Se houver uma coluna `state`, a alíquota é resolvida por linha;
+    caso contrário usa-se a de `state` (ou a padrão).
+
+    Acrescenta uma coluna por percentual para cada lógica
+    (`icms_10`, `icms_10_star`, ...). Preços nulos resultam em NaN.
+    """
+    result = prices.copy()
+    base = pd.to_numeric(result[price_column], errors="coerce").to_numpy(dtype=float)
+    pcts = np.asarray(tuple(percentages), dtype=float)
+
+    if "state" in result.columns:
+        rates = result["state"].map(get_icms_rate).to_numpy(dtype=float)
+        factors = 1.0 - rates[:, np.newaxis] * pcts
+        factors_star = 1.0 - rates[:, np.newaxis] * pcts / (1.0 - rates[:, np.newaxis])
+    else:
+        factors, factors_star = icms_factor_vectors(percentages, rate=get_icms_rate(state))
+
+    values = base[:, np.newaxis] * factors
+    values_star = base[:, np.newaxis] * factors_star
+
+    for idx, pct in enumerate(pcts):
+        result[icms_column_name(pct)] = values[:, idx]
+    for idx, pct in enumerate(pcts):
+        result[icms_column_name(pct, star=True)] = values_star[:, idx]
+
+    return result
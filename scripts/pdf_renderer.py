@@ -0,0 +1,532 @@
+"""Renderização nativa de PDF (fpdf2) para documentos DOCX preenchidos.
+
+Percorre o corpo do documento já preenchido em memória (parágrafos, runs,
+tabelas dinâmicas, linhas horizontais e o logo do cabeçalho) e desenha o
+PDF diretamente, sem Word/COM. É uma aproximação do layout do Word para os
+templates simples do projeto (propostas e contratos), suficiente para
+gerar PDFs em lote em qualquer sistema operacional.
+
+Requer o pacote `fpdf2` (opcional: só é importado quando usado).
+"""
+
+import io
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from docx.oxml.ns import qn
+from docx.table import Table, _Cell
+from docx.text.paragraph import Paragraph
+
+
+DEBUG_PREFIX = "[PdfRenderer]"
+
+EMU_PER_MM = 36000
+PT_TO_MM = 25.4 / 72
+
+# Tamanho de fonte (pt) quando nem o run nem o estilo definem
+DEFAULT_FONT_SIZE = 10.0
+# Espaçamento de linha "simples" do Word
+LINE_HEIGHT = 1.15
+# Recuo dos itens de lista (List Paragraph)
+LIST_INDENT_MM = 12.7
+# Menor fonte (pt) usada para caber texto em células estreitas
+MIN_CELL_FONT_SIZE = 4.0
+
+# Fontes TrueType procuradas (regular, negrito), na ordem
+TTF_CANDIDATES = [
+    ("C:/Windows/Fonts/tahoma.ttf", "C:/Windows/Fonts/tahomabd.ttf"),
+    ("C:/Windows/Fonts/arial.ttf", "C:/Windows/Fonts/arialbd.ttf"),
+    (
+        "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+        "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf",
+    ),
+]
+
+# Substituições para as fontes padrão do PDF (somente latin-1)
+_LATIN1_REPLACEMENTS = {
+    "\u2022": "-",
+    "\u2013": "-",
+    "\u2014": "-",
+    "\u201c": '"',
+    "\u201d": '"',
+    "\u2018": "'",
+    "\u2019": "'",
+    "\u2026": "...",
+    "\u00a0": " ",
+}
+
+_ALIGN = {0: "L", 1: "C", 2: "R", 3: "J"}
+
+
+def _import_fpdf():
+    try:
+        from fpdf import FPDF
+    except ImportError as exc:  # pragma: no cover - dependência opcional
+        raise RuntimeError(
+            "Geração nativa de PDF requer o pacote 'fpdf2' (pip install fpdf2)."
+        ) from exc
+    return FPDF
+
+
+def _find_ttf() -> Optional[Tuple[str, str]]:
+    for regular, bold in TTF_CANDIDATES:
+        if os.path.exists(regular) and os.path.exists(bold):
+            return regular, bold
+    return None
+
+
+def _emu(value: Any) -> float:
+    try:
+        return int(value) / EMU_PER_MM
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _style_chain(style):
+    while style is not None:
+        yield style
+        style = style.base_style
+
+
+def _paragraph_font_size(paragraph: Paragraph) -> float:
+    for run in paragraph.runs:
+        if run.font.size:
+            return run.font.size.pt
+    for style in _style_chain(paragraph.style):
+        if style.font.size:
+            return style.font.size.pt
+    return DEFAULT_FONT_SIZE
+
+
+def _run_is_bold(run, paragraph: Paragraph) -> bool:
+    if run.bold is not None:
+        return bool(run.bold)
+    for style in _style_chain(paragraph.style):
+        if style.font.bold is not None:
+            return bool(style.font.bold)
+    return False
+
+
+def _paragraph_alignment(paragraph: Paragraph) -> str:
+    alignment = paragraph.alignment
+    if alignment is None:
+        for style in _style_chain(paragraph.style):
+            if style.paragraph_format.alignment is not None:
+                alignment = style.paragraph_format.alignment
+                break
+    return _ALIGN.get(int(alignment) if alignment is not None else 0, "L")
+
+
+def _cell_alignment(paragraph: Optional[Paragraph]) -> str:
+    if paragraph is None:
+        return "C"
+    align = _paragraph_alignment(paragraph)
+    return "L" if align == "J" else align
+
+
+def _grid_widths(table: Table, content_width: float) -> List[float]:
+    """Larguras das colunas do grid da tabela em mm, limitadas à área útil."""
+    widths = []
+    grid = table._tbl.tblGrid
+    if grid is not None:
+        for col in grid.gridCol_lst:
+            # w:gridCol/@w é em vigésimos de ponto
+            widths.append((col.w.pt if col.w is not None else 0.0) * PT_TO_MM)
+    ncols = max((len(tr.tc_lst) for tr in table._tbl.tr_lst), default=1)
+    if not widths or not all(widths):
+        return [content_width / max(ncols, len(widths), 1)] * max(ncols, len(widths), 1)
+    total = sum(widths)
+    if total > content_width:
+        widths = [w * content_width / total for w in widths]
+    return widths
+
+
+def _paragraph_spacing(paragraph: Paragraph) -> Tuple[float, float]:
+    before = after = None
+    for fmt in [paragraph.paragraph_format] + [
+        s.paragraph_format for s in _style_chain(paragraph.style)
+    ]:
+        if before is None and fmt.space_before is not None:
+            before = fmt.space_before.mm
+        if after is None and fmt.space_after is not None:
+            after = fmt.space_after.mm
+    return before or 0.0, after or 0.0
+
+
+def _is_list_item(paragraph: Paragraph) -> bool:
+    ppr = paragraph._p.pPr
+    return ppr is not None and ppr.find(qn("w:numPr")) is not None
+
+
+def _horizontal_rules(paragraph: Paragraph) -> List[Dict[str, float]]:
+    """Desenhos ancorados muito baixos (linhas separadoras) do parágrafo."""
+    rules = []
+    for anchor in paragraph._p.iter(qn("wp:anchor")):
+        extent = anchor.find(qn("wp:extent"))
+        if extent is None:
+            continue
+        width, height = _emu(extent.get("cx")), _emu(extent.get("cy"))
+        if height > 1.0:
+            continue
+        pos_h = anchor.find(qn("wp:positionH"))
+        pos_v = anchor.find(qn("wp:positionV"))
+        x = _emu(pos_h.findtext(qn("wp:posOffset"))) if pos_h is not None else 0.0
+        y = _emu(pos_v.findtext(qn("wp:posOffset"))) if pos_v is not None else 0.0
+        relative = pos_h.get("relativeFrom") if pos_h is not None else "page"
+        rules.append({"x": x, "y": y, "width": width, "relative": relative})
+    return rules
+
+
+def _header_images(section) -> List[Dict[str, Any]]:
+    """Imagens do cabeçalho padrão da seção (blob, largura/altura em mm, posição)."""
+    header = section.header
+    images = []
+    for drawing in header._element.iter(qn("wp:anchor"), qn("wp:inline")):
+        blip = next(drawing.iter(qn("a:blip")), None)
+        extent = drawing.find(qn("wp:extent"))
+        if blip is None or extent is None:
+            continue
+        rel_id = blip.get(qn("r:embed"))
+        if rel_id not in header.part.rels:
+            continue
+        pos_h = drawing.find(qn("wp:positionH"))
+        pos_v = drawing.find(qn("wp:positionV"))
+        images.append(
+            {
+                "blob": header.part.rels[rel_id].target_part.blob,
+                "width": _emu(extent.get("cx")),
+                "height": _emu(extent.get("cy")),
+                "center": pos_h is not None and pos_h.findtext(qn("wp:align")) == "center",
+                "x": _emu(pos_h.findtext(qn("wp:posOffset"))) if pos_h is not None else 0.0,
+                "y": _emu(pos_v.findtext(qn("wp:posOffset"))) if pos_v is not None else 0.0,
+            }
+        )
+    return images
+
+
+def _cell_fill(cell) -> Optional[Tuple[int, int, int]]:
+    tc_pr = cell._tc.tcPr
+    if tc_pr is None:
+        return None
+    shd = tc_pr.find(qn("w:shd"))
+    fill = shd.get(qn("w:fill")) if shd is not None else None
+    if not fill or fill == "auto" or len(fill) != 6:
+        return None
+    return tuple(int(fill[i:i + 2], 16) for i in (0, 2, 4))
+
+
+class _DocumentPdf:
+    def __init__(self, document):
+        FPDF = _import_fpdf()
+        section = document.sections[0]
+        self.document = document
+        self.header_images = _header_images(section)
+        self.header_distance = section.header_distance.mm if section.header_distance else 12.5
+
+        renderer = self
+
+        class _Pdf(FPDF):
+            def header(self):
+                renderer._draw_header()
+
+        self.pdf = _Pdf(
+            unit="mm",
+            format=(section.page_width.mm, section.page_height.mm),
+        )
+        self.pdf.set_margins(
+            section.left_margin.mm, section.top_margin.mm, section.right_margin.mm
+        )
+        self.pdf.set_auto_page_break(True, margin=section.bottom_margin.mm)
+
+        ttf = _find_ttf()
+        if ttf:
+            self.pdf.add_font("Doc", "", ttf[0])
+            self.pdf.add_font("Doc", "B", ttf[1])
+            self.font_family = "Doc"
+            self.unicode = True
+        else:
+            self.font_family = "Helvetica"
+            self.unicode = False
+        self.pdf.set_font(self.font_family, size=DEFAULT_FONT_SIZE)
+
+    # -- helpers -------------------------------------------------------
+    def _text(self, text: str) -> str:
+        text = text.replace("\t", "    ")
+        if self.unicode:
+            return text
+        for src, dst in _LATIN1_REPLACEMENTS.items():
+            text = text.replace(src, dst)
+        return text.encode("latin-1", "replace").decode("latin-1")
+
+    def _fit_font_size(self, text: str, width: float, size: float, bold: bool) -> float:
+        """Reduz a fonte até a palavra mais longa caber na largura (mm)."""
+        pdf = self.pdf
+        usable = width - 2 * pdf.c_margin
+        words = text.split() or [""]
+        while size > MIN_CELL_FONT_SIZE:
+            pdf.set_font(self.font_family, style="B" if bold else "", size=size)
+            if max(pdf.get_string_width(word) for word in words) <= usable:
+                break
+            size -= 0.5
+        return max(size, MIN_CELL_FONT_SIZE)
+
+    def _draw_header(self) -> None:
+        pdf = self.pdf
+        content_width = pdf.w - pdf.l_margin - pdf.r_margin
+        for image in self.header_images:
+            x = pdf.l_margin + (content_width - image["width"]) / 2 if image["center"] else image["x"]
+            y = max(self.header_distance + image["y"], 0)
+            pdf.image(io.BytesIO(image["blob"]), x=x, y=y, w=image["width"], h=image["height"])
+        pdf.set_y(pdf.t_margin)
+
+    # -- blocos --------------------------------------------------------
+    def paragraph(self, paragraph: Paragraph) -> None:
+        pdf = self.pdf
+        size = _paragraph_font_size(paragraph)
+        before, after = _paragraph_spacing(paragraph)
+        runs = [(run.text, _run_is_bold(run, paragraph), run.font.size) for run in paragraph.runs]
+        y_start = pdf.get_y()
+
+        if not "".join(text for text, _, _ in runs).strip():
+            pdf.ln(before + size * LINE_HEIGHT * PT_TO_MM + after)
+        else:
+            is_list = _is_list_item(paragraph)
+            with pdf.text_columns(skip_leading_spaces=True) as columns:
+                with columns.paragraph(
+                    text_align=_paragraph_alignment(paragraph),
+                    line_height=LINE_HEIGHT,
+                    top_margin=before,
+                    bottom_margin=after,
+                    indent=LIST_INDENT_MM if is_list else 0,
+                    bullet_string=self._text("\u2022") if is_list else "",
+                ) as par:
+                    for text, bold, run_size in runs:
+                        if not text:
+                            continue
+                        pdf.set_font(
+                            self.font_family,
+                            style="B" if bold else "",
+                            size=run_size.pt if run_size else size,
+                        )
+                        par.write(self._text(text))
+            pdf.set_font(self.font_family, style="", size=DEFAULT_FONT_SIZE)
+
+        for rule in _horizontal_rules(paragraph):
+            x = rule["x"] if rule["relative"] == "page" else pdf.l_margin + rule["x"]
+            # O espaçamento aqui difere do Word; a linha não pode invadir o próximo bloco
+            y = min(y_start + rule["y"], pdf.get_y())
+            pdf.set_draw_color(0, 0, 0)
+            pdf.set_line_width(0.3)
+            pdf.line(x, y, x + rule["width"], y)
+
+    def table(self, table: Table) -> None:
+        pdf = self.pdf
+        rows = table.rows
+        if not rows:
+            return
+        ncols = max(len(row.cells) for row in rows)
+        content_width = pdf.w - pdf.l_margin - pdf.r_margin
+        col_width = min(content_width / ncols, 30.0)
+        if not self._is_compact(table, col_width):
+            self.layout_table(table, content_width)
+            return
+        x_start = pdf.l_margin + (content_width - col_width * ncols) / 2
+        row_height = DEFAULT_FONT_SIZE * LINE_HEIGHT * PT_TO_MM + 2
+
+        if pdf.get_y() + row_height * len(rows) > pdf.page_break_trigger:
+            pdf.add_page()
+
+        pdf.set_draw_color(0, 0, 0)
+        pdf.set_line_width(0.2)
+        for row in rows:
+            pdf.set_x(x_start)
+            for cell in row.cells:
+                paragraph = cell.paragraphs[0] if cell.paragraphs else None
+                bold = bool(paragraph and paragraph.runs and _run_is_bold(paragraph.runs[0], paragraph))
+                fill = _cell_fill(cell)
+                if fill:
+                    pdf.set_fill_color(*fill)
+                pdf.set_font(self.font_family, style="B" if bold else "", size=DEFAULT_FONT_SIZE)
+                pdf.cell(
+                    col_width,
+                    row_height,
+                    self._text(cell.text),
+                    border=1,
+                    # cell() é de uma linha só: texto justificado vira alinhado à esquerda
+                    align=_cell_alignment(paragraph),
+                    fill=bool(fill),
+                )
+            pdf.ln(row_height)
+        pdf.set_font(self.font_family, style="", size=DEFAULT_FONT_SIZE)
+
+    def _is_compact(self, table: Table, col_width: float) -> bool:
+        """Tabela simples (curvas anuais): sem mesclas e texto de uma linha por célula."""
+        pdf = self.pdf
+        pdf.set_font(self.font_family, style="B", size=DEFAULT_FONT_SIZE)
+        for tr in table._tbl.tr_lst:
+            for tc in tr.tc_lst:
+                if tc.grid_span > 1 or len(tc.p_lst) > 1:
+                    return False
+        for row in table.rows:
+            for cell in row.cells:
+                if pdf.get_string_width(self._text(cell.text)) > col_width - 2:
+                    return False
+        return True
+
+    def layout_table(self, table: Table, content_width: float) -> None:
+        """Tabela de layout (ex.: quadro resumo do contrato).
+
+        Larguras vêm do grid do DOCX (reduzidas para caber na página),
+        células mescladas na horizontal ocupam as colunas do `gridSpan`, o
+        texto quebra em várias linhas e tabelas aninhadas (curvas inseridas
+        em células) são desenhadas dentro da célula.
+        """
+        pdf = self.pdf
+        widths = _grid_widths(table, content_width)
+        padding = 0.5
+        pdf.set_draw_color(0, 0, 0)
+        pdf.set_line_width(0.2)
+        # Margem interna do fpdf menor: colunas estreitas (curvas longas)
+        c_margin, pdf.c_margin = pdf.c_margin, min(pdf.c_margin, 0.3)
+
+        rows = []
+        for tr in table._tbl.tr_lst:
+            cells = []
+            col = 0
+            for tc in tr.tc_lst:
+                span = tc.grid_span
+                width = sum(widths[col:col + span]) or widths[-1]
+                col += span
+                cell = _Cell(tc, table)
+                # Continuação de mescla vertical: a célula de cima já tem o texto
+                merged = tc.vMerge is not None and tc.vMerge != "restart"
+                blocks = [] if merged else self._cell_blocks(cell, width - 2 * padding)
+                height = sum(block[-1] for block in blocks)
+                cells.append((cell, width, blocks, height))
+            rows.append((cells, max(height for _, _, _, height in cells) + 2 * padding))
+
+        # Tabela que cabe em uma página não é partida entre páginas
+        total_height = sum(row_height for _, row_height in rows)
+        page_height = pdf.page_break_trigger - pdf.t_margin
+        if total_height <= page_height and pdf.get_y() + total_height > pdf.page_break_trigger:
+            pdf.add_page()
+
+        for cells, row_height in rows:
+            if pdf.get_y() + row_height > pdf.page_break_trigger:
+                pdf.add_page()
+
+            x = pdf.l_margin + (content_width - sum(widths)) / 2
+            y = pdf.get_y()
+            for cell, width, blocks, _ in cells:
+                fill = _cell_fill(cell)
+                if fill:
+                    pdf.set_fill_color(*fill)
+                pdf.rect(x, y, width, row_height, style="DF" if fill else "D")
+                block_y = y + padding
+                for block in blocks:
+                    if block[0] == "text":
+                        _, text, paragraph, size, bold, line_h, height = block
+                        pdf.set_font(self.font_family, style="B" if bold else "", size=size)
+                        pdf.set_xy(x + padding, block_y)
+                        pdf.multi_cell(
+                            width - 2 * padding,
+                            line_h,
+                            text,
+                            align=_paragraph_alignment(paragraph),
+                        )
+                    else:
+                        _, nested, height = block
+                        self._nested_table(nested, x + padding, block_y, width - 2 * padding)
+                    block_y += height
+                x += width
+            pdf.set_xy(pdf.l_margin, y + row_height)
+        pdf.c_margin = c_margin
+        pdf.set_font(self.font_family, style="", size=DEFAULT_FONT_SIZE)
+
+    def _cell_blocks(self, cell: _Cell, width: float) -> List[Tuple]:
+        """Blocos da célula na ordem do DOCX, cada um com a altura (mm) no fim.
+
+        Parágrafos seguidos viram um bloco de texto; tabelas aninhadas, um
+        bloco de tabela.
+        """
+        pdf = self.pdf
+        blocks: List[Tuple] = []
+        paragraphs: List[Paragraph] = []
+
+        def flush() -> None:
+            if not paragraphs:
+                return
+            first = paragraphs[0]
+            size = _paragraph_font_size(first)
+            bold = bool(first.runs and _run_is_bold(first.runs[0], first))
+            text = "\n".join(self._text(p.text) for p in paragraphs)
+            paragraphs.clear()
+            if not text.strip():
+                return
+            size = self._fit_font_size(text, width, size, bold)
+            line_h = size * LINE_HEIGHT * PT_TO_MM
+            pdf.set_font(self.font_family, style="B" if bold else "", size=size)
+            lines = pdf.multi_cell(width, line_h, text, dry_run=True, output="LINES")
+            blocks.append(("text", text, first, size, bold, line_h, len(lines) * line_h))
+
+        for child in cell._tc.iterchildren():
+            if child.tag == qn("w:p"):
+                paragraphs.append(Paragraph(child, cell))
+            elif child.tag == qn("w:tbl"):
+                flush()
+                nested = Table(child, cell)
+                blocks.append(("table", nested, len(nested.rows) * self._nested_row_height()))
+        flush()
+        return blocks
+
+    def _nested_row_height(self) -> float:
+        return DEFAULT_FONT_SIZE * LINE_HEIGHT * PT_TO_MM + 1
+
+    def _nested_table(self, table: Table, x: float, y: float, width: float) -> None:
+        """Tabela simples dentro de uma célula, colunas iguais e centralizada."""
+        pdf = self.pdf
+        rows = table.rows
+        if not rows:
+            return
+        ncols = max(len(row.cells) for row in rows)
+        col_width = min(width / ncols, 30.0)
+        row_height = self._nested_row_height()
+        x_start = x + (width - col_width * ncols) / 2
+        for row_index, row in enumerate(rows):
+            pdf.set_xy(x_start, y + row_index * row_height)
+            for cell in row.cells:
+                paragraph = cell.paragraphs[0] if cell.paragraphs else None
+                bold = bool(paragraph and paragraph.runs and _run_is_bold(paragraph.runs[0], paragraph))
+                fill = _cell_fill(cell)
+                if fill:
+                    pdf.set_fill_color(*fill)
+                text = self._text(cell.text)
+                size = self._fit_font_size(text, col_width, DEFAULT_FONT_SIZE, bold)
+                pdf.set_font(self.font_family, style="B" if bold else "", size=size)
+                pdf.cell(
+                    col_width,
+                    row_height,
+                    text,
+                    border=1,
+                    align=_cell_alignment(paragraph),
+                    fill=bool(fill),
+                )
+
+    def render(self) -> "_DocumentPdf":
+        self.pdf.add_page()
+        body = self.document.element.body
+        for child in body.iterchildren():
+            if child.tag == qn("w:p"):
+                self.paragraph(Paragraph(child, self.document._body))
+            elif child.tag == qn("w:tbl"):
+                self.table(Table(child, self.document._body))
+        return self
+
+
+def render_document_pdf(document, pdf_path) -> Path:
+    """Desenha `document` (python-docx, já preenchido) em `pdf_path`."""
+    pdf_path = Path(pdf_path)
+    _DocumentPdf(document).render().pdf.output(str(pdf_path))
+    print(f"{DEBUG_PREFIX} PDF gerado: {pdf_path}")
+    return pdf_path
@@ -0,0 +1,231 @@
+"""Pré-carregamento, em tempo ocioso, dos dados das próximas telas.
+
+Depois que uma tela assenta (nenhuma navegação por `IDLE_DELAY` segundos),
+o agendador busca em segundo plano os dados das telas vizinhas e os guarda
+em um pequeno armazenamento em memória. Quando o usuário abre uma delas,
+`prefetched(chave, busca)` entrega o dado já baixado (ou espera a busca em
+andamento) em vez de consultar o banco de novo.
+
+A prioridade é baixa: nada roda antes do tempo ocioso, no máximo
+`PREFETCH_WORKERS` buscas correm ao mesmo tempo, e uma nova navegação
+descarta o que ainda estava na fila. Os dados expiram em `PREFETCH_TTL`
+segundos e são entregues uma única vez.
+"""
+
+from __future__ import annotations
+
+import importlib
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+
+DEBUG_PREFIX = "[Prefetch]"
+
+# Segundos sem navegação antes de começar a pré-carregar
+IDLE_DELAY = 1.5
+# Buscas simultâneas (não disputa conexões com a tela visível)
+PREFETCH_WORKERS = 2
+# Validade de um dado pré-carregado (segundos)
+PREFETCH_TTL = 120.0
+# Quantidade máxima de entradas guardadas
+MAX_ENTRIES = 8
+
+# Buscas conhecidas: chave -> "módulo:função" (importada na primeira busca)
+PREFETCHERS: Dict[str, str] = {
+    "contract_clients": "scripts.comercializacao_service:list_contract_clients",
+    "contracts": "scripts.comercializacao_service:list_contracts_for_table",
+    "traders": "scripts.comercializacao_service:list_traders",
+    "best_prices": "scripts.energy_prices_service:get_best_price_matrix",
+    "proposals_first_page": "scripts.proposals_repository:fetch_first_page",
+}
+
+Fetcher = Union[str, Callable[[], Any]]
+
+
+def _debug_print(message: str, *, data: Any | None = None) -> None:
+    print(f"{DEBUG_PREFIX} {message}")
+    if data is not None:
+        print(f"{DEBUG_PREFIX} -> {data}")
+
+
+def _resolve(fetcher: Fetcher) -> Callable[[], Any]:
+    if not isinstance(fetcher, str):
+        return fetcher
+    module_name, _, attr = fetcher.partition(":")
+    return getattr(importlib.import_module(module_name), attr)
+
+
+class PrefetchStore:
+    """Dados pré-carregados com validade e limite de entradas."""
+
+    def __init__(self, *, ttl: float = PREFETCH_TTL, max_entries: int = MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def has(self, key: str) -> bool:
+        with self._lock:
+            return self._fresh(key) is not None
+
+    def take(self, key: str) -> Optional[Tuple[Any]]:
+        """Remove e devolve `(valor,)` se houver dado válido; senão None."""
+        with self._lock:
+            entry = self._fresh(key)
+            if entry is None:
+                return None
+            del self._entries[key]
+            return (entry[1],)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _fresh(self, key: str) -> Optional[Tuple[float, Any]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() - entry[0] > self.ttl:
+            del self._entries[key]
+            return None
+        return entry
+
+
+class PrefetchScheduler:
+    """Agenda as buscas para o tempo ocioso, com concorrência limitada."""
+
+    def __init__(
+        self,
+        *,
+        store: Optional[PrefetchStore] = None,
+        fetchers: Optional[Dict[str, Fetcher]] = None,
+        idle_delay: float = IDLE_DELAY,
+        max_workers: int = PREFETCH_WORKERS,
+    ):
+        self.store = store or PrefetchStore()
+        self.idle_delay = idle_delay
+        self._fetchers: Dict[str, Fetcher] = dict(PREFETCHERS if fetchers is None else fetchers)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, max_workers), thread_name_prefix="prefetch"
+        )
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        self._pending: List[str] = []
+        self._in_flight: Dict[str, Future] = {}
+        # Navegação: buscas agendadas em uma geração anterior não começam
+        self._generation = 0
+        # Invalidação: resultados de buscas iniciadas antes dela são descartados
+        self._epoch = 0
+
+    def register(self, key: str, fetcher: Fetcher) -> None:
+        """Registra (ou substitui) a busca associada a uma chave."""
+        with self._lock:
+            self._fetchers[key] = fetcher
+
+    def schedule(self, keys: Iterable[str]) -> None:
+        """Substitui a fila pelas chaves informadas e reinicia a espera ociosa."""
+        with self._lock:
+            self._generation += 1
+            self._pending = [key for key in dict.fromkeys(keys) if key in self._fetchers]
+            self._restart_timer()
+
+    def cancel(self) -> None:
+        """Descarta as buscas que ainda não começaram (ex.: nova navegação)."""
+        with self._lock:
+            self._generation += 1
+            self._pending = []
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+    def invalidate(self) -> None:
+        """Descarta os dados guardados e os de buscas já em andamento."""
+        with self._lock:
+            self._epoch += 1
+            self._generation += 1
+            self._pending = []
+        self.store.clear()
+
+    def consume(self, key: str, fetch: Callable[[], Any]) -> Any:
+        """Dado pré-carregado da chave; sem ele, espera a busca em curso ou chama `fetch`."""
+        taken = self.store.take(key)
+        if taken is not None:
+            _debug_print(f"Usando dado pré-carregado: {key}")
+            return taken[0]
+
+        with self._lock:
+            future = self._in_flight.get(key)
+        if future is not None:
+            try:
+                future.result()
+            except Exception:
+                pass
+            taken = self.store.take(key)
+            if taken is not None:
+                _debug_print(f"Usando dado pré-carregado (aguardado): {key}")
+                return taken[0]
+        return fetch()
+
+    # -- execução ----------------------------------------------------------
+    def _restart_timer(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = threading.Timer(self.idle_delay, self._start_pending)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _start_pending(self) -> None:
+        with self._lock:
+            self._timer = None
+            generation, epoch = self._generation, self._epoch
+            keys, self._pending = self._pending, []
+            for key in keys:
+                if key in self._in_flight or self.store.has(key):
+                    continue
+                self._in_flight[key] = self._executor.submit(
+                    self._fetch, key, self._fetchers[key], generation, epoch
+                )
+        if keys:
+            _debug_print("Pré-carregando em tempo ocioso", data=keys)
+
+    def _fetch(self, key: str, fetcher: Fetcher, generation: int, epoch: int) -> None:
+        try:
+            if generation != self._generation:
+                # O usuário navegou enquanto a busca esperava na fila
+                return
+            value = _resolve(fetcher)()
+            if epoch == self._epoch:
+                self.store.put(key, value)
+        except Exception as exc:
+            _debug_print(f"Falha ao pré-carregar {key}: {exc}")
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+
+_scheduler: Optional[PrefetchScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_prefetch_scheduler() -> PrefetchScheduler:
+    """Agendador compartilhado pela aplicação (criado no primeiro uso)."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = PrefetchScheduler()
+        return _scheduler
+
+
+def prefetched(key: str, fetch: Callable[[], Any]) -> Any:
+    """Atalho para `get_prefetch_scheduler().consume(key, fetch)`."""
+    return get_prefetch_scheduler().consume(key, fetch)
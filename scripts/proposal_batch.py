@@ -0,0 +1,313 @@
+"""Geração de propostas em lote.
+
+As propostas e suas sazonalidades são buscadas com dois filtros IN e os
+documentos são renderizados em paralelo em um pool de processos. Com o
+backend de PDF nativo, o PDF também é gerado no processo filho; com o
+backend Word (COM, que não paraleliza) a conversão é feita em sequência
+no processo principal. O progresso de cada item é informado por callback.
+Propostas cuja entrada não mudou desde a última geração são servidas do
+cache da pasta de saída (`scripts.document_cache`) sem renderizar de novo.
+
+Uso sem interface:
+
+    python -m scripts.proposal_batch --output-dir "C:/Propostas" --status PENDING
+    python -m scripts.proposal_batch --output-dir ./saida --ids <id1> <id2> --no-pdf
+    python -m scripts.proposal_batch --output-dir ./saida --pdf-backend native
+    python -m scripts.proposal_batch --output-dir ./saida --force
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from scripts.database import read_records, read_records_in
+from scripts.document_cache import DocumentCacheIndex, document_owner, get_cache_index
+from scripts.document_engine import (
+    convert_docx_to_pdf,
+    format_cnpj,
+    format_date,
+    pdf_format,
+    resolve_pdf_backend,
+)
+from scripts.proposal_generator import (
+    NOME_ARQUIVO_PROPOSTA,
+    proposal_cache_key,
+    render_proposal_job,
+)
+
+
+DEBUG_PREFIX = "[ProposalBatch]"
+
+# Limite de processos do pool (a renderização é CPU-bound)
+MAX_WORKERS = max(1, min(8, (os.cpu_count() or 2) - 1))
+
+# callback(concluídos, total, resultado_do_item)
+ProgressCallback = Callable[[int, int, Dict[str, Any]], None]
+
+
+def _debug_print(message: str, *, data: Any | None = None) -> None:
+    print(f"{DEBUG_PREFIX} {message}")
+    if data is not None:
+        print(f"{DEBUG_PREFIX} -> {data}")
+
+
+def build_proposal_params(
+    proposal: Dict[str, Any],
+    seasonalities: List[Dict[str, Any]],
+    *,
+    data_hoje: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Monta os argumentos de `generate_proposal` a partir dos registros.
+
+    Levanta ValueError se a proposta não tiver sazonalidades.
+    """
+    seasonalities = sorted(seasonalities, key=lambda x: x.get("year") or 0)
+    if not seasonalities:
+        raise ValueError("Não há dados de sazonalidade para esta proposta.")
+
+    first_sazo = seasonalities[0]
+    flex_val = first_sazo.get("flex")
+    sazo_val = first_sazo.get("seasonality")
+    validade = proposal.get("proposal_validity") or "-"
+
+    return {
+        "data_hoje": data_hoje or datetime.now().strftime("%d/%m/%Y"),
+        "razao_social": proposal.get("customer_name") or "",
+        "cnpj": format_cnpj(proposal.get("customer_cnpj")),
+        "submercado": proposal.get("submarket") or "",
+        "inicio": format_date(proposal.get("supply_start")),
+        "fim": format_date(proposal.get("supply_end")),
+        "curva_vol": [s.get("average_volume") or 0.0 for s in seasonalities],
+        "curva_precos": [s.get("price") or 0.0 for s in seasonalities],
+        "anos": [s.get("year") for s in seasonalities],
+        "tipo_energia": proposal.get("energy_type") or "",
+        "flex": str(flex_val) if flex_val is not None else "",
+        "sazo": str(sazo_val) if sazo_val is not None else "",
+        "modulacao": proposal.get("modulation") or "",
+        "pagamento": str(proposal.get("billing_due_day") or ""),
+        "qty_meses": str(proposal.get("guarantee_months") or ""),
+        "tipo_proposta": f"Indicativa - Validade até {validade}",
+    }
+
+
+def fetch_proposals_with_seasonalities(
+    proposal_ids: Iterable[Any],
+) -> List[tuple[Dict[str, Any], List[Dict[str, Any]]]]:
+    """Busca propostas e sazonalidades com um filtro IN para cada tabela."""
+    ids = [pid for pid in dict.fromkeys(proposal_ids) if pid]
+    if not ids:
+        return []
+
+    proposals = read_records_in("proposals", "id", ids)
+    seasonalities = read_records_in("proposal_seasonalities", "proposal_id", ids)
+
+    by_proposal: Dict[Any, List[Dict[str, Any]]] = {}
+    for row in seasonalities:
+        by_proposal.setdefault(row.get("proposal_id"), []).append(row)
+
+    order = {pid: idx for idx, pid in enumerate(ids)}
+    proposals.sort(key=lambda p: order.get(p.get("id"), len(order)))
+    return [(p, by_proposal.get(p.get("id"), [])) for p in proposals]
+
+
+def _unique_file_names(
+    jobs: List[Dict[str, Any]],
+    reserved: Iterable[str] = (),
+    cache: Optional[DocumentCacheIndex] = None,
+) -> None:
+    # Propostas do mesmo cliente no lote não podem escrever no mesmo arquivo,
+    # nem sobrescrever os arquivos servidos do cache (`reserved`, sem extensão)
+    # ou os arquivos em cache de outras propostas da pasta
+    taken = {name.lower() for name in reserved}
+    for job in jobs:
+        in_use = taken
+        if cache is not None:
+            owner = document_owner("proposal", job["proposal_id"])
+            in_use = taken | cache.names_in_use(exclude_owner=owner)
+        base = NOME_ARQUIVO_PROPOSTA.format(razao_social=job["razao_social"])
+        name, count = base, 1
+        while name.lower() in in_use:
+            count += 1
+            name = f"{base} ({count})"
+        taken.add(name.lower())
+        if name != base:
+            job["nome_arquivo"] = name
+
+
+def generate_proposals_batch(
+    proposal_ids: Iterable[Any],
+    output_dir: str,
+    *,
+    to_pdf: bool = True,
+    pdf_backend: Optional[str] = None,
+    max_workers: Optional[int] = None,
+    on_progress: Optional[ProgressCallback] = None,
+    use_cache: bool = True,
+) -> List[Dict[str, Any]]:
+    """Gera as propostas informadas e retorna um resultado por proposta.
+
+    Cada resultado tem `proposal_id`, `customer_name`, `docx_path`,
+    `pdf_path`, `error` e `cached`. Falhas de um item não interrompem o
+    lote. Com `use_cache`, só são renderizadas as propostas cuja entrada
+    mudou desde a última geração na mesma pasta.
+    """
+    if not output_dir:
+        raise ValueError(
+            "output_dir não configurado. "
+            "Configure a pasta de saída no Backoffice antes de gerar propostas."
+        )
+
+    native_pdf = to_pdf and resolve_pdf_backend(pdf_backend) == "native"
+    pdf_fmt = pdf_format(pdf_backend) if to_pdf else None
+    required = ("docx", pdf_fmt) if to_pdf else ("docx",)
+    cache = get_cache_index(output_dir) if use_cache else None
+    records = fetch_proposals_with_seasonalities(proposal_ids)
+    total = len(records)
+    results: List[Dict[str, Any]] = []
+    done = 0
+
+    def report(result: Dict[str, Any]) -> None:
+        nonlocal done
+        done += 1
+        results.append(result)
+        if on_progress:
+            on_progress(done, total, result)
+
+    jobs: List[Dict[str, Any]] = []
+    # Nomes (sem extensão) dos arquivos servidos do cache neste lote
+    reserved: List[str] = []
+    names: Dict[Any, str] = {}
+    cache_keys: Dict[Any, str] = {}
+    data_hoje = datetime.now().strftime("%d/%m/%Y")
+    for proposal, seasonalities in records:
+        proposal_id = proposal.get("id")
+        names[proposal_id] = proposal.get("customer_name") or ""
+        try:
+            params = build_proposal_params(proposal, seasonalities, data_hoje=data_hoje)
+        except ValueError as exc:
+            report(
+                {
+                    "proposal_id": proposal_id,
+                    "customer_name": names[proposal_id],
+                    "docx_path": None,
+                    "pdf_path": None,
+                    "error": str(exc),
+                    "cached": False,
+                }
+            )
+            continue
+
+        if cache is not None:
+            cache_keys[proposal_id] = proposal_cache_key(params)
+            cached = cache.lookup(cache_keys[proposal_id], require=required)
+            if cached:
+                reserved.extend(
+                    os.path.splitext(os.path.basename(path))[0] for path in cached.values()
+                )
+                report(
+                    {
+                        "proposal_id": proposal_id,
+                        "customer_name": names[proposal_id],
+                        "docx_path": cached["docx"],
+                        "pdf_path": cached.get(pdf_fmt) if to_pdf else None,
+                        "error": None,
+                        "cached": True,
+                    }
+                )
+                continue
+
+        params["proposal_id"] = proposal_id
+        params["output_dir"] = output_dir
+        if native_pdf:
+            params["native_pdf"] = True
+        jobs.append(params)
+
+    _unique_file_names(jobs, reserved, cache)
+    workers = max(1, min(max_workers or MAX_WORKERS, len(jobs) or 1))
+    _debug_print(
+        f"Gerando {len(jobs)} propostas com {workers} processo(s) "
+        f"({total - len(jobs)} sem renderização)"
+    )
+
+    def finish(rendered: Dict[str, Any]) -> None:
+        rendered["customer_name"] = names.get(rendered["proposal_id"], "")
+        if to_pdf and not native_pdf and rendered["docx_path"] and not rendered["error"]:
+            pdf_path = os.path.splitext(rendered["docx_path"])[0] + ".pdf"
+            try:
+                convert_docx_to_pdf(rendered["docx_path"], pdf_path)
+                rendered["pdf_path"] = pdf_path
+            except Exception as exc:
+                rendered["error"] = f"Falha na conversão para PDF: {exc}"
+        if cache is not None and not rendered["error"]:
+            outputs = {"docx": rendered["docx_path"]}
+            if to_pdf:
+                outputs[pdf_fmt] = rendered["pdf_path"]
+            cache.store(
+                cache_keys[rendered["proposal_id"]],
+                owner=document_owner("proposal", rendered["proposal_id"]),
+                **outputs,
+            )
+        rendered["cached"] = False
+        report(rendered)
+
+    if workers == 1:
+        for params in jobs:
+            finish(render_proposal_job(params))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(render_proposal_job, dict(params)) for params in jobs]
+            for future in as_completed(futures):
+                # Converte para PDF à medida que os DOCX ficam prontos
+                finish(future.result())
+
+    failed = sum(1 for r in results if r["error"])
+    cached = sum(1 for r in results if r["cached"])
+    _debug_print(f"Lote concluído: {total - failed} ok ({cached} do cache), {failed} com erro")
+    return results
+
+
+def _select_proposal_ids(ids: Optional[List[str]], status: Optional[str]) -> List[Any]:
+    if ids:
+        return ids
+    filters = {"status": status} if status else None
+    return [p["id"] for p in read_records("proposals", filters) if p.get("id")]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Gera propostas em lote.")
+    parser.add_argument("--output-dir", required=True, help="Pasta de saída dos arquivos")
+    parser.add_argument("--ids", nargs="*", help="IDs das propostas (padrão: todas)")
+    parser.add_argument("--status", help="Filtra por status (ex.: PENDING, ACCEPTED)")
+    parser.add_argument("--no-pdf", action="store_true", help="Gera apenas os DOCX")
+    parser.add_argument("--workers", type=int, default=None, help="Número de processos")
+    parser.add_argument(
+        "--pdf-backend",
+        choices=["auto", "word", "native"],
+        default=None,
+        help="Backend do PDF (padrão: PROPOSAL_PDF_BACKEND ou auto)",
+    )
+    parser.add_argument("--force", action="store_true", help="Ignora o cache e gera tudo de novo")
+    args = parser.parse_args(argv)
+
+    def print_progress(done: int, total: int, result: Dict[str, Any]) -> None:
+        status = f"ERRO: {result['error']}" if result["error"] else ("cache" if result["cached"] else "ok")
+        print(f"[{done}/{total}] {result['customer_name'] or result['proposal_id']}: {status}")
+
+    results = generate_proposals_batch(
+        _select_proposal_ids(args.ids, args.status),
+        args.output_dir,
+        to_pdf=not args.no_pdf,
+        pdf_backend=args.pdf_backend,
+        max_workers=args.workers,
+        on_progress=print_progress,
+        use_cache=not args.force,
+    )
+    return 1 if any(r["error"] for r in results) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,199 +1,21 @@
-from docx import Document
-from docx2pdf import convert
-from pathlib import Path
-import sys
-from docx.shared import Pt
-from docx.oxml import OxmlElement
-from docx.oxml.ns import qn
-from docx.enum.text import WD_ALIGN_PARAGRAPH
-from docx.enum.table import WD_TABLE_ALIGNMENT
+from scripts.document_engine import (
+	DocumentType,
+	build_document,
+	cache_key,
+	format_currency,
+	format_decimal,
+	pdf_format,
+	register_document_type,
+	render_document,
+	year_table_slot,
+)
 
 
-# -------------------------------
-# Helpers
-# -------------------------------
-
-def copy_run_attrs(src_run, dst_run):
-	"""Copia atributos de formatação de um run para outro."""
-	dst_run.bold = src_run.bold
-	dst_run.italic = src_run.italic
-	dst_run.underline = src_run.underline
-
-	if src_run.font.size:
-		dst_run.font.size = src_run.font.size
-	if src_run.font.name:
-		dst_run.font.name = src_run.font.name
-	if src_run.font.color and src_run.font.color.rgb:
-		dst_run.font.color.rgb = src_run.font.color.rgb
-
-	# Copiar estilo se houver
-	dst_run.style = src_run.style
-
-
-def set_cell_background(cell, color_hex):
-	"""Define a cor de fundo de uma célula."""
-	tc = cell._tc
-	tcPr = tc.get_or_add_tcPr()
-	shd = OxmlElement('w:shd')
-	shd.set(qn('w:val'), 'clear')
-	shd.set(qn('w:color'), 'auto')
-	shd.set(qn('w:fill'), color_hex)
-	tcPr.append(shd)
-
-
-def format_decimal(val):
-	"""Formata float para string com vírgula decimal (ex: 0.69 -> 0,69)."""
-	if isinstance(val, (int, float)):
-		return f"{val:.2f}".replace('.', ',')
-	return str(val)
-
-
-def format_currency(val):
-	"""Formata float para string BRL sem símbolo (ex: 199.0 -> 199,00)."""
-	if isinstance(val, (int, float)):
-		# Formata com separador de milhar ponto e decimal vírgula
-		s = f"{val:,.2f}"
-		s = s.replace(',', 'X').replace('.', ',').replace('X', '.')
-		return s
-	return str(val)
-
-
-def replace_placeholder_with_table(doc, placeholder, headers, row_label, data_values):
-	"""
-	Substitui um parágrafo contendo o placeholder por uma tabela dinâmica.
-	"""
-	target_paragraph = None
-	for p in doc.paragraphs:
-		if placeholder in p.text:
-			target_paragraph = p
-			break
-
-	if not target_paragraph:
-		return
-
-	# Criar tabela
-	# Colunas = Label + Dados (len(data_values))
-	cols = 1 + len(data_values)
-	table = doc.add_table(rows=2, cols=cols)
-	table.style = 'Table Grid'
-	table.alignment = WD_TABLE_ALIGNMENT.CENTER
-
-	# Preencher Cabeçalho
-	hdr_cells = table.rows[0].cells
-	hdr_cells[0].text = headers[0]
-	set_cell_background(hdr_cells[0], "D9D9D9")  # Cinza claro
-	hdr_cells[0].paragraphs[0].runs[0].bold = True
-	hdr_cells[0].paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.CENTER
-
-	for i, header_text in enumerate(headers[1:]):
-		cell = hdr_cells[i + 1]
-		cell.text = str(header_text)
-		set_cell_background(cell, "D9D9D9")
-		cell.paragraphs[0].runs[0].bold = True
-		cell.paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.CENTER
-
-	# Preencher Dados
-	row_cells = table.rows[1].cells
-	row_cells[0].text = row_label
-	# set_cell_background(row_cells[0], "FFFFFF") # Branco (padrão)
-	row_cells[0].paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.CENTER
-
-	for i, val in enumerate(data_values):
-		cell = row_cells[i + 1]
-		cell.text = str(val)
-		cell.paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.CENTER
-
-	# Mover tabela para depois do parágrafo alvo
-	target_paragraph._p.addnext(table._tbl)
-
-	# Remover o parágrafo do placeholder
-	p = target_paragraph._p
-	p.getparent().remove(p)
-
-
-# -------------------------------
-# 1) Substituir placeholders
-# -------------------------------
-
-def substituir_placeholders_paragrafo(paragraph, mapa):
-	# Loop para tratar placeholders um por um, evitando conflitos de índices
-	while True:
-		runs = paragraph.runs
-		if not runs:
-			break
-
-		# 1. Tentar substituição direta em runs individuais (rápido e seguro)
-		changed_any = False
-		for run in runs:
-			for chave, valor in mapa.items():
-				if chave in run.text:
-					run.text = run.text.replace(chave, valor)
-					changed_any = True
-
-		# Se mudou algo, recomeça para garantir consistência
-		if changed_any:
-			continue
-
-		# 2. Verificar se ainda existem placeholders quebrados entre runs
-		full_text = "".join(run.text for run in runs)
-		found_key = None
-		for k in mapa:
-			if k in full_text:
-				found_key = k
-				break
-
-		if not found_key:
-			break  # Nenhum placeholder restante
-
-		# 3. Smart Merge: Identificar runs envolvidos APENAS nesse placeholder
-		# Mapear cada caractere do full_text para o índice do run correspondente
-		char_to_run_idx = []
-		for i, run in enumerate(runs):
-			char_to_run_idx.extend([i] * len(run.text))
-
-		start_idx = full_text.find(found_key)
-		end_idx = start_idx + len(found_key)
-
-		# Identificar índices dos runs únicos envolvidos
-		involved_run_indices = sorted(list(set(char_to_run_idx[start_idx:end_idx])))
-
-		# Se por algum motivo não achou runs (ex: texto vazio?), aborta para evitar loop
-		if not involved_run_indices:
-			break
-
-		# Merge: Juntar texto dos runs envolvidos no primeiro run
-		first_run_idx = involved_run_indices[0]
-		target_run = runs[first_run_idx]
-
-		# Construir texto combinado desses runs
-		merged_text = "".join(runs[i].text for i in involved_run_indices)
-
-		# Substituir APENAS a primeira ocorrência da chave (a que encontramos)
-		new_merged_text = merged_text.replace(found_key, mapa[found_key], 1)
-
-		# Atualizar runs
-		target_run.text = new_merged_text
-		for i in involved_run_indices[1:]:
-			runs[i].text = ""
-
-	# Loop continua para processar próximos placeholders
-
-
-def substituir_placeholders(documento, mapa):
-	for paragraph in documento.paragraphs:
-		substituir_placeholders_paragrafo(paragraph, mapa)
-
-	for table in documento.tables:
-		for row in table.rows:
-			for cell in row.cells:
-				for paragraph in cell.paragraphs:
-					substituir_placeholders_paragrafo(paragraph, mapa)
-
-
-# -------------------------------
-# 2) Remover negrito após rótulos
-# -------------------------------
+# ==========================================================
+# 1) DEFINIÇÃO DO DOCUMENTO
+# ==========================================================
 
+# Rótulos cujo texto seguinte perde o negrito
 rotulos = [
 	"Compradora:",
 	"Ponto de Entrega:",
@@ -209,106 +31,59 @@ rotulos = [
 	"Reajuste:"
 ]
 
+# Nome padrão dos arquivos gerados (sem extensão)
+NOME_ARQUIVO_PROPOSTA = "{razao_social} - Proposta de Venda de Energia NOVO ATACAREJO"
+
+# Argumentos que não mudam o conteúdo do documento (ficam fora da chave de cache)
+ARGUMENTOS_FORA_DO_CACHE = ("output_dir", "nome_arquivo", "proposal_id", "native_pdf", "save_docx")
+
+
+def montar_valores(dados):
+	"""Mapa de placeholders de texto da proposta."""
+	return {
+		"{{DATA_HOJE}}": dados["data_hoje"],
+		"{{RAZAO_SOCIAL}}": dados["razao_social"],
+		"{{CNPJ}}": dados["cnpj"],
+		"{{SUBMERCADO}}": dados["submercado"],
+		"{{INICIO}}": dados["inicio"],
+		"{{FIM}}": dados["fim"],
+		# "{{CURVA_VOL}}" e "{{CURVA_PRECOS}}" são slots de tabela
+		"{{TIPO_ENERGIA}}": dados["tipo_energia"],
+		"{{FLEX}}": dados["flex"],
+		"{{SAZO}}": dados["sazo"],
+		"{{MODULACAO}}": dados["modulacao"],
+		"{{PAGAMENTO}}": dados["pagamento"],
+		"{{QTY_MESES}}": dados["qty_meses"],
+		"{{TIPO_PROPOSTA}}": dados["tipo_proposta"],
+	}
 
-def remover_negrito_apos_rotulos(documento):
-	def process_paragraph(paragraph):
-		full_text = "".join(run.text for run in paragraph.runs)
-
-		# Verifica se o parágrafo contém algum dos rótulos
-		matched_label = None
-		match_index = -1
-
-		for label in rotulos:
-			if label in full_text:
-				idx = full_text.find(label)
-				if idx != -1:
-					matched_label = label
-					match_index = idx
-					break
-
-		if not matched_label:
-			return
-
-		split_point = match_index + len(matched_label)
-
-		if split_point >= len(full_text):
-			return
-
-		# Coletar dados dos runs para reconstrução preservando formatação
-		runs_data = []
-		current_pos = 0
-
-		for run in paragraph.runs:
-			run_len = len(run.text)
-			run_end = current_pos + run_len
-
-			# Caso 1: Run totalmente antes do split point (Manter como está)
-			if run_end <= split_point:
-				runs_data.append({
-					"text": run.text,
-					"src_run": run,
-					"force_unbold": False
-				})
-
-			# Caso 2: Run totalmente depois do split point (Forçar sem negrito)
-			elif current_pos >= split_point:
-				runs_data.append({
-					"text": run.text,
-					"src_run": run,
-					"force_unbold": True
-				})
-
-			# Caso 3: Run atravessa o split point (Dividir)
-			else:
-				split_in_run = split_point - current_pos
-				text_before = run.text[:split_in_run]
-				text_after = run.text[split_in_run:]
-
-				if text_before:
-					runs_data.append({
-						"text": text_before,
-						"src_run": run,
-						"force_unbold": False
-					})
-				if text_after:
-					runs_data.append({
-						"text": text_after,
-						"src_run": run,
-						"force_unbold": True
-					})
-
-			current_pos += run_len
-
-		# Limpar runs existentes
-		p = paragraph._p
-		for run in paragraph.runs:
-			p.remove(run._r)
-
-		# Reconstruir runs
-		for data in runs_data:
-			new_run = paragraph.add_run(data["text"])
-			copy_run_attrs(data["src_run"], new_run)
 
-			if data["force_unbold"]:
-				new_run.bold = False
+PROPOSTA = register_document_type(
+	DocumentType(
+		"proposal",
+		("documents", "standard_proposal.docx"),
+		build_values=montar_valores,
+		table_slots={
+			"{{CURVA_VOL}}": year_table_slot("MWm", "curva_vol", format_decimal),
+			"{{CURVA_PRECOS}}": year_table_slot("Preço", "curva_precos", format_currency),
+		},
+		labels=rotulos,
+		file_name=NOME_ARQUIVO_PROPOSTA,
+	)
+)
 
-	# Texto normal
-	for paragraph in documento.paragraphs:
-		process_paragraph(paragraph)
 
-	# Também processa texto interno de tabelas
-	for table in documento.tables:
-		for row in table.rows:
-			for cell in row.cells:
-				for paragraph in cell.paragraphs:
-					process_paragraph(paragraph)
+def proposal_cache_key(dados):
+	"""Chave de cache dos dados da proposta + hash do template."""
+	conteudo = {k: v for k, v in dados.items() if k not in ARGUMENTOS_FORA_DO_CACHE}
+	return cache_key(PROPOSTA, conteudo)
 
 
 # ==========================================================
-# 3) GERAÇÃO DO DOCUMENTO FINAL
+# 2) GERAÇÃO DO DOCUMENTO FINAL
 # ==========================================================
 
-def generate_proposal(
+def build_proposal_document(
 		data_hoje,
 		razao_social,
 		cnpj,
@@ -325,127 +100,107 @@ def generate_proposal(
 		pagamento,
 		qty_meses,
 		tipo_proposta,
-		output_dir  # NEW: External directory for saving files
 ):
-	# ⚠️ VALIDAÇÃO CRÍTICA: output_dir NUNCA pode ser None
-	if not output_dir:
-		raise ValueError(
-			"output_dir não configurado. "
-			"Configure a pasta de saída no Backoffice antes de gerar propostas."
-		)
-	
-	# Mapa de valores simples
-	valores = {
-		"{{DATA_HOJE}}": data_hoje,
-		"{{RAZAO_SOCIAL}}": razao_social,
-		"{{CNPJ}}": cnpj,
-		"{{SUBMERCADO}}": submercado,
-		"{{INICIO}}": inicio,
-		"{{FIM}}": fim,
-		# "{{CURVA_VOL}}": Removido, tratado via tabela
-		# "{{CURVA_PRECOS}}": Removido, tratado via tabela
-		"{{TIPO_ENERGIA}}": tipo_energia,
-		"{{FLEX}}": flex,
-		"{{SAZO}}": sazo,
-		"{{MODULACAO}}": modulacao,
-		"{{PAGAMENTO}}": pagamento,
-		"{{QTY_MESES}}": qty_meses,
-		"{{TIPO_PROPOSTA}}": tipo_proposta,
-	}
-
-	from helpers.paths import get_asset_path, get_output_path
-	
-	# Read template from assets (READ-ONLY)
-	arquivo_origem = get_asset_path("documents", "standard_proposal.docx")
-	
-	# Save generated files to external directory (WRITE)
-	arquivo_final_docx = get_output_path(output_dir, f"{razao_social} - Proposta de Venda de Energia NOVO ATACAREJO.docx")
-	arquivo_final_pdf = get_output_path(output_dir, f"{razao_social} - Proposta de Venda de Energia NOVO ATACAREJO.pdf")
+	"""Preenche o template da proposta e retorna o documento em memória."""
+	return build_document(PROPOSTA, dict(locals()))
 
-	print(f"Iniciando geração de proposta...")
-
-	try:
-		import pythoncom
-		import shutil
-		pythoncom.CoInitialize()
 
-		# ⚠️ CORREÇÃO: Copiar template para output_dir ANTES de abrir
-		# Isso evita que o Word crie arquivos temporários em assets/
-		temp_template = get_output_path(output_dir, "_temp_template.docx")
-		shutil.copy2(str(arquivo_origem), str(temp_template))
-		
-		# Agora abre a cópia no output_dir (não o original em assets)
-		doc = Document(temp_template)
+def render_proposal_docx(output_dir, nome_arquivo=None, **dados):
+	"""
+	Gera apenas o DOCX da proposta e retorna o caminho salvo.
+	Não usa Word/COM, então pode rodar em processos paralelos.
+	`dados` são os argumentos de `build_proposal_document`.
+	"""
+	paths = render_document(PROPOSTA, dados, output_dir, formats=("docx",), nome_arquivo=nome_arquivo)
+	return paths["docx"]
 
-		# 1. Criar tabelas dinâmicas (Volume e Preço)
-		# Preparar dados formatados
-		headers = ["Ano"] + [str(a) for a in anos]
 
-		# Tabela Volume
-		vol_values = [format_decimal(v) for v in curva_vol]
-		replace_placeholder_with_table(doc, "{{CURVA_VOL}}", headers, "MWm", vol_values)
+def render_proposal_pdf(output_dir, nome_arquivo=None, save_docx=True, **dados):
+	"""
+	Gera o PDF da proposta nativamente (fpdf2), sem Word/COM, e
+	opcionalmente o DOCX equivalente. Retorna (caminho_docx | None, caminho_pdf).
+	"""
+	formats = ("docx", "pdf_native") if save_docx else ("pdf_native",)
+	paths = render_document(PROPOSTA, dados, output_dir, formats=formats, nome_arquivo=nome_arquivo)
+	return paths.get("docx"), paths["pdf_native"]
 
-		# Tabela Preço
-		price_values = [format_currency(p) for p in curva_precos]
-		replace_placeholder_with_table(doc, "{{CURVA_PRECOS}}", headers, "Preço", price_values)
 
-		# 2. Substituir placeholders restantes
-		substituir_placeholders(doc, valores)
+def render_proposal_job(params):
+	"""
+	Tarefa de geração em lote (executada em processo filho).
+	Recebe os kwargs de `render_proposal_docx` (e opcionalmente
+	`native_pdf=True` para já gerar o PDF no processo) e nunca propaga exceção.
+	"""
+	proposal_id = params.pop("proposal_id", None)
+	native_pdf = params.pop("native_pdf", False)
+	try:
+		if native_pdf:
+			docx_path, pdf_path = render_proposal_pdf(**params)
+		else:
+			docx_path, pdf_path = render_proposal_docx(**params), None
+		return {
+			"proposal_id": proposal_id,
+			"docx_path": str(docx_path) if docx_path else None,
+			"pdf_path": str(pdf_path) if pdf_path else None,
+			"error": None,
+		}
+	except Exception as e:
+		return {"proposal_id": proposal_id, "docx_path": None, "pdf_path": None, "error": str(e)}
 
-		# 3. Remover negrito após rótulos
-		remover_negrito_apos_rotulos(doc)
 
-		# Salvar DOCX
-		doc.save(arquivo_final_docx)
-		print(f"Documento DOCX salvo em: {arquivo_final_docx}")
-		
-		# ⚠️ IMPORTANTE: Fechar o documento antes de converter
-		# Isso libera o arquivo para o docx2pdf acessar
-		doc = None
-		
-		# Limpar arquivo temporário
-		try:
-			temp_template.unlink()
-			print("Template temporário removido.")
-		except Exception as e:
-			print(f"Aviso: Não foi possível remover template temporário: {e}")
+def generate_proposal(
+		data_hoje,
+		razao_social,
+		cnpj,
+		submercado,
+		inicio,
+		fim,
+		curva_vol,
+		curva_precos,
+		anos,
+		tipo_energia,
+		flex,
+		sazo,
+		modulacao,
+		pagamento,
+		qty_meses,
+		tipo_proposta,
+		output_dir,  # NEW: External directory for saving files
+		pdf_backend=None,
+		use_cache=True,
+):
+	print(f"Iniciando geração de proposta...")
 
-		# Converter para PDF
-		# Garantir que os caminhos são strings absolutas
-		docx_path = str(arquivo_final_docx.resolve())
-		pdf_path = str(arquivo_final_pdf.resolve())
-		
-		print(f"Convertendo para PDF...")
-		print(f"  DOCX: {docx_path}")
-		print(f"  PDF:  {pdf_path}")
-		
-		# ⚠️ CORREÇÃO CRÍTICA PARA CX_FREEZE:
-		# Em apps GUI congelados, sys.stdout e sys.stderr são None.
-		# A biblioteca docx2pdf (via tqdm) tenta escrever neles e causa erro:
-		# 'NoneType' object has no attribute 'write'
-		# Solução: Redirecionar para um dummy writer se necessário.
-		
-		class DummyWriter:
-			def write(self, message): pass
-			def flush(self): pass
-			
-		import sys
-		original_stdout = sys.stdout
-		original_stderr = sys.stderr
-		
-		try:
-			if sys.stdout is None: sys.stdout = DummyWriter()
-			if sys.stderr is None: sys.stderr = DummyWriter()
-			
-			convert(docx_path, pdf_path)
-			
-		finally:
-			sys.stdout = original_stdout
-			sys.stderr = original_stderr
-			
-		print("PDF gerado com sucesso.")
+	dados = dict(
+		data_hoje=data_hoje,
+		razao_social=razao_social,
+		cnpj=cnpj,
+		submercado=submercado,
+		inicio=inicio,
+		fim=fim,
+		curva_vol=curva_vol,
+		curva_precos=curva_precos,
+		anos=anos,
+		tipo_energia=tipo_energia,
+		flex=flex,
+		sazo=sazo,
+		modulacao=modulacao,
+		pagamento=pagamento,
+		qty_meses=qty_meses,
+		tipo_proposta=tipo_proposta,
+	)
 
-		return pdf_path
+	try:
+		# DOCX + PDF pelo backend configurado; entrada inalterada devolve os arquivos em cache
+		paths = render_document(
+			PROPOSTA,
+			dados,
+			output_dir,
+			formats=("docx", "pdf"),
+			pdf_backend=pdf_backend,
+			use_cache=use_cache,
+		)
+		return str(paths[pdf_format(pdf_backend)].resolve())
 
 	except PermissionError:
 		print("ERRO: O arquivo está aberto em outro programa. Por favor, feche o Word e tente novamente.")
@@ -453,12 +208,6 @@ def generate_proposal(
 	except Exception as e:
 		print(f"ERRO INESPERADO: {e}")
 		raise
-	finally:
-		try:
-			import pythoncom
-			pythoncom.CoUninitialize()
-		except:
-			pass
 
 
 # if __name__ == "__main__":
@@ -0,0 +1,196 @@
+"""Acesso às propostas para a tela de listagem e a geração de documentos.
+
+A listagem filtra (cliente por ilike, status), ordena e pagina no servidor
+e traz o total na mesma requisição. As sazonalidades da página visível são
+buscadas de uma vez com um filtro IN e ficam guardadas no repositório, então
+listar uma página custa duas requisições e gerar documentos a partir dela
+(um clique, lote ou ZIP) não consulta o banco de novo.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from scripts.database import query_records, read_records_in
+
+
+DEBUG_PREFIX = "[ProposalsRepository]"
+
+PAGE_SIZE = 50
+
+# Colunas aceitas na ordenação (evita repassar texto livre ao PostgREST)
+SORTABLE_COLUMNS = ("created_at", "customer_name", "status", "supply_start")
+
+ProposalRecord = Tuple[Dict[str, Any], List[Dict[str, Any]]]
+
+
+def _debug_print(message: str, *, data: Any | None = None) -> None:
+    print(f"{DEBUG_PREFIX} {message}")
+    if data is not None:
+        print(f"{DEBUG_PREFIX} -> {data}")
+
+
+def _ilike_pattern(term: str) -> str:
+    # % e _ digitados pelo usuário são literais, não curingas
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+class ProposalPage:
+    """Uma página da listagem de propostas."""
+
+    def __init__(
+        self,
+        items: List[Dict[str, Any]],
+        *,
+        total: int,
+        page: int,
+        page_size: int,
+        seasonalities: Dict[Any, List[Dict[str, Any]]],
+    ):
+        self.items = items
+        self.total = total
+        self.page = page
+        self.page_size = page_size
+        # proposal_id -> sazonalidades (ordenadas por ano)
+        self.seasonalities = seasonalities
+
+    @property
+    def page_count(self) -> int:
+        return max(1, math.ceil(self.total / self.page_size))
+
+    @property
+    def has_previous(self) -> bool:
+        return self.page > 0
+
+    @property
+    def has_next(self) -> bool:
+        return self.page + 1 < self.page_count
+
+
+class ProposalsRepository:
+    """Listagem paginada de propostas com sazonalidades pré-carregadas."""
+
+    def __init__(self, *, page_size: int = PAGE_SIZE):
+        self.page_size = page_size
+        self._seasonalities: Dict[Any, List[Dict[str, Any]]] = {}
+        self._proposals: Dict[Any, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def list_page(
+        self,
+        *,
+        search: str = "",
+        status: Optional[str] = None,
+        page: int = 0,
+        order_by: str = "created_at",
+        descending: bool = True,
+    ) -> ProposalPage:
+        """Busca uma página (filtros e ordenação no servidor) e pré-carrega as sazonalidades."""
+        if order_by not in SORTABLE_COLUMNS:
+            raise ValueError(f"Ordenação não suportada: {order_by}")
+
+        search = (search or "").strip()
+        page = max(0, page)
+        items, total = query_records(
+            "proposals",
+            filters={"status": status} if status else None,
+            ilike={"customer_name": _ilike_pattern(search)} if search else None,
+            order_by=order_by,
+            descending=descending,
+            offset=page * self.page_size,
+            limit=self.page_size,
+            count=True,
+        )
+        total = total if total is not None else len(items)
+
+        # Página além do fim (ex.: após excluir a última linha): volta para a última
+        last_page = max(0, math.ceil(total / self.page_size) - 1)
+        if not items and page > last_page:
+            return self.list_page(
+                search=search,
+                status=status,
+                page=last_page,
+                order_by=order_by,
+                descending=descending,
+            )
+
+        seasonalities = self._fetch_seasonalities(items)
+        self.remember_page(items, seasonalities)
+        _debug_print(
+            f"Página {page + 1}: {len(items)} de {total} proposta(s) "
+            f"(busca='{search}', status={status})"
+        )
+        return ProposalPage(
+            items,
+            total=total,
+            page=page,
+            page_size=self.page_size,
+            seasonalities=seasonalities,
+        )
+
+    @staticmethod
+    def _fetch_seasonalities(
+        proposals: List[Dict[str, Any]]
+    ) -> Dict[Any, List[Dict[str, Any]]]:
+        ids = [p.get("id") for p in proposals if p.get("id")]
+        by_proposal: Dict[Any, List[Dict[str, Any]]] = {pid: [] for pid in ids}
+        for row in read_records_in("proposal_seasonalities", "proposal_id", ids):
+            by_proposal.setdefault(row.get("proposal_id"), []).append(row)
+        for rows in by_proposal.values():
+            rows.sort(key=lambda x: x.get("year") or 0)
+        return by_proposal
+
+    def remember_page(
+        self,
+        proposals: List[Dict[str, Any]],
+        seasonalities: Dict[Any, List[Dict[str, Any]]],
+    ) -> None:
+        """Passa a servir da memória as propostas e sazonalidades da página.
+
+        Usado pela própria listagem e para adotar uma página buscada fora do
+        repositório (ex.: pré-carregada em tempo ocioso).
+        """
+        with self._lock:
+            # Guarda só a página atual: dados de páginas antigas podem estar velhos
+            self._seasonalities = dict(seasonalities)
+            self._proposals = {p.get("id"): p for p in proposals if p.get("id")}
+
+    def seasonalities_for(self, proposal_id: Any) -> Optional[List[Dict[str, Any]]]:
+        """Sazonalidades pré-carregadas da proposta (None fora da página atual)."""
+        with self._lock:
+            return self._seasonalities.get(proposal_id)
+
+    def records_for(self, proposal_ids: Iterable[Any]) -> List[ProposalRecord]:
+        """(proposta, sazonalidades) na ordem pedida.
+
+        IDs da página atual saem da memória; os demais são buscados com um
+        filtro IN por tabela.
+        """
+        ids = [pid for pid in dict.fromkeys(proposal_ids) if pid]
+        with self._lock:
+            cached = {
+                pid: (self._proposals[pid], self._seasonalities.get(pid, []))
+                for pid in ids
+                if pid in self._proposals
+            }
+        missing = [pid for pid in ids if pid not in cached]
+        if missing:
+            from scripts.proposal_batch import fetch_proposals_with_seasonalities
+
+            for proposal, seasonalities in fetch_proposals_with_seasonalities(missing):
+                cached[proposal.get("id")] = (proposal, seasonalities)
+        return [cached[pid] for pid in ids if pid in cached]
+
+    def invalidate(self) -> None:
+        """Descarta os dados pré-carregados (após editar ou excluir propostas)."""
+        with self._lock:
+            self._seasonalities.clear()
+            self._proposals.clear()
+
+
+def fetch_first_page() -> ProposalPage:
+    """Primeira página da listagem padrão (usada no pré-carregamento)."""
+    return ProposalsRepository().list_page()
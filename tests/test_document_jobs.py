@@ -0,0 +1,83 @@
+"""Fila de documentos: nomes de arquivo de propostas do mesmo cliente."""
+
+import hashlib
+import zipfile
+
+import pytest
+
+# A montagem dos dados da proposta importa o cliente do banco
+pytest.importorskip("dotenv")
+pytest.importorskip("supabase")
+
+from scripts.document_export import export_documents_zip  # noqa: E402
+from scripts.document_jobs import DocumentJobQueue  # noqa: E402
+
+
+def _proposal(proposal_id, price):
+    proposal = {
+        "id": proposal_id,
+        "customer_name": "Cliente Teste",
+        "customer_cnpj": "12345678000199",
+        "submarket": "SE/CO",
+        "supply_start": "2027-01-01",
+        "supply_end": "2027-12-31",
+        "energy_type": "I5",
+        "modulation": "Flat",
+        "billing_due_day": 6,
+        "guarantee_months": 1,
+        "proposal_validity": "31/12/2026",
+    }
+    seasonalities = [
+        {"proposal_id": proposal_id, "year": 2027, "average_volume": 1.5, "price": price}
+    ]
+    return proposal, seasonalities
+
+
+def _zip_files(zip_path):
+    with zipfile.ZipFile(zip_path) as archive:
+        return {
+            name: hashlib.sha256(archive.read(name)).hexdigest()
+            for name in archive.namelist()
+            if not name.endswith(".csv")
+        }
+
+
+@pytest.fixture
+def job_queue():
+    queue = DocumentJobQueue(max_workers=2, pdf_backend="native")
+    yield queue
+    queue.shutdown(wait=True)
+
+
+def test_cached_proposal_keeps_its_file_when_exported_with_another(tmp_path, job_queue):
+    output_dir = str(tmp_path / "saida")
+    first = _proposal("prop-a", 250.0)
+    second = _proposal("prop-b", 310.0)
+
+    # A primeira proposta entra no cache da pasta
+    alone = export_documents_zip(
+        ["prop-a"], output_dir, tmp_path / "a.zip", job_queue=job_queue, records=[first]
+    )
+    assert alone["exported"] == 1
+    cached_files = _zip_files(tmp_path / "a.zip")
+
+    # Juntas: a primeira sai do cache e a segunda é renderizada na hora
+    both = export_documents_zip(
+        ["prop-a", "prop-b"],
+        output_dir,
+        tmp_path / "ab.zip",
+        job_queue=job_queue,
+        records=[first, second],
+    )
+    assert both["exported"] == 2
+    jobs = {job.proposal_id: job for job in job_queue.jobs() if job.kind == "proposal"}
+    assert jobs["prop-a"].cached
+    assert not jobs["prop-b"].cached
+    assert jobs["prop-a"].pdf_path != jobs["prop-b"].pdf_path
+    assert jobs["prop-a"].docx_path != jobs["prop-b"].docx_path
+
+    # O documento da primeira proposta no ZIP é o mesmo gerado antes
+    exported = _zip_files(tmp_path / "ab.zip")
+    assert len(exported) == 4
+    for name, digest in cached_files.items():
+        assert exported[name] == digest